@@ -1,12 +1,25 @@
+import sys
+import atexit
+import itertools
+import json
+import queue
+import time
 import traceback
 from flask import render_template, request, redirect, url_for
+from flask import Response, g, jsonify, stream_with_context
 import logging.config
 # from app.models import Tracks
 from flask import Flask
-from src.application_db import Applications
+from src.application_db import Applications, NullLock, admit_stats, configure_sqlite
+from src.model_registry import ModelRegistry, score
+from src.write_behind import WriteBehindBuffer
+from src.cache import LatestCache, PredictionCache, feature_key
+from src import metrics
+from src import batch
 from flask_sqlalchemy import SQLAlchemy
-import numpy as np
-import pandas as pd
+
+sys.path.append('./config')
+import config
 
 
 # Initialize the Flask application
@@ -17,13 +30,88 @@ app.config.from_pyfile('config/flaskconfig.py')
 
 # Define LOGGING_CONFIG in flask_config.py - path to config file for setting
 # up the logger (e.g. config/logging/local.conf)
-logging.config.fileConfig(app.config["LOGGING_CONFIG"])
+logging.config.fileConfig(app.config["LOGGING_CONFIG"], disable_existing_loggers=False)
 logger = logging.getLogger(app.config["APP_NAME"])
 logger.debug('Test log')
 
 # Initialize the database
 db = SQLAlchemy(app)
 
+# SQLite allows a single writer: use WAL and serialize the inserts of this process
+write_lock = NullLock()
+if app.config["SQLALCHEMY_DATABASE_URI"].startswith('sqlite') and app.config["SQLITE_CONCURRENT_WRITES"]:
+    with app.app_context():
+        write_lock = configure_sqlite(db.engine, app.config["SQLITE_BUSY_TIMEOUT_MS"],
+                                      app.config["SQLITE_SYNCHRONOUS"])
+
+# Load the trained model once, it is reloaded in place when the artifact changes
+registry = ModelRegistry(app.config["MODEL_CSV_PATH"], app.config["MODEL_RELOAD_SECONDS"],
+                         app.config["MODEL_PREPROCESS_PATH"])
+
+# Predictions of recently submitted feature combinations
+predictions = PredictionCache(app.config["PREDICTION_CACHE_SIZE"])
+
+# Latest application shown on the index page, updated by the POST path
+latest = LatestCache(app.config["LATEST_CACHE_SECONDS"])
+
+# Request instrumentation, exposed by /metrics
+STAGE_SECONDS = metrics.Histogram('applications_stage_seconds',
+                                  'Latency of the stages of a prediction request in seconds')
+REQUEST_SECONDS = metrics.Histogram('applications_request_seconds', 'Latency of requests in seconds')
+REQUESTS = metrics.Counter('applications_requests_total', 'Requests served')
+ERRORS = metrics.Counter('applications_errors_total', 'Requests that failed')
+DB_FAILURES = metrics.Counter('applications_db_failures_total', 'Failed database operations')
+
+# Optionally take database inserts off the request path
+writer = None
+if app.config["WRITE_BEHIND"]:
+    with app.app_context():
+        writer = WriteBehindBuffer(db.engine, Applications.__table__,
+                                   maxsize=app.config["WRITE_BEHIND_QUEUE_SIZE"],
+                                   batch_size=app.config["WRITE_BEHIND_BATCH_SIZE"],
+                                   flush_seconds=app.config["WRITE_BEHIND_FLUSH_SECONDS"],
+                                   write_lock=write_lock, failures=DB_FAILURES)
+    atexit.register(writer.close)
+
+
+def _pool_stats():
+    """Connection pool statistics of the database engine, where the pool reports them"""
+
+    pool = db.engine.pool
+    stats = [({'pool': type(pool).__name__}, 1)]
+    for stat in ['size', 'checkedin', 'checkedout', 'overflow']:
+        if hasattr(pool, stat):
+            stats.append(({'pool': type(pool).__name__, 'stat': stat}, getattr(pool, stat)()))
+    return stats
+
+
+def _cache_stats():
+    return [({'stat': stat}, value) for stat, value in predictions.stats().items()]
+
+
+def _write_behind_stats():
+    return [] if writer is None else [({'stat': stat}, value) for stat, value in writer.stats().items()]
+
+
+METRICS = [STAGE_SECONDS, REQUEST_SECONDS, REQUESTS, ERRORS, DB_FAILURES,
+           metrics.Gauge('applications_db_pool', 'Database connection pool statistics', _pool_stats),
+           metrics.Gauge('applications_prediction_cache', 'Prediction cache statistics', _cache_stats),
+           metrics.Gauge('applications_write_behind', 'Write-behind buffer statistics', _write_behind_stats)]
+
+
+@app.before_request
+def _start_timer():
+    g.request_start = time.perf_counter()
+
+
+@app.after_request
+def _count_request(response):
+    endpoint = request.endpoint or 'unknown'
+    REQUESTS.inc(endpoint=endpoint, method=request.method, status=response.status_code)
+    if 'request_start' in g:
+        REQUEST_SECONDS.observe(time.perf_counter() - g.request_start, endpoint=endpoint)
+    return response
+
 
 @app.route('/', methods=['POST', 'GET'])
 def index():
@@ -42,53 +130,225 @@ def index():
 
         try:
             # get user input
-            gre = float(request.form['gre'])
-            toefl = float(request.form['toefl'])
-            univ_rating = float(request.form['univ_rating'])
-            sop = float(request.form['sop'])
-            lor = float(request.form['lor'])
-            gpa = float(request.form['gpa'])
-            research = float(request.form['research'])
-
-            # Make prediction
-            file = pd.read_csv('./models/final model.csv')
-            newx = pd.Series([1, gre, toefl, univ_rating, sop, lor, gpa, research])
-            pred = round(float(file.coefs.dot(newx)), 2)
-
-            # Ensure prediction is in range [0,1]
-            if pred > 1:
-                pred = 1
-            elif pred < 0:
-                pred = 0
+            with STAGE_SECONDS.time(stage='parse'):
+                gre = float(request.form['gre'])
+                toefl = float(request.form['toefl'])
+                univ_rating = float(request.form['univ_rating'])
+                sop = float(request.form['sop'])
+                lor = float(request.form['lor'])
+                gpa = float(request.form['gpa'])
+                research = float(request.form['research'])
+
+            # Make prediction, clipped to range [0,1], unless the same features were scored
+            # by the current model before. One snapshot both scores and versions the cached
+            # prediction, so a reload in between cannot cache a score under another version
+            features = [gre, toefl, univ_rating, sop, lor, gpa, research]
+            key = feature_key(features)
+            with STAGE_SECONDS.time(stage='model_load'):
+                model = registry.model
+            with STAGE_SECONDS.time(stage='score'):
+                pred = predictions.get(key, model.version)
+                if pred is None:
+                    pred = float(score(model, features))
+                    predictions.put(key, model.version, pred)
 
             # add record to database
-            app = Applications(gre=gre, toefl=toefl, univ_rating=univ_rating,
-                               sop=sop, lor=lor, cgpa=gpa, research=research,
-                               admit=pred)
-            db.session.add(app)
-            db.session.commit()
+            record = dict(gre=gre, toefl=toefl, univ_rating=univ_rating,
+                          sop=sop, lor=lor, cgpa=gpa, research=research,
+                          admit=pred)
+            if writer is not None:
+                try:
+                    with STAGE_SECONDS.time(stage='db_commit'):
+                        writer.put(record)
+                    latest.set(record)
+                    logger.debug("application queued for database")
+                    return redirect('/')
+                except queue.Full:
+                    logger.warning("Write-behind queue is full, adding application synchronously")
+            try:
+                with STAGE_SECONDS.time(stage='db_commit'), write_lock:
+                    app = Applications(**record)
+                    db.session.add(app)
+                    db.session.commit()
+            except Exception:
+                DB_FAILURES.inc(operation='insert')
+                db.session.rollback()
+                raise
+            latest.set(app.to_dict())
             logger.debug("application successfully added to database")
             return redirect('/')
         except ValueError:
+            ERRORS.inc(endpoint='index', reason='invalid_input')
             logger.warning("Please input valid application record")
             return redirect('/')
         except Exception as e:
+            ERRORS.inc(endpoint='index', reason='exception')
             logger.warning("Not able to add application to database, error page returned")
             logger.error(e)
             return render_template('error.html')
     else:
         try:
 
-            # Query the latest added application from database
-            app = db.session.query(Applications).order_by(Applications.id.desc()).first()
-            logger.info("queried latest record from database")
-            return render_template('index.html', pred=app)
+            # Serve the latest added application from cache, or query it from database
+            app = latest.get()
+            if app is None:
+                try:
+                    with STAGE_SECONDS.time(stage='db_query'):
+                        app = db.session.query(Applications).order_by(Applications.id.desc()).first()
+                except Exception:
+                    DB_FAILURES.inc(operation='query')
+                    raise
+                logger.info("queried latest record from database")
+                if app is not None:
+                    latest.set(app.to_dict())
+            with STAGE_SECONDS.time(stage='render'):
+                return render_template('index.html', pred=app)
 
         except Exception as e:
+            ERRORS.inc(endpoint='index', reason='exception')
             logger.warning("Not able to query application prediction, error page returned")
             logger.error(e)
             return render_template('error.html')
 
 
+@app.route('/history', methods=['GET'])
+def history():
+    """View that pages through past predictions, newest first.
+
+    Uses keyset pagination on the application id: the `before` query parameter is the
+    id cursor returned by the previous page, so every page is an index range scan of at
+    most `MAX_ROWS_SHOW` rows however deep it is.
+
+    Returns:
+        rendered html template: app/templates/history.html
+
+    """
+
+    try:
+        before = request.args.get('before', type=int)
+        limit = request.args.get('limit', app.config["MAX_ROWS_SHOW"], type=int)
+        limit = max(1, min(limit, app.config["MAX_ROWS_SHOW"]))
+
+        query = db.session.query(Applications)
+        if before is not None:
+            query = query.filter(Applications.id < before)
+        apps = query.order_by(Applications.id.desc()).limit(limit).all()
+
+        # Only offer a next page when this one is full
+        cursor = apps[-1].id if len(apps) == limit else None
+        logger.info("queried {} records before id {}".format(len(apps), before))
+        return render_template('history.html', apps=apps, cursor=cursor, limit=limit)
+
+    except Exception as e:
+        ERRORS.inc(endpoint='history', reason='exception')
+        logger.warning("Not able to query application history, error page returned")
+        logger.error(e)
+        return render_template('error.html')
+
+
+@app.route('/stats', methods=['GET'])
+def stats():
+    """API that summarizes the logged predictions of chance of admit.
+
+    The aggregation runs inside the database, only the grouped counts are fetched.
+
+    Returns:
+        json: count, mean, std, min, max, percentiles and histogram of admit
+        json error, 500: when the database cannot be queried
+
+    """
+
+    try:
+        with STAGE_SECONDS.time(stage='db_query'):
+            result = admit_stats(db.session, app.config["STATS_BINS"], app.config["STATS_PERCENTILES"])
+        logger.info("aggregated {} records".format(result['count']))
+        return jsonify(result)
+    except Exception as e:
+        DB_FAILURES.inc(operation='stats')
+        ERRORS.inc(endpoint='stats', reason='exception')
+        logger.warning("Not able to aggregate application statistics, error returned")
+        logger.error(e)
+        return jsonify(error="Not able to aggregate application statistics"), 500
+
+
+@app.route('/predict/batch', methods=['POST'])
+def predict_batch():
+    """API that scores a batch of applicants at once.
+
+    Takes a JSON array of applicants keyed by the `config.Columns` feature names, a JSON
+    Lines upload (Content-Type: application/x-ndjson) of such applicants, or a csv upload
+    (Content-Type: text/csv) with those columns. A JSON array is parsed whole, up to
+    `BATCH_JSON_MAX_BYTES`, and scored with one matrix multiply; JSON Lines and csv uploads
+    are read and scored chunk by chunk so memory stays bounded by `BATCH_CHUNK_SIZE`.
+
+    Returns:
+        streamed NDJSON response: one {"row", "admit"} object per applicant
+        json error, 400: when the batch is malformed
+        json error, 413: when a JSON array is larger than `BATCH_JSON_MAX_BYTES`
+
+    """
+
+    chunksize = app.config["BATCH_CHUNK_SIZE"]
+    max_bytes = app.config["BATCH_JSON_MAX_BYTES"]
+    columns = config.Columns
+
+    try:
+        if request.mimetype in ('text/csv', 'application/x-ndjson', 'application/jsonl'):
+            if request.mimetype == 'text/csv':
+                chunks = batch.csv_features(request.stream, columns, chunksize)
+            else:
+                chunks = batch.jsonl_features(request.stream, columns, chunksize)
+            # Read the first chunk now so that a malformed upload is rejected up front
+            first = next(chunks, None)
+            head = [] if first is None else [registry.predict(first)]
+            preds = itertools.chain(head, (registry.predict(X) for X in chunks))
+        else:
+            # A JSON array is parsed whole: refuse bodies beyond the limit, without reading past it
+            too_large = (request.content_length or 0) > max_bytes
+            body = b'' if too_large else request.stream.read(max_bytes + 1)
+            if too_large or len(body) > max_bytes:
+                ERRORS.inc(endpoint='predict_batch', reason='too_large')
+                logger.warning("JSON batch larger than {} bytes refused".format(max_bytes))
+                return jsonify(error="JSON batches are limited to {} bytes, send larger batches as csv "
+                                     "or JSON Lines".format(max_bytes)), 413
+            X = batch.json_features(json.loads(body), columns)
+            pred = registry.predict(X)
+            preds = (pred[i:i + chunksize] for i in range(0, len(pred), chunksize))
+    except Exception as e:
+        ERRORS.inc(endpoint='predict_batch', reason='invalid_input')
+        logger.warning("Not able to score batch, error returned")
+        logger.error(e)
+        return jsonify(error=str(e)), 400
+
+    def generate():
+        row = 0
+        try:
+            for pred in preds:
+                yield batch.ndjson_lines(pred, row)
+                row += len(pred)
+        except Exception as e:
+            ERRORS.inc(endpoint='predict_batch', reason='exception')
+            logger.warning("Batch scoring stopped at row {}".format(row))
+            logger.error(e)
+            yield json.dumps({'error': str(e)}) + '\n'
+
+    logger.info("Scoring batch of applicants")
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+
+@app.route('/metrics', methods=['GET'])
+def metrics_view():
+    """Expose request, stage latency, database pool and cache metrics.
+
+    Metrics are kept per process; with several workers each one reports its own.
+
+    Returns:
+        text response: metrics in the Prometheus text exposition format
+
+    """
+
+    return Response(metrics.render(METRICS), mimetype='text/plain; version=0.0.4')
+
+
 if __name__ == '__main__':
     app.run(debug=app.config["DEBUG"], port=app.config["PORT"], host=app.config["HOST"])
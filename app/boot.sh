@@ -1,3 +1,7 @@
 #!/usr/bin/env bash
 python3 run.py
-python3 app.py
\ No newline at end of file
+if [ "$SERVING_MODE" = "production" ]; then
+    exec gunicorn --config config/gunicorn_config.py app:app
+else
+    python3 app.py
+fi
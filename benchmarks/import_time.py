@@ -0,0 +1,74 @@
+"""Measure the import time of each pipeline stage
+
+Imports every stage module in a fresh interpreter with `python -X importtime` and reports
+the total import time of the stage and the heaviest top-level packages it pulls in. Run
+from the root of the repository:
+
+    python benchmarks/import_time.py --stages clean model_selection train_model --output import_time.json
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+STAGES = ['acquire', 's3', 'clean', 'model_selection', 'train_model', 'application_db']
+
+
+def import_time(module, root='.'):
+    """Import `module` in a fresh interpreter and parse its `-X importtime` report
+
+    Args:
+        module (`str`): module to import, from src/
+        root (`str`): root of the repository
+
+    Returns:
+        seconds (`float`): cumulative import time of the module
+        packages (`dict`): top-level package name to the time spent importing it for the module
+    """
+
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join([os.path.join(root, 'src'), os.path.join(root, 'config')])
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import {}'.format(module)],
+                          cwd=root, env=env, stderr=subprocess.PIPE, universal_newlines=True)
+    if proc.returncode != 0:
+        raise RuntimeError("Importing {} failed:\n{}".format(module, proc.stderr[-2000:]))
+
+    seconds = 0.0
+    packages = {}
+    for line in proc.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package, indented by nesting level
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip())) // 2
+        name = name.strip()
+        if depth == 0 and name == module:
+            seconds = int(cumulative) / 1e6
+        elif depth == 1:
+            # Direct imports of the module, lines are printed before their importer's
+            name = name.split('.')[0]
+            packages[name] = packages.get(name, 0) + int(cumulative) / 1e6
+
+    return seconds, packages
+
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description='Import time of the pipeline stages.')
+    parser.add_argument('--stages', nargs='+', default=STAGES, help='Stage modules to import')
+    parser.add_argument('--top', type=int, default=5, help='Number of heaviest packages to show')
+    parser.add_argument('--output', default=None, help='Path of a JSON report to save')
+    args = parser.parse_args()
+
+    report = {}
+    for stage in args.stages:
+        seconds, packages = import_time(stage)
+        heaviest = sorted(packages.items(), key=lambda item: -item[1])[:args.top]
+        report[stage] = {'seconds': seconds, 'packages': dict(heaviest)}
+        print('{:>16} {:>8.3f}s  {}'.format(stage, report[stage]['seconds'],
+                                            ', '.join('{} {:.3f}s'.format(*item) for item in heaviest)))
+
+    if args.output is not None:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
@@ -0,0 +1,104 @@
+"""Benchmark concurrent inserts into the SQLite applications table
+
+Runs N writers, as threads or processes, that each insert records one transaction at a
+time like the request path of app.py. The default engine is compared with the concurrent
+write mode of `application_db.configure_sqlite`. Run from the root of the repository:
+
+    python benchmarks/sqlite_concurrency.py --writers 1 4 8 --rows 200 --mode process
+"""
+import argparse
+import logging
+import multiprocessing
+import os
+import queue
+import sys
+import tempfile
+import threading
+import time
+
+import sqlalchemy as sql
+
+sys.path.append('./src')
+import application_db
+
+logger = logging.getLogger(__name__)
+
+RECORD = dict(gre=320, toefl=110, univ_rating=4, sop=4.0, lor=4.0, cgpa=3.5, research=1, admit=0.87)
+
+
+def make_engine(engine_string, concurrent):
+    """Create an engine, and the lock that serializes its writers in this process"""
+
+    engine = sql.create_engine(engine_string)
+    if concurrent:
+        return engine, application_db.configure_sqlite(engine)
+    return engine, application_db.NullLock()
+
+
+def write(engine_string, concurrent, rows, results, engine=None, lock=None):
+    """Insert `rows` records one transaction at a time, counting failed inserts"""
+
+    if engine is None:
+        engine, lock = make_engine(engine_string, concurrent)
+    insert = application_db.Applications.__table__.insert()
+    failed = 0
+    for _ in range(rows):
+        try:
+            with lock, engine.begin() as conn:
+                conn.execute(insert, RECORD)
+        except sql.exc.OperationalError:
+            failed += 1
+    results.put(failed)
+
+
+def run(concurrent, writers, rows, mode):
+    """Time `writers` concurrent writers against a fresh database
+
+    Returns:
+        result (`dict`): inserted and failed rows, seconds and rows/sec
+    """
+
+    directory = tempfile.mkdtemp()
+    engine_string = 'sqlite:///{}'.format(os.path.join(directory, 'application.db'))
+    engine, lock = make_engine(engine_string, concurrent)
+    application_db.Base.metadata.create_all(engine)
+
+    if mode == 'thread':
+        results = queue.Queue()
+        workers = [threading.Thread(target=write, args=(engine_string, concurrent, rows, results, engine, lock))
+                   for _ in range(writers)]
+    else:
+        results = multiprocessing.Queue()
+        workers = [multiprocessing.Process(target=write, args=(engine_string, concurrent, rows, results))
+                   for _ in range(writers)]
+
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - start
+
+    failed = sum(results.get() for _ in workers)
+    inserted = engine.execute(sql.select([sql.func.count()])
+                              .select_from(application_db.Applications.__table__)).scalar()
+    return {'inserted': inserted, 'failed': failed, 'seconds': elapsed, 'rows_per_sec': inserted / elapsed}
+
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description='SQLite concurrent write benchmark.')
+    parser.add_argument('--writers', type=int, nargs='+', default=[1, 2, 4, 8],
+                        help='Numbers of concurrent writers to benchmark')
+    parser.add_argument('--rows', type=int, default=200, help='Rows inserted by each writer')
+    parser.add_argument('--mode', choices=['thread', 'process'], default='process',
+                        help='Run writers as threads of one process or as separate processes')
+    args = parser.parse_args()
+
+    print('{:>8} {:>12} {:>9} {:>7} {:>9} {:>10}'.format('writers', 'engine', 'inserted', 'failed',
+                                                         'seconds', 'rows/sec'))
+    for writers in args.writers:
+        for name, concurrent in [('default', False), ('concurrent', True)]:
+            result = run(concurrent, writers, args.rows, args.mode)
+            print('{:>8} {:>12} {:>9} {:>7} {:>9.2f} {:>10.0f}'.format(
+                writers, name, result['inserted'], result['failed'], result['seconds'], result['rows_per_sec']))
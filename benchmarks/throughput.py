@@ -0,0 +1,338 @@
+"""Benchmark the throughput and memory of the pipeline stages on synthetic applicants
+
+Generates applicants following `config.Columns`, `config.Target` and `config.Schema`, with
+marginals and correlations close to the admission data, and times on each size:
+
+    featurize      clean.featurize of the CGPA column
+    write_csv      clean.write_csv of the clean data
+    cv             model_selection.cv_models of the chosen candidates on config.model_cv_params
+    train_model    train_model.train_model
+    score_row      ModelRegistry.predict of one applicant, the bare model of the form of app.py
+    score_batch    ModelRegistry.predict of every applicant, the bare model of /predict/batch
+    post_form      POST / of one applicant through the Flask test client, as many as applicants
+                   up to a thousand: form parsing, prediction cache, model and database insert
+    post_batch     POST /predict/batch of every applicant as csv, with the streamed response read
+
+The post stages serve the model of `MODEL_CSV_PATH` from a temporary SQLite database, with
+the write-behind buffer as `WRITE_BEHIND` configures it, and start each run with an empty
+prediction cache so that every applicant is scored.
+
+Each stage reports the best seconds of `--repeat` runs, rows per second and the peak memory
+it allocated, traced in a separate run. Save the report as a baseline, and compare a later
+run against it to flag the stages whose throughput dropped or whose memory grew beyond
+`--tolerance`. Run from the root of the repository:
+
+    python benchmarks/throughput.py --rows 1000 100000 10000000 --output baseline.json
+    python benchmarks/throughput.py --rows 1000 100000 10000000 --baseline baseline.json
+
+The script exits with status 1 when a regression is flagged.
+"""
+import argparse
+import atexit
+import gc
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+sys.path.append('.')
+sys.path.append('./src')
+sys.path.append('./config')
+import config
+import clean
+import model_selection
+import train_model
+from model_registry import ModelRegistry
+from application_db import create_db
+
+STAGES = ['featurize', 'write_csv', 'cv', 'train_model', 'score_row', 'score_batch', 'post_form', 'post_batch']
+APP_STAGES = ['post_form', 'post_batch']
+
+# Inputs of the form of app.py, in the order of config.Columns
+FORM_FIELDS = ['gre', 'toefl', 'univ_rating', 'sop', 'lor', 'gpa', 'research']
+
+# Mean, standard deviation and loading on a shared "strength" factor of each column,
+# close to the public admission data the pipeline is trained on
+MOMENTS = {'GRE Score': (316.5, 11.3, 0.85),
+           'TOEFL Score': (107.2, 6.1, 0.83),
+           'University Rating': (3.1, 1.1, 0.75),
+           'SOP': (3.4, 1.0, 0.72),
+           'LOR ': (3.5, 0.9, 0.67),
+           'CGPA': (8.6, 0.6, 0.92),
+           'Research': (0.56, None, 0.60),
+           'Chance of Admit ': (0.72, 0.14, 0.95)}
+
+
+def synthetic_applicants(rows, random_state=1995, schema=None):
+    """Generate raw applicants in the layout of the admission data
+
+    Columns are drawn from a one-factor gaussian model, then rounded to the precision of
+    the raw data and clipped to the bounds of the schema, so that every row is valid.
+
+    Args:
+        rows (`int`): number of applicants
+        random_state (`int`): seed of the generator
+        schema (`dict`): column name to its dtype and bounds, `config.Schema` if None
+
+    Returns:
+        df (`DataFrame`): applicants with a serial number, `config.Columns` and `config.Target`
+    """
+
+    schema = config.Schema if schema is None else schema
+    rng = np.random.RandomState(random_state)
+    factor = rng.standard_normal(rows)
+
+    df = pd.DataFrame({'Serial No.': np.arange(1, rows + 1)})
+    for column in config.Columns + [config.Target]:
+        mean, std, loading = MOMENTS[column]
+        z = loading * factor + np.sqrt(1 - loading ** 2) * rng.standard_normal(rows)
+        if std is None:
+            # Binary column, true for the share `mean` of the applicants
+            values = (z > np.percentile(z, 100 * (1 - mean))).astype(np.float64)
+        else:
+            values = mean + std * z
+        rule = schema[column]
+        if 'min' in rule or 'max' in rule:
+            values = np.clip(values, rule.get('min'), rule.get('max'))
+        if rule['dtype'].startswith('int'):
+            df[column] = np.rint(values).astype(rule['dtype'])
+        else:
+            # Ratings are in halves, grades and chances in hundredths
+            df[column] = np.round(values * 2) / 2 if column in ('SOP', 'LOR ') else np.round(values, 2)
+
+    return df
+
+
+_server = None
+
+
+def _app():
+    """The app.py module, serving an empty SQLite database in a temporary directory
+
+    app.py binds its database when it is imported, so the database is shared by every
+    benchmark of this process and truncated on each call.
+    """
+
+    global _server
+    if _server is None:
+        directory = tempfile.mkdtemp()
+        atexit.register(shutil.rmtree, directory, True)
+        os.environ['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + os.path.join(directory, 'application.db')
+        import app
+        _server = app
+    create_db(_server.app.config['SQLALCHEMY_DATABASE_URI'], True)
+
+    return _server
+
+
+def _post_form(server, forms):
+    """POST every form to / of the app, starting from an empty prediction cache"""
+
+    server.predictions = server.PredictionCache(server.app.config['PREDICTION_CACHE_SIZE'])
+    client = server.app.test_client()
+    for form in forms:
+        response = client.post('/', data=form)
+        # The app redirects once the application is added, and renders its error page otherwise
+        if response.status_code != 302:
+            raise RuntimeError("POST / failed with status {}".format(response.status_code))
+
+
+def _post_batch(server, body):
+    """POST a csv batch to /predict/batch of the app and read the whole streamed response"""
+
+    server.predictions = server.PredictionCache(server.app.config['PREDICTION_CACHE_SIZE'])
+    response = server.app.test_client().post('/predict/batch', data=body, content_type='text/csv')
+    lines = response.get_data()
+    if response.status_code != 200 or lines.rstrip().rsplit(b'\n', 1)[-1].startswith(b'{"error"'):
+        raise RuntimeError("POST /predict/batch failed: {}".format(lines[-200:].decode()))
+
+    return lines
+
+
+def _best_time(func, repeat):
+    """Best wall time of `repeat` calls of `func`, and the result of the last one"""
+
+    best = None
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    return best, result
+
+
+def _peak_memory(func):
+    """Peak memory allocated while running `func`, in MB"""
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return peak / 2 ** 20
+
+
+def benchmark(rows, models, stages=STAGES, repeat=3, memory=True, n_jobs=None, random_state=1995):
+    """Time every stage on `rows` synthetic applicants
+
+    Args:
+        rows (`int`): number of applicants
+        models (`list of str`): names of `config.Model_Candidates` to cross validate
+        stages (`list of str`): stages to time, of `STAGES`
+        repeat (`int`): timed runs of each stage, the best is kept
+        memory (`bool`): trace the peak memory of each stage in one more run
+        n_jobs (`int`): processes of the cross validation
+        random_state (`int`): seed of the synthetic data
+
+    Returns:
+        results (`dict`): stage name to its `seconds`, `rows_per_second` and `peak_mb`
+    """
+
+    raw = synthetic_applicants(rows, random_state)
+    directory = tempfile.mkdtemp()
+    try:
+        featurized = clean.featurize(raw[config.Columns + [config.Target]].copy(), config.Transform_col)
+        X = featurized[config.Columns]
+        y = featurized[config.Target]
+        candidates = model_selection.load_candidates({name: config.Model_Candidates[name] for name in models})
+        estimators = {name: estimator for name, (estimator, _, _) in candidates.items()}
+        lr = train_model.train_model(X, y)
+        csv_path = os.path.join(directory, 'model.csv')
+        train_model.save_model(lr, config.Columns, csv_path, None)
+        registry = ModelRegistry(csv_path)
+        X_raw = raw[config.Columns].values
+        row = X_raw[0]
+        single = min(rows, 1000)
+        server = _app() if set(APP_STAGES) & set(stages) else None
+        forms = [dict(zip(FORM_FIELDS, values)) for values in X_raw[:single].tolist()]
+        body = raw[config.Columns].to_csv(index=False).encode() if 'post_batch' in stages else None
+
+        funcs = {'featurize': (lambda: clean.featurize(raw[config.Columns + [config.Target]].copy(),
+                                                        config.Transform_col), rows),
+                  'write_csv': (lambda: clean.write_csv(featurized, os.path.join(directory, 'clean.csv')), rows),
+                  'cv': (lambda: model_selection.cv_models(X, y, estimators, config.model_cv_params,
+                                                           config.model_scoring, n_jobs), rows),
+                  'train_model': (lambda: train_model.train_model(X, y), rows),
+                  # One applicant per call, as many calls as applicants up to a thousand
+                  'score_row': (lambda: [registry.predict(row) for _ in range(single)], single),
+                  'score_batch': (lambda: registry.predict(X_raw), rows),
+                  'post_form': (lambda: _post_form(server, forms), single),
+                  'post_batch': (lambda: _post_batch(server, body), rows)}
+
+        results = {}
+        for stage in stages:
+            func, scored = funcs[stage]
+            seconds, _ = _best_time(func, repeat)
+            results[stage] = {'seconds': seconds, 'rows_per_second': scored / seconds if seconds > 0 else None}
+            if memory:
+                results[stage]['peak_mb'] = _peak_memory(func)
+            print('{:>12} {:>10} {:>10.3f}s {:>14.0f} rows/s {:>10}'.format(
+                stage, rows, seconds, results[stage]['rows_per_second'] or 0,
+                '{:.1f}MB'.format(results[stage]['peak_mb']) if memory else ''))
+    finally:
+        shutil.rmtree(directory)
+
+    return results
+
+
+def environment():
+    """Versions and hardware the benchmark ran on, a baseline is only comparable on the same"""
+
+    import sklearn
+
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                                universal_newlines=True).stdout.strip() or None
+    except OSError:
+        commit = None
+
+    return {'commit': commit, 'python': platform.python_version(), 'numpy': np.__version__,
+            'pandas': pd.__version__, 'sklearn': sklearn.__version__, 'machine': platform.machine(),
+            'cpus': os.cpu_count(), 'created': time.time()}
+
+
+def compare(report, baseline, tolerance=0.2, min_seconds=0.05):
+    """Stages whose throughput dropped or whose peak memory grew by more than `tolerance`
+
+    Args:
+        report (`dict`): report of this run
+        baseline (`dict`): report of a previous run
+        tolerance (`float`): relative change ignored as noise
+        min_seconds (`float`): stages faster than this in the baseline are too noisy to flag a throughput drop
+
+    Returns:
+        regressions (`list of dict`): stage, rows, metric, baseline and current values
+    """
+
+    regressions = []
+    for rows, stages in report['results'].items():
+        for stage, result in stages.items():
+            previous = baseline['results'].get(rows, {}).get(stage)
+            if previous is None:
+                continue
+            checks = [('rows_per_second', lambda old, new: new < old * (1 - tolerance) and
+                       previous['seconds'] >= min_seconds),
+                      # Allocations of a few MB are dominated by the interpreter, not the stage
+                      ('peak_mb', lambda old, new: new > old * (1 + tolerance) and new - old > 1)]
+            for metric, worse in checks:
+                old, new = previous.get(metric), result.get(metric)
+                if old is not None and new is not None and worse(old, new):
+                    regressions.append({'stage': stage, 'rows': int(rows), 'metric': metric,
+                                        'baseline': old, 'current': new})
+
+    return regressions
+
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description='Throughput and memory of the pipeline stages.')
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000, 100000, 10000000],
+                        help='Numbers of synthetic applicants')
+    parser.add_argument('--stages', nargs='+', default=STAGES, choices=STAGES, help='Stages to time')
+    parser.add_argument('--models', nargs='+', default=['linear', 'lasso'],
+                        help='Candidates of config.Model_Candidates to cross validate')
+    parser.add_argument('--repeat', type=int, default=3, help='Timed runs of each stage, the best is kept')
+    parser.add_argument('--no-memory', dest='memory', action='store_false', help='Skip tracing peak memory')
+    parser.add_argument('--n-jobs', type=int, default=None, help='Processes of the cross validation')
+    parser.add_argument('--output', default=None, help='Path of the JSON report to save as a baseline')
+    parser.add_argument('--baseline', default=None, help='Path of a JSON baseline to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='Relative change flagged as a regression')
+    parser.add_argument('--min-seconds', type=float, default=0.05,
+                        help='Stages faster than this in the baseline are not flagged for throughput')
+    args = parser.parse_args()
+
+    print('{:>12} {:>10} {:>11} {:>21} {:>10}'.format('stage', 'rows', 'seconds', 'throughput', 'memory'))
+    report = {'environment': environment(), 'results': {}}
+    for rows in args.rows:
+        report['results'][str(rows)] = benchmark(rows, args.models, args.stages, args.repeat, args.memory,
+                                               args.n_jobs)
+
+    if args.output is not None:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline is not None:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline['environment'].get('cpus') != report['environment']['cpus']:
+            print('Baseline ran on {} CPUs, this run on {}'.format(baseline['environment'].get('cpus'),
+                                                                   report['environment']['cpus']))
+        regressions = compare(report, baseline, args.tolerance, args.min_seconds)
+        for regression in regressions:
+            print('REGRESSION {stage} at {rows} rows: {metric} {baseline:.4g} -> {current:.4g}'.format(**regression))
+        if regressions:
+            sys.exit(1)
+        print('No regression against {} (commit {})'.format(args.baseline, baseline['environment'].get('commit')))
@@ -13,29 +13,85 @@ Path_To_Local_Raw_File = './data/admission.csv'
 MYSQL_CONN_TYPE = 'mysql+pymysql'
 DATABASE_PATH = '/app/data/application.db'
 SQLALCHEMY_ENGINE_STRING = 'sqlite:////{}'.format(DATABASE_PATH)
+Ingest_Batch_Size = 10000
+Ingest_Columns = {'GRE Score': 'gre',
+                  'TOEFL Score': 'toefl',
+                  'University Rating': 'univ_rating',
+                  'SOP': 'sop',
+                  'LOR ': 'lor',
+                  'CGPA': 'cgpa',
+                  'Research': 'research',
+                  'Chance of Admit ': 'admit'
+                  }
 
 # Clean Data config
 Columns = ['GRE Score', 'TOEFL Score', 'University Rating', 'SOP', 'LOR ', 'CGPA', 'Research']
 Target = 'Chance of Admit '
 fig_direcotry = './figures'
+Eda_Workers = None  # Processes rendering EDA plots, None uses every CPU
 Transform_col = 'CGPA'
 Path_To_Clean_File = './data/clean.csv'
+Path_To_Clean_Columnar = './data/clean'
+Path_To_Preprocess = './data/preprocess.json'  # Fitted CGPA scaling, copied next to the final model
+Clean_Format = 'npy'  # 'npy' shares the clean data as memory-mapped columns, 'csv' as text
+Export_Clean_CSV = True  # Also write Path_To_Clean_File when Clean_Format is 'npy'
+Clean_Chunk_Size = None  # Rows per chunk to stream the raw data, None cleans it in memory
+Path_To_Quarantine = './data/quarantine.csv'  # Rejected raw rows, with the reasons they failed the schema
+Path_To_Profile = './data/profile.json'  # Statistics of the valid raw rows, the EDA plots are drawn from it
+Profile_Bins = 10  # Histogram bins of a column, between the bounds of its schema
+
+# Valid raw rows: every column is required, numeric and cast to its dtype once validated
+Schema = {'GRE Score': {'dtype': 'int64', 'min': 260, 'max': 340},
+          'TOEFL Score': {'dtype': 'int64', 'min': 0, 'max': 120},
+          'University Rating': {'dtype': 'int64', 'min': 1, 'max': 5},
+          'SOP': {'dtype': 'float64', 'min': 1, 'max': 5},
+          'LOR ': {'dtype': 'float64', 'min': 1, 'max': 5},
+          'CGPA': {'dtype': 'float64', 'min': 0, 'max': 10},
+          'Research': {'dtype': 'int64', 'allowed': [0, 1]},
+          'Chance of Admit ': {'dtype': 'float64', 'min': 0, 'max': 1}
+          }
 
 # Model Selection config
 split_params = {"test_size": 0.25,
                 "random_state": 1995
                 }
-model_params_r2 = {"scoring": 'r2',
-                   'random_state': 1995,
+model_cv_params = {'random_state': 1995,
                    "test_size": 0.3,
                    "cv": 3
                    }
-model_params_rmse = {"scoring": 'neg_mean_squared_error',
-                     'random_state': 1995,
-                     "test_size": 0.3,
-                     "cv": 3
-                     }
+model_scoring = {'r2': 'r2',
+                 'mse': 'neg_mean_squared_error'
+                 }
+Selection_N_Jobs = -1  # Processes fitting the folds of every model, -1 uses every CPU
+# Candidates compared by model selection: estimator class, fixed parameters and search space,
+# where a list gives the values to choose from and a dict a distribution between low and high.
+# A Lasso or ElasticNet with a path is searched along its regularization path instead: n_alphas
+# from the smallest alpha zeroing every coefficient down to eps times it, for each l1_ratio
+Model_Candidates = {'linear': {'model': 'sklearn.linear_model.LinearRegression',
+                               'params': {},
+                               'search': {}},
+                    'lasso': {'model': 'sklearn.linear_model.Lasso',
+                              'params': {},
+                              'search': {},
+                              'path': {'n_alphas': 100, 'eps': 1e-4}},
+                    'enet': {'model': 'sklearn.linear_model.ElasticNet',
+                             'params': {},
+                             'search': {},
+                             'path': {'n_alphas': 100, 'eps': 1e-4, 'l1_ratio': [0.1, 0.5, 0.9]}},
+                    'rf': {'model': 'sklearn.ensemble.RandomForestRegressor',
+                           'params': {'random_state': 1995},
+                           'search': {'n_estimators': [50, 100, 200],
+                                      'max_depth': [None, 4, 8, 16],
+                                      'min_samples_leaf': [1, 2, 5, 10],
+                                      'max_features': [1.0, 0.5, 'sqrt']}}
+                    }
+Search_Iterations = 10  # Settings sampled per candidate, the search budget
+Search_Refit_Metric = 'r2'  # Metric of model_scoring selecting the best setting of a candidate
 Selection_Perform_Path = './models/model selection.csv'
+Selection_Path_Scores_Path = './models/model selection path.csv'  # Mean scores of every alpha of the paths
+# Cross validation results keyed by training set, model, hyperparameters and CV settings, None disables it
+Selection_Cache_Directory = './.selection_cache'
+Selection_Cache_Bytes = 256 * 2 ** 20  # Size bound, the least recently used results are evicted beyond it
 
 # Train model config
 Random_state = 1995
@@ -43,3 +99,47 @@ Feature_Plot_Name = 'feature_importance.png'
 Final_Mode_Eval_Path = './models/final model metric.csv'
 Model_CSV_Path = './models/final model.csv'
 Model_Pickle_Path = './models/final model.pkl'
+Model_Preprocess_Path = './models/preprocess.json'
+Train_Chunk_Size = None  # Rows per chunk to train out of core from X'X and X'y, None trains in memory
+Train_N_Jobs = -1  # Processes accumulating partitions of the columnar data out of core, -1 uses every CPU
+
+# Pipeline runner config
+Pipeline_Cache_Directory = './.pipeline_cache'  # Outputs of each stage, addressed by fingerprint
+Pipeline_Cache_Keep = 3  # Cached fingerprints kept per stage, the least recently used are evicted
+Pipeline_Report_Path = path.join(Pipeline_Cache_Directory, 'report.json')  # Status of each stage of the last run
+_Clean_Data = Path_To_Clean_Columnar if Clean_Format == 'npy' else Path_To_Clean_File
+# A stage is rerun when its script or sources, its inputs or one of its config values change,
+# and a run only succeeds when it writes every one of its outputs
+Pipeline_Stages = [
+    {'name': 'acquire',
+     'script': './src/acquire.py',
+     'sources': [],
+     'inputs': [],
+     'outputs': [Path_To_Local_Raw_File],
+     'config': ['Bucket_Name', 'S3_Filename', 'Path_To_Local_Raw_File']},
+    {'name': 'clean',
+     'script': './src/clean.py',
+     'sources': ['./src/columnar.py'],
+     'inputs': [Path_To_Local_Raw_File],
+     'outputs': ([Path_To_Clean_Columnar] if Clean_Format == 'npy' else []) +
+                ([Path_To_Clean_File] if Clean_Format == 'csv' or Export_Clean_CSV else []) +
+                [Path_To_Preprocess, Path_To_Quarantine, Path_To_Profile],
+     'config': ['Columns', 'Target', 'Transform_col', 'Schema', 'Clean_Format', 'Export_Clean_CSV',
+                'Clean_Chunk_Size', 'fig_direcotry', 'Profile_Bins']},
+    {'name': 'model_selection',
+     'script': './src/model_selection.py',
+     'sources': ['./src/columnar.py', './src/fast_cv.py', './src/cv_cache.py'],
+     'inputs': [_Clean_Data],
+     'outputs': [Selection_Perform_Path] +
+                ([Selection_Path_Scores_Path] if any('path' in c for c in Model_Candidates.values()) else []),
+     'config': ['Columns', 'Target', 'split_params', 'model_cv_params', 'model_scoring', 'Selection_N_Jobs',
+                'Model_Candidates', 'Search_Iterations', 'Search_Refit_Metric']},
+    {'name': 'train_model',
+     'script': './src/train_model.py',
+     'sources': ['./src/columnar.py', './src/fast_cv.py'],
+     'inputs': [_Clean_Data, Path_To_Preprocess],
+     'outputs': [Model_CSV_Path, Model_Pickle_Path, Model_Preprocess_Path, Final_Mode_Eval_Path] +
+                # Out of core training does not plot the feature importance
+                ([path.join(fig_direcotry, Feature_Plot_Name)] if Train_Chunk_Size is None else []),
+     'config': ['Columns', 'Target', 'split_params', 'Random_state', 'Train_Chunk_Size']},
+]
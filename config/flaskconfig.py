@@ -6,7 +6,36 @@ APP_NAME = "applications"
 SQLALCHEMY_TRACK_MODIFICATIONS = True
 HOST = "0.0.0.0"
 SQLALCHEMY_ECHO = False  # If true, SQL for queries made will be printed
-MAX_ROWS_SHOW = 100
+MAX_ROWS_SHOW = 100  # Page size cap of the /history view
+STATS_BINS = 10  # Histogram bins over [0,1] reported by /stats
+STATS_PERCENTILES = [5, 25, 50, 75, 95]  # Percentiles of chance of admit reported by /stats
+
+# Production serving mode (app/boot.sh with SERVING_MODE=production), see gunicorn_config.py
+WORKERS = int(os.environ.get('WORKERS', 4))  # Pre-forked worker processes
+WORKER_TIMEOUT = 30  # Workers silent for this many seconds are killed and restarted
+GRACEFUL_TIMEOUT = 30  # Seconds workers get to finish requests on reload or shutdown
+MAX_REQUESTS = 10000  # Requests served before a worker is recycled
+MAX_REQUESTS_JITTER = 1000  # Random spread of MAX_REQUESTS so workers do not recycle together
+
+# Model serving
+MODEL_CSV_PATH = './models/final model.csv'
+MODEL_PREPROCESS_PATH = './models/preprocess.json'  # Scaling of raw CGPA, folded into the coefficients
+MODEL_RELOAD_SECONDS = 5  # Interval between checks of the model artifact for changes
+BATCH_CHUNK_SIZE = 10000  # Applicants scored and streamed per chunk by /predict/batch
+BATCH_JSON_MAX_BYTES = 16 * 2 ** 20  # Largest JSON array body parsed at once, bigger batches use csv or JSON Lines
+PREDICTION_CACHE_SIZE = 4096  # Predictions kept in the LRU cache keyed on applicant features
+LATEST_CACHE_SECONDS = 30  # Time the latest application is served from the process-local cache
+
+# SQLite production mode: WAL journal and busy timeout on connect, one writer per process
+SQLITE_CONCURRENT_WRITES = True
+SQLITE_BUSY_TIMEOUT_MS = 5000  # Time a writer waits for the database lock before failing
+SQLITE_SYNCHRONOUS = 'NORMAL'  # fsync on checkpoints only, safe with WAL except on power loss
+
+# Write-behind persistence: queue predictions and bulk insert them from a background thread
+WRITE_BEHIND = os.environ.get('WRITE_BEHIND', 'false').lower() == 'true'
+WRITE_BEHIND_QUEUE_SIZE = 10000  # Records queued before requests fall back to synchronous inserts
+WRITE_BEHIND_BATCH_SIZE = 500  # Flush once this many records are queued
+WRITE_BEHIND_FLUSH_SECONDS = 1.0  # or once the oldest queued record waited this long
 
 # Connection string
 DB_HOST = os.environ.get('MYSQL_HOST')
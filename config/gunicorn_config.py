@@ -0,0 +1,41 @@
+"""Gunicorn settings of the production serving mode, read from flaskconfig.py
+
+Start with `gunicorn --config config/gunicorn_config.py app:app`. The app, and with it the
+model, is imported once in the master process before the workers are forked, so the
+workers share its memory copy-on-write. Send SIGHUP to the master to gracefully replace
+every worker, and SIGTERM to shut down after in-flight requests finish.
+"""
+import gc
+import sys
+
+sys.path.append('./config')
+import flaskconfig
+
+bind = '{}:{}'.format(flaskconfig.HOST, flaskconfig.PORT)
+workers = flaskconfig.WORKERS
+timeout = flaskconfig.WORKER_TIMEOUT
+graceful_timeout = flaskconfig.GRACEFUL_TIMEOUT
+max_requests = flaskconfig.MAX_REQUESTS
+max_requests_jitter = flaskconfig.MAX_REQUESTS_JITTER
+preload_app = True
+logconfig = flaskconfig.LOGGING_CONFIG
+
+
+def when_ready(server):
+    # Keep the garbage collector from touching, and so copying, objects loaded in the master
+    if hasattr(gc, 'freeze'):
+        gc.freeze()
+
+
+def post_fork(server, worker):
+    # Database connections must not be shared with the master or other workers
+    app = sys.modules['app']
+    with app.app.app_context():
+        app.db.engine.dispose()
+
+
+def worker_exit(server, worker):
+    # Flush predictions still queued by the write-behind buffer of this worker
+    app = sys.modules['app']
+    if app.writer is not None:
+        app.writer.close()
@@ -1,11 +1,5 @@
-# Acquire raw data from S3 bucket
-python3 ./src/acquire.py
-
-# clean data set, Generate features
-python3 ./src/clean.py
-
-# Try different models
-python3 ./src/model_selection.py
-
-# Train model
-python3 ./src/train_model.py
+# Acquire raw data from S3 bucket, clean data set and generate features, try different models
+# and train the final model. Stages whose script, inputs and config did not change since their
+# outputs were cached are skipped; pass --force to rerun every stage, or --force <stage> ...
+# The raw data on S3 is not fingerprinted, rerun acquire with --force acquire to pull it again.
+python3 ./src/pipeline.py "$@"
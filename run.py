@@ -2,8 +2,9 @@ import argparse
 import logging
 import logging.config
 import sys
+import time
 
-from src.application_db import create_db
+from src.application_db import create_db, migrate_db, bulk_ingest
 
 
 sys.path.append('./config')
@@ -26,11 +27,29 @@ if __name__ == '__main__':
                         action="store_true",
                         help="If given, delete current records from tweet_scores table before create_all "
                              "so that table can be recreated without unique id issues ")
+    parser.add_argument("--ingest",
+                        "-i",
+                        default=None,
+                        help="Path to a csv of historical applications to bulk insert after create_all")
+    parser.add_argument("--batch-size",
+                        "-b",
+                        default=config.Ingest_Batch_Size,
+                        type=int,
+                        help="Number of rows inserted and committed per batch by --ingest")
     args = parser.parse_args()
 
     try:
         logger.info("Selected: {}".format(SQLALCHEMY_DATABASE_URI))
+        # An applications table created before the columns became numeric is converted on every
+        # start, app/boot.sh runs this before serving; a table already numeric is left as is
+        migrate_db(SQLALCHEMY_DATABASE_URI)
         create_db(SQLALCHEMY_DATABASE_URI, args.truncate)
+        if args.ingest is not None:
+            start = time.perf_counter()
+            rows = bulk_ingest(SQLALCHEMY_DATABASE_URI, args.ingest, config.Ingest_Columns, args.batch_size)
+            elapsed = time.perf_counter() - start
+            logger.info("Ingested {} rows from {} in {:.1f}s ({:.0f} rows/sec)"
+                        .format(rows, args.ingest, elapsed, rows / elapsed if elapsed else 0))
     except Exception as e:
         logger.error(e)
         sys.exit(1)
\ No newline at end of file
@@ -3,8 +3,6 @@ import os
 import logging
 import logging.config
 
-import boto3
-
 sys.path.append('./config')
 import config
 
@@ -13,13 +11,14 @@ ACCESS_KEY = os.environ.get("AWS_ACCESS_KEY_ID")
 SECRET_KEY = os.environ.get("AWS_SECRET_ACCESS_KEY")
 
 # Logger setup
-logging.config.fileConfig(config.LOGGING_CONFIG, disable_existing_loggers=False)
 logger = logging.getLogger(__file__)
 
 
 def pull_from_s3():
     """Pull raw data from S3 bucket"""
 
+    import boto3
+
     try:
         s3 = boto3.client('s3',
                           aws_access_key_id=ACCESS_KEY,
@@ -39,6 +38,8 @@ def pull_from_s3():
 if __name__ == "__main__":
     """Pull raw data from S3 bucket"""
 
+    logging.config.fileConfig(config.LOGGING_CONFIG, disable_existing_loggers=False)
+
     try:
         pull_from_s3()
     except Exception as e:
@@ -2,20 +2,23 @@ import logging
 import logging.config
 import os
 import sys
+import time
+import threading
 import argparse
 
+import pandas as pd
 import sqlalchemy as sql
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy import Column, Integer, String, MetaData
+from sqlalchemy import Column, Integer, Float, String, MetaData
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy import event
 import sqlite3
 
 sys.path.append('./config')
 import config
 
 
-# Logger set up
-logging.config.fileConfig(config.LOGGING_CONFIG, disable_existing_loggers=False)
+# Logger set up, configured by the entry point (run.py or app.py)
 logger = logging.getLogger(__name__)
 
 # Database set up
@@ -38,19 +41,66 @@ class Applications(Base):
 
     __tablename__ = 'applications'
 
+    # id is the primary key, hence already indexed
     id = Column(Integer, primary_key=True)
     gre = Column(Integer, unique=False, nullable = False)
     toefl = Column(Integer, unique=False, nullable = False)
     univ_rating = Column(Integer, unique=False, nullable = False)
-    sop = Column(String(100), unique=False, nullable = False)
-    lor = Column(String(100), unique=False, nullable = False)
-    cgpa = Column(String(100), unique=False, nullable = False)
+    sop = Column(Float, unique=False, nullable = False)
+    lor = Column(Float, unique=False, nullable = False)
+    cgpa = Column(Float, unique=False, nullable = False)
     research = Column(Integer, unique=False, nullable = False)
-    admit = Column(String(100), unique=False, nullable = False)
+    admit = Column(Float, unique=False, nullable = False, index=True)
 
     def __repr__(self):
         return '<Serial Number %r>' % self.id
 
+    def to_dict(self):
+        """Column values of the application as a dict"""
+
+        return {col.name: getattr(self, col.name) for col in self.__table__.columns}
+
+
+class NullLock:
+    """No-op stand-in for a lock when writes need no serialization"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+def configure_sqlite(engine, busy_timeout_ms=5000, synchronous='NORMAL'):
+    """Set up a SQLite engine for concurrent writers
+
+    Every new connection switches the database to the WAL journal, so readers no longer
+    block the writer, relaxes fsync to `synchronous`, and waits up to `busy_timeout_ms`
+    for the write lock instead of failing with "database is locked". SQLite still allows
+    only one writer at a time, so the returned lock serializes the inserts of this process;
+    other processes queue on the busy timeout.
+
+    Args:
+        engine (`Engine`): engine of a SQLite database
+        busy_timeout_ms (`int`): milliseconds to wait for the write lock
+        synchronous (`str`): PRAGMA synchronous level, NORMAL is durable with WAL except on power loss
+
+    Returns:
+        write_lock (`Lock`): lock to hold while writing to the database from this process
+    """
+
+    @event.listens_for(engine, 'connect')
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute('PRAGMA journal_mode=WAL')
+        cursor.execute('PRAGMA synchronous={}'.format(synchronous))
+        cursor.execute('PRAGMA busy_timeout={:d}'.format(busy_timeout_ms))
+        cursor.close()
+
+    logger.info("Configured SQLite for concurrent writes: WAL, synchronous=%s, busy_timeout=%sms",
+                synchronous, busy_timeout_ms)
+    return threading.Lock()
+
 
 def _truncate_applications(session):
     """Deletes tweet scores table if rerunning and run into unique key error."""
@@ -107,4 +157,139 @@ def create_db(engine_string, truncate):
     session.close()
 
 
+def migrate_db(engine_string):
+    """Migrate an applications table with text sop, lor, cgpa and admit columns to numeric types
+
+    The old table is renamed, the table is recreated from the `Applications` model with its
+    indexes, the records are copied over with their values cast to numbers, and the old table
+    is dropped.
+
+    Args:
+        engine_string (`str`): the user-selected database engine string
+
+    Returns:
+        migrated (`bool`): whether the table had to be migrated
+    """
+
+    engine = sql.create_engine(engine_string)
+    inspector = sql.inspect(engine)
+    if Applications.__tablename__ not in inspector.get_table_names():
+        logger.info("No applications table to migrate, creating it.")
+        Base.metadata.create_all(engine)
+        return False
+
+    types = {col['name']: col['type'] for col in inspector.get_columns(Applications.__tablename__)}
+    if not isinstance(types['admit'], sql.types.String):
+        logger.info("applications table already has numeric columns.")
+        return False
+
+    old_name = Applications.__tablename__ + '_old'
+    # MySQL commits DDL implicitly, so only SQLite runs the migration as one transaction
+    with engine.begin() as conn:
+        conn.execute('ALTER TABLE {} RENAME TO {}'.format(Applications.__tablename__, old_name))
+        Base.metadata.create_all(conn)
+        old = sql.Table(old_name, MetaData(), autoload=True, autoload_with=conn)
+        table = Applications.__table__
+        select = sql.select([sql.cast(old.c[col.name], col.type) for col in table.columns])
+        conn.execute(table.insert().from_select([col.name for col in table.columns], select))
+        old.drop(conn)
+
+    logger.info("Migrated applications table to numeric columns.")
+    return True
+
+
+def admit_stats(session, bins=10, percentiles=(5, 25, 50, 75, 95)):
+    """Aggregate the predicted chance of admit inside the database
+
+    Predictions are rounded to two decimals and kept in [0,1], so grouping them by their
+    rounded value returns at most 101 rows however many applications are logged. Count,
+    mean, spread and range are computed by the database; percentiles and the histogram
+    are derived from the grouped counts.
+
+    Args:
+        session (`Session`): database session
+        bins (`int`): number of equal-width histogram bins over [0,1]
+        percentiles (`list of float`): percentiles to report, nearest-rank
+
+    Returns:
+        stats (`dict`): count, mean, std, min, max, percentiles and histogram of admit
+    """
+
+    admit = Applications.admit
+    count, mean, mean_sq, low, high = session.query(
+        sql.func.count(admit), sql.func.avg(admit), sql.func.avg(admit * admit),
+        sql.func.min(admit), sql.func.max(admit)).one()
+
+    stats = {'count': count, 'mean': None, 'std': None, 'min': None, 'max': None,
+             'percentiles': {}, 'histogram': {'edges': [i / bins for i in range(bins + 1)],
+                                              'counts': [0] * bins}}
+    if not count:
+        return stats
+
+    stats['mean'] = float(mean)
+    stats['min'] = float(low)
+    stats['max'] = float(high)
+    stats['std'] = max(float(mean_sq) - float(mean) ** 2, 0.0) ** 0.5
+
+    rounded = sql.func.round(admit, 2)
+    groups = session.query(rounded, sql.func.count(admit)).group_by(rounded).order_by(rounded).all()
+
+    # Nearest-rank percentiles from the cumulative counts
+    ranks = sorted((max(1, -(-p * count // 100)), p) for p in percentiles)
+    cumulative = 0
+    for value, n in groups:
+        cumulative += n
+        while ranks and ranks[0][0] <= cumulative:
+            stats['percentiles']['p{:g}'.format(ranks.pop(0)[1])] = float(value)
+        i = min(max(int(float(value) * bins + 1e-9), 0), bins - 1)
+        stats['histogram']['counts'][i] += n
+
+    return stats
+
+
+def bulk_ingest(engine_string, csv_path, column_map, batch_size=10000):
+    """Stream historical applications from a csv into the applications table
+
+    The csv is read in chunks of `batch_size` rows and each chunk is inserted with one Core
+    executemany INSERT and committed, without building ORM objects. On MySQL, PyMySQL
+    rewrites the executemany into multi-row INSERT statements.
+
+    Args:
+        engine_string (`str`): the user-selected database engine string
+        csv_path (`str`): path to the csv of applications
+        column_map (`dict`): csv column name to applications column name
+        batch_size (`int`): number of rows per INSERT and per commit
+
+    Returns:
+        rows (`int`): number of rows inserted
+    """
+
+    engine = sql.create_engine(engine_string)
+    Base.metadata.create_all(engine)
+    table = Applications.__table__
+    columns = [col.name for col in table.columns if not col.primary_key]
+    insert = table.insert()
+
+    rows = 0
+    start = time.perf_counter()
+    with engine.connect() as conn:
+        for chunk in pd.read_csv(csv_path, chunksize=batch_size):
+            chunk = chunk.rename(columns=column_map)
+            missing = [col for col in columns if col not in chunk.columns]
+            if missing:
+                raise ValueError("Columns {} missing from {}".format(missing, csv_path))
+
+            chunk = chunk[columns]
+            complete = chunk.notna().all(axis=1)
+            if not complete.all():
+                logger.warning("Skipped {} rows with missing values".format((~complete).sum()))
+                chunk = chunk[complete]
+
+            records = [dict(zip(columns, values)) for values in chunk.values.tolist()]
+            if records:
+                with conn.begin():
+                    conn.execute(insert, records)
+            rows += len(records)
+            logger.info("Inserted {} rows, {:.0f} rows/sec".format(rows, rows / (time.perf_counter() - start)))
 
+    return rows
@@ -0,0 +1,117 @@
+import json
+import logging
+
+import numpy as np
+import pandas as pd
+
+
+logger = logging.getLogger(__name__)
+
+
+def _check_finite(X, columns, start):
+    """Raise on the first missing or infinite feature of a chunk, naming its row and column"""
+
+    rows, cols = np.nonzero(~np.isfinite(X))
+    if len(rows):
+        raise ValueError("Row {} feature {!r} must be a finite number".format(start + rows[0], columns[cols[0]]))
+
+
+def json_features(records, columns, start=0):
+    """Build the feature matrix of a JSON batch of applicants
+
+    Args:
+        records (`list of dict`): applicants keyed by feature name
+        columns (`list of str`): list of feature column names
+        start (`int`): row number of the first applicant, for the error messages
+
+    Returns:
+        X (`ndarray`): features of shape (n, len(columns))
+    """
+
+    if not isinstance(records, list):
+        raise ValueError("Expected a JSON array of applicants")
+
+    X = np.empty((len(records), len(columns)), dtype=np.float64)
+    for i, record in enumerate(records):
+        if not isinstance(record, dict):
+            raise ValueError("Row {} must be an object with numeric features".format(start + i))
+        for j, col in enumerate(columns):
+            if col not in record:
+                raise ValueError("Row {} is missing feature {!r}".format(start + i, col))
+            value = record[col]
+            # Booleans are ints to Python, and numeric strings would convert silently
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                raise ValueError("Row {} feature {!r} must be a number, got {}".format(
+                    start + i, col, json.dumps(value)))
+            X[i, j] = value
+
+    _check_finite(X, columns, start)
+
+    return X
+
+
+def csv_features(stream, columns, chunksize):
+    """Lazily read a csv batch of applicants in chunks
+
+    Args:
+        stream (`file-like`): csv upload with a header row
+        columns (`list of str`): list of feature column names
+        chunksize (`int`): number of applicants per chunk
+
+    Returns:
+        chunks (`generator of ndarray`): features of shape (<= chunksize, len(columns))
+    """
+
+    start = 0
+    for chunk in pd.read_csv(stream, chunksize=chunksize):
+        missing = [col for col in columns if col not in chunk.columns]
+        if missing:
+            raise ValueError("Missing features {}".format(missing))
+        X = chunk[columns].values.astype(np.float64)
+        _check_finite(X, columns, start)
+        start += len(X)
+        yield X
+
+
+def jsonl_features(stream, columns, chunksize):
+    """Lazily read a JSON Lines batch of applicants in chunks
+
+    Args:
+        stream (`file-like`): one JSON object per line, blank lines are skipped
+        columns (`list of str`): list of feature column names
+        chunksize (`int`): number of applicants per chunk
+
+    Returns:
+        chunks (`generator of ndarray`): features of shape (<= chunksize, len(columns))
+    """
+
+    records = []
+    start = 0
+    for number, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            records.append(json.loads(line))
+        except ValueError:
+            raise ValueError("Line {} is not valid JSON".format(number))
+        if len(records) == chunksize:
+            yield json_features(records, columns, start)
+            start += len(records)
+            records = []
+    if records:
+        yield json_features(records, columns, start)
+
+
+def ndjson_lines(pred, start=0):
+    """Format predictions as newline delimited JSON
+
+    Args:
+        pred (`ndarray`): predicted chance of admit
+        start (`int`): row number of the first prediction
+
+    Returns:
+        lines (`str`): one {"row", "admit"} object per line
+    """
+
+    return ''.join('{"row": %d, "admit": %.2f}\n' % (row, admit)
+                   for row, admit in enumerate(pred.tolist(), start))
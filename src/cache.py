@@ -0,0 +1,149 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+
+logger = logging.getLogger(__name__)
+
+
+class LatestCache:
+    """Process-local cache of the latest application shown on the index page
+
+    The POST path overwrites the cached record with the application it just scored, so
+    page loads are served without a database query. Other processes do not see that
+    update, hence entries also expire after `ttl` seconds.
+
+    Args:
+        ttl (`float`): seconds a cached record is served before it is re-read
+    """
+
+    def __init__(self, ttl=30):
+        self.ttl = ttl
+        self._entry = None
+
+    def get(self):
+        """Get the cached latest record
+
+        Returns:
+            record (`dict` or None): latest application, None if missing or expired
+        """
+
+        entry = self._entry
+        if entry is None or time.monotonic() - entry[0] > self.ttl:
+            return None
+
+        return entry[1]
+
+    def set(self, record):
+        """Replace the cached latest record
+
+        Args:
+            record (`dict`): column values of the latest application
+        """
+
+        self._entry = (time.monotonic(), dict(record))
+
+    def invalidate(self):
+        """Drop the cached record so the next read goes to the database"""
+
+        self._entry = None
+
+
+def feature_key(features, decimals=4):
+    """Normalize applicant features into a hashable cache key
+
+    Args:
+        features (`list of float`): applicant features in `config.Columns` order
+        decimals (`int`): decimals kept, so '320', '320.0' and 320.00001 share a key
+
+    Returns:
+        key (`tuple of float`): normalized features
+    """
+
+    # Adding 0.0 folds -0.0 into 0.0
+    return tuple(round(float(x), decimals) + 0.0 for x in features)
+
+
+class PredictionCache:
+    """Bounded LRU cache of predictions keyed on normalized applicant features
+
+    Entries are tagged with the version of the model that produced them. The first
+    lookup with a different model version drops every entry, so a reloaded model never
+    serves stale predictions.
+
+    Args:
+        maxsize (`int`): maximum number of cached predictions
+    """
+
+    def __init__(self, maxsize=4096):
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._version = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def _check_version(self, version):
+        if version != self._version:
+            if self._entries:
+                self.invalidations += 1
+                logger.info("Model changed, dropped {} cached predictions".format(len(self._entries)))
+            self._entries.clear()
+            self._version = version
+
+    def get(self, key, version):
+        """Look up a cached prediction
+
+        Args:
+            key (`tuple`): normalized applicant features
+            version (`str`): version of the current model
+
+        Returns:
+            pred (`float` or None): cached prediction, None on a miss
+        """
+
+        with self._lock:
+            self._check_version(version)
+            pred = self._entries.get(key)
+            if pred is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return pred
+
+    def put(self, key, version, pred):
+        """Cache a prediction, evicting the least recently used entry when full
+
+        Args:
+            key (`tuple`): normalized applicant features
+            version (`str`): version of the model that made the prediction
+            pred (`float`): prediction
+        """
+
+        with self._lock:
+            # Drop predictions of a model that was replaced in the meantime
+            if version != self._version:
+                return
+            self._entries[key] = pred
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self):
+        """Report cache counters
+
+        Returns:
+            stats (`dict`): size, hits, misses, evictions and invalidations
+        """
+
+        with self._lock:
+            return {'size': len(self._entries),
+                    'hits': self.hits,
+                    'misses': self.misses,
+                    'evictions': self.evictions,
+                    'invalidations': self.invalidations}
@@ -3,28 +3,36 @@ import os
 import logging
 import logging.config
 import datetime
+import argparse
+import hashlib
+import json
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-from sklearn import preprocessing
-import boto3
 import warnings
 warnings.filterwarnings('ignore')
 
 sys.path.append('./config')
 import config
+import columnar
 
-# AWS configuration
-ACCESS_KEY = os.environ.get("AWS_ACCESS_KEY_ID")
-SECRET_KEY = os.environ.get("AWS_SECRET_ACCESS_KEY")
+# Content hashes of the rendered EDA plots, kept in the figure directory
+EDA_CACHE = '.eda_cache.json'
 
-# Logger Setup
-logging.config.fileConfig(config.LOGGING_CONFIG, disable_existing_loggers=False)
 logger = logging.getLogger(__file__)
 
 
+def _pyplot():
+    """Import pyplot, with the non-interactive Agg backend, only when a plot is made"""
+
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    return plt
+
+
 def load_data(filename):
     """Load raw data from local
 
@@ -43,18 +51,357 @@ def load_data(filename):
     return df
 
 
-def eda(df, fig_directory, columns):
+def _factorize_rows(failed):
+    """Number the distinct rows of a boolean matrix, by hashing 64 columns at a time"""
+
+    inverse = np.zeros(len(failed), dtype=np.int64)
+    for start in range(0, failed.shape[1], 64):
+        bits = failed[:, start:start + 64].astype(np.uint64)
+        word = (bits << np.arange(bits.shape[1], dtype=np.uint64)).sum(axis=1, dtype=np.uint64)
+        codes, uniques = pd.factorize(word)
+        inverse, _ = pd.factorize(inverse * len(uniques) + codes)
+
+    return inverse.astype(np.int64)
+
+
+def validate(df, schema):
+    """Split rows into valid and rejected ones following a declarative schema
+
+    Every check is a vectorized mask over a whole column. A column of the schema may give
+    its `dtype`, `min` and `max` bounds, and `allowed` values; values are required and must
+    be numeric, and integral for integer dtypes. Valid rows are cast to the schema dtypes.
+
+    Args:
+        df (`DataFrame`): raw data
+        schema (`dict`): column name to its `dtype`, `min`, `max` and `allowed` values
+
+    Returns:
+        valid (`DataFrame`): rows passing every check, with the original index
+        rejected (`DataFrame`): raw rows failing a check, with a `reasons` column
+        report (`dict`): number of rows, valid and rejected rows, and rows failing each check
+    """
+
+    missing = [col for col in schema if col not in df.columns]
+    if missing:
+        raise ValueError("Raw data is missing columns {}".format(missing))
+
+    labels = []
+    masks = []
+    values = {}
+    for col, rules in schema.items():
+        raw = df[col]
+        x = pd.to_numeric(raw, errors='coerce').values.astype(np.float64)
+        nan = np.isnan(x)
+        checks = [('missing', raw.isna().values),
+                  ('not numeric', nan & raw.notna().values)]
+        with np.errstate(invalid='ignore'):
+            if 'min' in rules:
+                checks.append(('below {}'.format(rules['min']), x < rules['min']))
+            if 'max' in rules:
+                checks.append(('above {}'.format(rules['max']), x > rules['max']))
+            if np.dtype(rules.get('dtype', 'float64')).kind in ('i', 'u'):
+                checks.append(('not integer', ~nan & (x != np.floor(x))))
+            if 'allowed' in rules:
+                checks.append(('not in {}'.format(rules['allowed']), ~nan & ~np.isin(x, rules['allowed'])))
+        for label, mask in checks:
+            labels.append("{}: {}".format(col, label))
+            masks.append(mask)
+        values[col] = x
+
+    bad = np.zeros(len(df), dtype=bool)
+    for mask in masks:
+        bad |= mask
+
+    valid = df[~bad].copy()
+    for col, rules in schema.items():
+        valid[col] = values[col][~bad].astype(rules.get('dtype', 'float64'))
+
+    # Reasons are built once per distinct combination of failed checks, not per row
+    rejected = df[bad].copy()
+    rows = np.flatnonzero(bad)
+    failed = np.zeros((len(rows), len(masks)), dtype=bool)
+    for i, mask in enumerate(masks):
+        if mask.any():
+            failed[:, i] = mask[rows]
+    inverse = _factorize_rows(failed)
+    first = np.zeros(inverse.max() + 1 if len(inverse) else 0, dtype=np.int64)
+    first[inverse[::-1]] = np.arange(len(inverse))[::-1]
+    labels = np.array(labels, dtype=object)
+    reasons = np.array(['; '.join(labels[failed[i]]) for i in first], dtype=object)
+    rejected['reasons'] = reasons[inverse]
+
+    report = {'rows': len(df), 'valid': len(valid), 'rejected': len(rejected),
+              'failed': {label: int(mask.sum()) for label, mask in zip(labels, masks) if mask.any()}}
+
+    return valid, rejected, report
+
+
+def write_quarantine(rejected, f, header=True):
+    """Write rejected rows, with their reasons, to the quarantine file
+
+    Args:
+        rejected (`DataFrame`): rows returned as rejected by `validate`
+        f (`str` or file object): path or open file of the quarantine csv
+        header (`bool`): whether to write the header row
+    """
+
+    rejected.to_csv(f, header=header)
+
+
+def profile_edges(schema, bins):
+    """Fixed histogram bin edges of each schema column, from its declared range
+
+    Integer columns with at most `bins` distinct values get one bin per value.
+
+    Args:
+        schema (`dict`): column name to its `dtype`, `min`, `max` and `allowed` values
+        bins (`int`): number of bins of the other columns
+
+    Returns:
+        edges (`dict`): column name to its bin edges
+    """
+
+    edges = {}
+    for col, rules in schema.items():
+        lo = rules.get('min', min(rules.get('allowed', [np.nan])))
+        hi = rules.get('max', max(rules.get('allowed', [np.nan])))
+        if np.isnan(lo) or np.isnan(hi):
+            raise ValueError("Column {} has no range to bin its histogram".format(col))
+        if np.dtype(rules.get('dtype', 'float64')).kind in ('i', 'u') and hi - lo < bins:
+            edges[col] = np.arange(lo - 0.5, hi + 1.5)
+        else:
+            edges[col] = np.linspace(lo, hi, bins + 1)
+
+    return edges
+
+
+class Profile:
+    """Statistics of a dataset accumulated in one pass over its chunks
+
+    Means and co-moments of the chunks are merged pairwise, which keeps the variances and
+    the covariance matrix as accurate as a two-pass computation. Histograms count values
+    into fixed bins, so they add up across chunks.
+
+    Args:
+        edges (`dict`): column name to its histogram bin edges, in profile column order
+    """
+
+    def __init__(self, edges):
+        self.columns = list(edges)
+        self.edges = {col: np.asarray(edge, dtype=np.float64) for col, edge in edges.items()}
+        k = len(self.columns)
+        self.n = 0
+        self.mean = np.zeros(k)
+        self.comoment = np.zeros((k, k))
+        self.min = np.full(k, np.inf)
+        self.max = np.full(k, -np.inf)
+        self.counts = {col: np.zeros(len(edge) - 1, dtype=np.int64) for col, edge in self.edges.items()}
+
+    def update(self, df):
+        """Add the rows of a chunk to the profile
+
+        Args:
+            df (`DataFrame`): chunk holding every profile column, without missing values
+        """
+
+        X = df[self.columns].values.astype(np.float64)
+        m = len(X)
+        if m == 0:
+            return
+
+        mean = X.mean(axis=0)
+        centered = X - mean
+        n = self.n + m
+        delta = mean - self.mean
+        self.comoment += centered.T.dot(centered) + np.outer(delta, delta) * (self.n * m / n)
+        self.mean += delta * (m / n)
+        self.n = n
+        self.min = np.minimum(self.min, X.min(axis=0))
+        self.max = np.maximum(self.max, X.max(axis=0))
+        for i, col in enumerate(self.columns):
+            self.counts[col] += np.histogram(X[:, i], self.edges[col])[0]
+
+    def to_dict(self):
+        """Summarize the profile
+
+        Returns:
+            profile (`dict`): row count, column names, per column statistics and histograms,
+                covariance and correlation matrices (sample estimates, as pandas)
+        """
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            cov = self.comoment / (self.n - 1) if self.n > 1 else np.full_like(self.comoment, np.nan)
+            std = np.sqrt(np.diag(cov))
+            corr = cov / np.outer(std, std)
+
+        # NaN is not valid JSON, undefined statistics are written as null
+        clean = lambda a: [None if np.isnan(x) else float(x) for x in a]
+        empty = self.n == 0
+        stats = {col: {'mean': None if empty else float(self.mean[i]),
+                       'var': clean(np.diag(cov))[i],
+                       'std': clean(std)[i],
+                       'min': None if empty else float(self.min[i]),
+                       'max': None if empty else float(self.max[i]),
+                       'histogram': {'edges': self.edges[col].tolist(),
+                                     'counts': self.counts[col].tolist()}}
+                 for i, col in enumerate(self.columns)}
+
+        return {'rows': self.n, 'columns': self.columns, 'stats': stats,
+                'cov': [clean(row) for row in cov], 'corr': [clean(row) for row in corr]}
+
+    def save(self, path):
+        """Write the profile as json
+
+        Args:
+            path (`str`): path of the profile
+        """
+
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+
+def load_profile(path):
+    """Read a profile written by `Profile.save`
+
+    Args:
+        path (`str`): path of the profile
+
+    Returns:
+        profile (`dict`): as `Profile.to_dict`
+    """
+
+    with open(path) as f:
+        return json.load(f)
+
+
+def _content_hash(*arrays):
+    """Hash the content of the data behind a plot"""
+
+    sha = hashlib.sha1()
+    for array in arrays:
+        array = np.ascontiguousarray(array)
+        sha.update(str((array.dtype, array.shape)).encode())
+        sha.update(array.tobytes())
+
+    return sha.hexdigest()
+
+
+def _plot_hist(values, feat, path):
+    """Render and save the histogram of one feature, then release the figure"""
+
+    plt = _pyplot()
+    fig, ax = plt.subplots()
+    try:
+        ax.hist([values])
+        ax.set_ylabel('Number of observations')
+        fig.savefig(path)
+    finally:
+        plt.close(fig)
+
+    return feat
+
+
+def _plot_hist_counts(histogram, feat, path):
+    """Render and save a histogram from its bin edges and counts, then release the figure"""
+
+    plt = _pyplot()
+    fig, ax = plt.subplots()
+    try:
+        edges = np.asarray(histogram[0])
+        ax.hist(edges[:-1], edges, weights=histogram[1])
+        ax.set_ylabel('Number of observations')
+        fig.savefig(path)
+    finally:
+        plt.close(fig)
+
+    return feat
+
+
+def _plot_corr_matrix(values, columns, path):
+    """Render and save the correlation plot of a correlation matrix, then release the figure"""
+
+    plt = _pyplot()
+    fig = corr_heatmap(pd.DataFrame(values, index=columns, columns=columns))
+    try:
+        fig.savefig(path)
+    finally:
+        plt.close(fig)
+
+    return "Correlation plot"
+
+
+def _plot_corr(values, columns, path):
+    """Render and save the correlation plot, then release the figure"""
+
+    plt = _pyplot()
+    fig = corr_plot(pd.DataFrame(values, columns=columns), columns)
+    try:
+        fig.savefig(path)
+    finally:
+        plt.close(fig)
+
+    return "Correlation plot"
+
+
+def eda(df, fig_directory, columns, n_jobs=None):
     """Plot and save EDA plots for each features
 
+    Plots are rendered in parallel by a pool of processes with the non-interactive Agg
+    backend. The content hash of the data behind each plot is kept in the figure
+    directory, and plots whose data did not change since the last run are not rendered
+    again.
+
     Args:
         df (`DataFrame`): loaded dataset
         fig_directory (`str`): directory to save figures
         columns (`list of str`): list of feature column names
+        n_jobs (`int`): number of rendering processes, number of CPUs if None
 
     Returns:
-        None
+        rendered (`int`): number of plots rendered
+    """
+
+    # One job per feature histogram, and one for the correlation plot
+    jobs = []
+    for feat in df.columns:
+        title = ' '.join(feat.split(' ')).capitalize()
+        values = df[feat].values
+        jobs.append((title, _content_hash(values), _plot_hist, values, feat))
+    values = df[columns].values
+    jobs.append(("Correlation plot", _content_hash(values, np.array(columns)), _plot_corr, values, columns))
+
+    return _render(jobs, fig_directory, n_jobs)
+
+
+def eda_profile(profile, fig_directory, columns, n_jobs=None):
+    """Plot and save EDA plots from a dataset profile, without reading the data
+
+    Args:
+        profile (`dict`): profile of the dataset, as `Profile.to_dict`
+        fig_directory (`str`): directory to save figures
+        columns (`list of str`): list of feature column names
+        n_jobs (`int`): number of rendering processes, number of CPUs if None
+
+    Returns:
+        rendered (`int`): number of plots rendered
     """
 
+    jobs = []
+    for feat in profile['columns']:
+        title = ' '.join(feat.split(' ')).capitalize()
+        histogram = profile['stats'][feat]['histogram']
+        values = (histogram['edges'], histogram['counts'])
+        jobs.append((title, _content_hash(*values), _plot_hist_counts, values, feat))
+    index = [profile['columns'].index(col) for col in columns]
+    values = np.array(profile['corr'], dtype=np.float64)[np.ix_(index, index)]
+    jobs.append(("Correlation plot", _content_hash(values, np.array(columns)), _plot_corr_matrix, values, columns))
+
+    return _render(jobs, fig_directory, n_jobs)
+
+
+def _render(jobs, fig_directory, n_jobs=None):
+    """Render the plot jobs whose data changed since the last run, in parallel"""
+
     # Prepends the date to a string (e.g. to save dated files)
     now = datetime.datetime.now().strftime("%Y-%m-%d")
     dateplus = lambda x: "%s-%s" % (now, x)
@@ -63,33 +410,41 @@ def eda(df, fig_directory, columns):
     os.makedirs(fig_directory, exist_ok=True)
     logger.debug("Created directory to store EDA plots: {}".format(fig_directory))
 
-    figs = []
-
-    # Plot distribution and save EDA for each feature
-    for feat in df.columns:
-        try:
-            # Plot EDA for feat
-            fig, ax = plt.subplots()
-            ax.hist([df[feat].values])
-            title = ' '.join(feat.split(' ')).capitalize()
-            ax.set_ylabel('Number of observations')
-
-            path = os.path.join(fig_directory, dateplus(title))
-            fig.savefig("{}.png".format(path))
-            figs.append(fig)
-        except Exception as e:
-            logger.warning("Failed to generate EDA plot for {}".format(feat))
-            logger.warning(e)
-
-    # construct correlation plots
-    corr_fig = corr_plot(df, columns)
-    title = "Correlation plot"
-    path = os.path.join(fig_directory, dateplus(title))
-    corr_fig.savefig("{}.png".format(path))
-
-    plt.close()
-
-    logger.info("Generated {} EDA plots in {}".format(len(figs), fig_directory))
+    # Content hashes of the plots rendered by previous runs
+    cache_path = os.path.join(fig_directory, EDA_CACHE)
+    try:
+        with open(cache_path) as f:
+            cache = json.load(f)
+    except (FileNotFoundError, ValueError):
+        cache = {}
+
+    rendered = 0
+    with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+        futures = {}
+        for title, digest, plot, values, arg in jobs:
+            entry = cache.get(title)
+            if entry is not None and entry['hash'] == digest and os.path.exists(entry['path']):
+                continue
+            path = "{}.png".format(os.path.join(fig_directory, dateplus(title)))
+            futures[executor.submit(plot, values, arg, path)] = (title, digest, path)
+
+        for future in as_completed(futures):
+            title, digest, path = futures[future]
+            try:
+                future.result()
+                cache[title] = {'hash': digest, 'path': path}
+                rendered += 1
+            except Exception as e:
+                logger.warning("Failed to generate EDA plot for {}".format(title))
+                logger.warning(e)
+
+    with open(cache_path, 'w') as f:
+        json.dump(cache, f, indent=2)
+
+    logger.info("Generated {} EDA plots in {}, {} unchanged".format(rendered, fig_directory,
+                                                                    len(jobs) - len(futures)))
+
+    return rendered
 
 
 def corr_plot(df, columns):
@@ -103,10 +458,24 @@ def corr_plot(df, columns):
         fig (`matplotlib object`): Correlation plot
     """
 
+    return corr_heatmap(df[columns].corr())
+
+
+def corr_heatmap(corr):
+    """Helper eda function to plot a correlation matrix
+
+    Args:
+        corr (`DataFrame`): correlation matrix
+
+    Return:
+        fig (`matplotlib object`): Correlation plot
+    """
+
+    plt = _pyplot()
+    import seaborn as sns
+
     try:
 
-        df = df[columns]
-        corr = df.corr()
         fig, ax = plt.subplots(figsize=(8, 8))
         colormap = sns.diverging_palette(220, 10, as_cmap=True)
         dropSelf = np.zeros_like(corr)
@@ -120,12 +489,13 @@ def corr_plot(df, columns):
     return fig
 
 
-def featurize(df, col):
+def featurize(df, col, scaler=None):
     """Scale CGPA data from 0-10 to 0-4
 
     Args:
         df (`DataFrame`): Loaded data
         col (`str`): cgpa column name
+        scaler (`MinMaxScaler`): scaler already fitted on the full column, fitted on `df` if None
 
     Return:
         df (`DataFrame`): dataframe with gpa scaled to 0-4
@@ -134,8 +504,12 @@ def featurize(df, col):
 
     try:
         x = df[[col]].values
-        min_max_scaler = preprocessing.MinMaxScaler()
-        x_scaled = min_max_scaler.fit_transform(x)
+        if scaler is None:
+            from sklearn import preprocessing
+            scaler = preprocessing.MinMaxScaler()
+            x_scaled = scaler.fit_transform(x)
+        else:
+            x_scaled = scaler.transform(x)
         df[col] = x_scaled * 4
     except Exception as e:
         logger.error("Failed to scale GPA to 0-4 scale")
@@ -144,6 +518,50 @@ def featurize(df, col):
     return df
 
 
+def fit_scaler(df, col):
+    """Fit the min-max scaler of the cgpa column
+
+    Args:
+        df (`DataFrame`): Loaded data
+        col (`str`): cgpa column name
+
+    Return:
+        scaler (`MinMaxScaler`): scaler fitted on the column
+
+    """
+    from sklearn import preprocessing
+
+    return preprocessing.MinMaxScaler().fit(df[[col]].values)
+
+
+def write_preprocess(scaler, col, path):
+    """Persist the fitted cgpa scaling as an affine transform `x * scale + offset`
+
+    The transform reproduces `featurize` without sklearn, so that the serving path can
+    fold it into the model coefficients.
+
+    Args:
+        scaler (`MinMaxScaler`): fitted scaler of the cgpa column
+        col (`str`): cgpa column name
+        path (`str`): path to write the preprocessing parameters as json
+
+    Return:
+        params (`dict`): column name to its transform parameters
+
+    """
+    params = {col: {'scale': float(scaler.scale_[0] * 4),
+                    'offset': float(scaler.min_[0] * 4),
+                    'data_min': float(scaler.data_min_[0]),
+                    'data_max': float(scaler.data_max_[0])}}
+    try:
+        with open(path, 'w') as f:
+            json.dump({'transform': 'x * scale + offset', 'columns': params}, f, indent=2)
+    except FileNotFoundError:
+        logger.error("Please provide a valid file location to persist preprocessing parameters.")
+
+    return params
+
+
 def write_csv(df, clean_filename):
     """Write cleaned data to csv
 
@@ -161,38 +579,212 @@ def write_csv(df, clean_filename):
         logger.error("Please provide a valid file location to persist cleaned data.")
 
 
+def write_columnar(df, directory):
+    """Write cleaned data as one memory-mappable .npy file per column
+
+    Args:
+        df (`DataFrame`): cleaned data
+        directory (`str`): directory to write cleaned data
+
+    Return:
+        None
+
+    """
+    try:
+        columnar.write_columnar(df, directory)
+    except FileNotFoundError:
+        logger.error("Please provide a valid directory to persist cleaned data.")
+
+
+def stream_clean(filename, clean_filename, col, chunksize, columnar_directory=None, preprocess_path=None,
+                 schema=None, quarantine_filename=None, profile=None):
+    """Clean the raw data chunk by chunk, with memory bounded by the chunk size
+
+    A first pass over the raw file fits the scaler with the min and max of `col`, a second
+    pass scales each chunk and appends it to the clean file. The output is byte-identical
+    to `validate`, `featurize` and `write_csv` on the whole file.
+
+    Args:
+        filename (`str`): path to local raw data
+        clean_filename (`str`): Path to write cleaned data as csv, no csv is written if None
+        col (`str`): cgpa column name
+        chunksize (`int`): number of rows per chunk
+        columnar_directory (`str`): directory to also write cleaned data as .npy columns
+        preprocess_path (`str`): path to write the fitted scaling parameters, not written if None
+        schema (`dict`): schema of the raw data, rows are not validated if None
+        quarantine_filename (`str`): path to write the rows rejected by the schema, not written if None
+        profile (`Profile`): profile updated with the valid raw rows during the first pass
+
+    Return:
+        rows (`int`): number of rows written
+    """
+
+    from sklearn import preprocessing
+
+    def chunks():
+        for chunk in pd.read_csv(filename, chunksize=chunksize):
+            if schema is None:
+                yield chunk, None
+            else:
+                valid, rejected, _ = validate(chunk, schema)
+                yield valid, rejected
+
+    scaler = preprocessing.MinMaxScaler()
+    rows = 0
+    dtypes = {}
+    for chunk, _ in chunks():
+        if len(chunk) == 0:
+            continue
+        scaler.partial_fit(chunk[[col]].values)
+        if profile is not None:
+            profile.update(chunk)
+        rows += len(chunk)
+        for name, dtype in chunk.dtypes.items():
+            dtypes[name] = np.result_type(dtypes.get(name, dtype), dtype)
+    if rows == 0:
+        raise ValueError("Every row of {} was rejected by the schema or the file has no rows".format(filename))
+    dtypes[col] = np.dtype(np.float64)
+    logger.debug("Fitted scaler on {}: min {}, max {}".format(col, scaler.data_min_, scaler.data_max_))
+    if preprocess_path is not None:
+        write_preprocess(scaler, col, preprocess_path)
+
+    columns = None
+    if columnar_directory is not None:
+        columns = columnar.create_columnar(columnar_directory, dtypes, rows)
+
+    f = open(clean_filename, 'w', newline='') if clean_filename is not None else None
+    q = open(quarantine_filename, 'w', newline='') if quarantine_filename is not None else None
+    try:
+        start = 0
+        first = True
+        quarantined = 0
+        # Chunks keep counting the index from the previous chunk, like the in-memory frame
+        for chunk, rejected in chunks():
+            if rejected is not None:
+                quarantined += len(rejected)
+                if q is not None:
+                    write_quarantine(rejected, q, header=first)
+            first = False
+            if len(chunk) == 0:
+                continue
+            chunk = featurize(chunk, col, scaler)
+            if f is not None:
+                chunk.to_csv(f, header=start == 0)
+            if columns is not None:
+                for name, array in columns.items():
+                    array[start:start + len(chunk)] = chunk[name].values
+            start += len(chunk)
+        if schema is not None:
+            logger.info("{} rows rejected by the schema, written to {}".format(quarantined, quarantine_filename))
+    finally:
+        if f is not None:
+            f.close()
+        if q is not None:
+            q.close()
+        if columns is not None:
+            for array in columns.values():
+                array.flush()
+
+    return rows
+
+
 if __name__ == "__main__":
     """Clean the raw data and plot EDA"""
 
-    load_filename = config.Path_To_Local_Raw_File
+    parser = argparse.ArgumentParser(description='Clean the raw data and plot EDA.')
+    parser.add_argument("--chunksize",
+                        "-c",
+                        default=config.Clean_Chunk_Size,
+                        type=int,
+                        help="If given, stream the raw data in chunks of this many rows")
+    parser.add_argument("--no-eda",
+                        default=False,
+                        action="store_true",
+                        help="If given, skip the EDA plots")
+    args = parser.parse_args()
 
-    try:
-        df = load_data(load_filename)
-    except Exception as e:
-        logger.error("Failed to load raw data! Please check valid path")
-        logger.error(e)
-        sys.exit(1)
+    logging.config.fileConfig(config.LOGGING_CONFIG, disable_existing_loggers=False)
+
+    load_filename = config.Path_To_Local_Raw_File
+    col = config.Transform_col
+    # The csv is kept as an export next to the columnar format read by the later stages
+    clean_filename = config.Path_To_Clean_File if config.Clean_Format == 'csv' or config.Export_Clean_CSV else None
+    columnar_directory = config.Path_To_Clean_Columnar if config.Clean_Format == 'npy' else None
+    preprocess_path = config.Path_To_Preprocess
+    schema = config.Schema
+    quarantine_filename = config.Path_To_Quarantine
 
     fig_directory = config.fig_direcotry
     columns = config.Columns
-    try:
-        eda(df, fig_directory, columns)
-        logger.info("EDA saved to {}".format(fig_directory))
-    except Exception as e:
-        logger.error("Failed to perform EDA.")
-        logger.error(e)
+    profile_path = config.Path_To_Profile
+    profile = Profile(profile_edges(schema, config.Profile_Bins))
 
-    col = config.Transform_col
-    try:
-        df = featurize(df, col)
-    except Exception as e:
-        logger.error("Failed to scale gpa.")
-        logger.error(e)
+    if args.chunksize is not None:
+        try:
+            rows = stream_clean(load_filename, clean_filename, col, args.chunksize, columnar_directory,
+                                preprocess_path, schema, quarantine_filename, profile)
+            logger.info("Cleaned {} rows in chunks of {} written to {}"
+                        .format(rows, args.chunksize, columnar_directory or clean_filename))
+        except FileNotFoundError:
+            logger.error("Please provide valid local file downloaded from S3")
+            sys.exit(1)
+        except Exception as e:
+            logger.error("Failed to clean data in chunks.")
+            logger.error(e)
+            sys.exit(1)
+    else:
+        try:
+            df = load_data(load_filename)
+        except Exception as e:
+            logger.error("Failed to load raw data! Please check valid path")
+            logger.error(e)
+            sys.exit(1)
+
+        try:
+            df, rejected, report = validate(df, schema)
+            write_quarantine(rejected, quarantine_filename)
+            logger.info("Validated {} rows: {} valid, {} rejected and written to {}"
+                        .format(report['rows'], report['valid'], report['rejected'], quarantine_filename))
+            for label, count in report['failed'].items():
+                logger.info("{} rows failed {}".format(count, label))
+            profile.update(df)
+        except Exception as e:
+            logger.error("Failed to validate raw data against the schema.")
+            logger.error(e)
+            sys.exit(1)
+
+        try:
+            scaler = fit_scaler(df, col)
+            df = featurize(df, col, scaler)
+            write_preprocess(scaler, col, preprocess_path)
+            logger.info("Preprocessing parameters written to {}".format(preprocess_path))
+        except Exception as e:
+            logger.error("Failed to scale gpa.")
+            logger.error(e)
 
-    clean_filename = config.Path_To_Clean_File
+        try:
+            if columnar_directory is not None:
+                write_columnar(df, columnar_directory)
+                logger.info("Cleaned data written to {}".format(columnar_directory))
+            if clean_filename is not None:
+                write_csv(df, clean_filename)
+                logger.info("Cleaned data written to {}".format(clean_filename))
+        except Exception as e:
+            logger.error("Failed to write cleaned data to local")
+            logger.error(e)
+
+    # The profile of the valid raw rows is all the EDA plots need, in both modes
     try:
-        write_csv(df, clean_filename)
-        logger.info("Cleaned data written to {}".format(clean_filename))
+        profile.save(profile_path)
+        logger.info("Profile of {} rows written to {}".format(profile.n, profile_path))
     except Exception as e:
-        logger.error("Failed to write cleaned data to local")
+        logger.error("Failed to write the data profile.")
         logger.error(e)
+
+    if not args.no_eda:
+        try:
+            eda_profile(profile.to_dict(), fig_directory, columns, config.Eda_Workers)
+            logger.info("EDA saved to {}".format(fig_directory))
+        except Exception as e:
+            logger.error("Failed to perform EDA.")
+            logger.error(e)
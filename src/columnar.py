@@ -0,0 +1,84 @@
+import json
+import logging
+import os
+
+import numpy as np
+import pandas as pd
+
+
+logger = logging.getLogger(__file__)
+
+MANIFEST = 'columns.json'
+
+
+def _column_path(directory, i):
+    return os.path.join(directory, '{}.npy'.format(i))
+
+
+def create_columnar(directory, dtypes, rows):
+    """Create a columnar dataset of one memory-mapped .npy file per column
+
+    Args:
+        directory (`str`): directory of the dataset
+        dtypes (`dict`): column name to numpy dtype, in column order
+        rows (`int`): number of rows
+
+    Returns:
+        columns (`dict`): column name to writable memory-mapped array
+    """
+
+    os.makedirs(directory, exist_ok=True)
+    names = list(dtypes)
+    for name, dtype in dtypes.items():
+        if getattr(dtype, 'kind', None) not in ('b', 'i', 'u', 'f'):
+            raise ValueError("Column {} of dtype {} is not numeric".format(name, dtype))
+
+    columns = {name: np.lib.format.open_memmap(_column_path(directory, i), mode='w+',
+                                               dtype=dtypes[name], shape=(rows,))
+               for i, name in enumerate(names)}
+
+    # Column names may contain spaces and symbols, the files are numbered instead
+    with open(os.path.join(directory, MANIFEST), 'w') as f:
+        json.dump({'columns': names, 'rows': rows}, f)
+
+    return columns
+
+
+def write_columnar(df, directory):
+    """Write a dataframe as one .npy file per column
+
+    Args:
+        df (`DataFrame`): numeric data
+        directory (`str`): directory of the dataset
+    """
+
+    columns = create_columnar(directory, df.dtypes.to_dict(), len(df))
+    for name, array in columns.items():
+        array[:] = df[name].values
+        array.flush()
+
+
+def read_columnar(directory, columns=None):
+    """Read a columnar dataset with its columns memory-mapped
+
+    Columns are not parsed nor copied: each is a read-only memory map of its .npy file,
+    and only the pages that are accessed are read from disk.
+
+    Args:
+        directory (`str`): directory of the dataset
+        columns (`list of str`): columns to read, all columns if None
+
+    Returns:
+        df (`DataFrame`): data backed by the memory-mapped columns
+    """
+
+    with open(os.path.join(directory, MANIFEST)) as f:
+        names = json.load(f)['columns']
+
+    if columns is None:
+        columns = names
+
+    arrays = {name: np.load(_column_path(directory, names.index(name)), mmap_mode='r')
+              for name in columns}
+
+    return pd.DataFrame(arrays, columns=columns, copy=False)
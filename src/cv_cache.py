@@ -0,0 +1,138 @@
+import hashlib
+import json
+import logging
+import os
+import pickle
+
+import numpy as np
+
+
+logger = logging.getLogger(__file__)
+
+SUFFIX = '.pkl'
+
+
+def data_fingerprint(X, y):
+    """Hash the values, shapes and dtypes of a training set
+
+    Args:
+        X (`array-like`): features
+        y (`array-like`): target
+
+    Returns:
+        fingerprint (`str`): hex sha256 digest
+    """
+
+    sha = hashlib.sha256()
+    for array in (np.asarray(X), np.asarray(y)):
+        array = np.ascontiguousarray(array)
+        sha.update('{}{}'.format(array.shape, array.dtype.str).encode())
+        # Hashed in blocks of rows, without a copy of the whole array as bytes
+        flat = array.reshape(-1)
+        for start in range(0, len(flat), 1 << 22):
+            sha.update(flat[start:start + (1 << 22)].view(np.uint8))
+
+    return sha.hexdigest()
+
+
+def cache_key(fingerprint, estimator, cv_params, scoring, extra=None):
+    """Key of the cross validation result of an estimator on a training set
+
+    Args:
+        fingerprint (`str`): fingerprint of the training set, from `data_fingerprint`
+        estimator (`object`): unfitted sklearn estimator
+        cv_params (`dict`): cross validation settings
+        scoring (`dict`): metric name to sklearn scoring name
+        extra (`dict`): other settings the result depends on
+
+    Returns:
+        key (`str`): hex sha256 digest
+    """
+
+    import sklearn
+
+    parts = {'data': fingerprint,
+             'model': '{}.{}'.format(type(estimator).__module__, type(estimator).__name__),
+             'params': estimator.get_params(deep=True),
+             'cv': cv_params, 'scoring': scoring, 'extra': extra,
+             'sklearn': sklearn.__version__}
+    blob = json.dumps(parts, sort_keys=True, default=repr)
+
+    return hashlib.sha256(blob.encode()).hexdigest()
+
+
+def load(directory, key):
+    """Cached result of a key, None when it is not cached
+
+    Args:
+        directory (`str`): cache directory, None disables the cache
+        key (`str`): key of the result
+
+    Returns:
+        result (`object`): cached result, or None
+    """
+
+    if directory is None:
+        return None
+
+    path = os.path.join(directory, key + SUFFIX)
+    try:
+        with open(path, 'rb') as f:
+            result = pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning("Ignoring unreadable cache entry {}: {}".format(path, e))
+        return None
+
+    # Mark the entry as recently used
+    os.utime(path)
+
+    return result
+
+
+def save(directory, key, result, max_bytes):
+    """Cache a result, then evict the least recently used entries beyond `max_bytes`
+
+    Args:
+        directory (`str`): cache directory, None disables the cache
+        key (`str`): key of the result
+        result (`object`): picklable result
+        max_bytes (`int`): size bound of the cache directory
+    """
+
+    if directory is None:
+        return
+
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, key + SUFFIX)
+    with open(path + '.tmp', 'wb') as f:
+        pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(path + '.tmp', path)
+    evict(directory, max_bytes)
+
+
+def evict(directory, max_bytes):
+    """Delete the least recently used entries until the cache fits in `max_bytes`
+
+    Returns:
+        evicted (`int`): number of entries deleted
+    """
+
+    entries = []
+    for name in os.listdir(directory):
+        if name.endswith(SUFFIX):
+            stat = os.stat(os.path.join(directory, name))
+            entries.append((stat.st_mtime, stat.st_size, name))
+    entries.sort(reverse=True)
+
+    total = 0
+    evicted = 0
+    for _, size, name in entries:
+        total += size
+        if total > max_bytes:
+            os.remove(os.path.join(directory, name))
+            evicted += 1
+            logger.debug("Evicted cache entry %s", name)
+
+    return evicted
@@ -0,0 +1,187 @@
+import logging
+from collections import namedtuple
+
+import numpy as np
+
+
+logger = logging.getLogger(__name__)
+
+# Metrics derived from sufficient statistics, named as sklearn scoring strings
+SCORINGS = ('r2', 'neg_mean_squared_error', 'neg_root_mean_squared_error')
+
+# Parameters of LinearRegression and Ridge that do not change the closed form solution,
+# and the values of others for which sklearn solves the same exact problem
+FREE_PARAMS = ('fit_intercept', 'alpha', 'copy_X', 'n_jobs', 'random_state')
+EXACT_PARAMS = {'solver': ('auto', 'cholesky'), 'positive': (False,), 'normalize': (False, 'deprecated')}
+
+# Sufficient statistics of a set of rows for a linear model with an intercept column
+Stats = namedtuple('Stats', ['gram', 'xty', 'yty', 'ysum', 'n'])
+
+
+def sufficient_stats(X, y, fit_intercept=True):
+    """Accumulate X'X, X'y, y'y, the sum of y and the row count of a set of rows
+
+    Args:
+        X (`ndarray`): features, shape (n, p)
+        y (`ndarray`): target, shape (n,)
+        fit_intercept (`bool`): whether a column of ones is prepended to the features
+
+    Returns:
+        stats (`Stats`): sufficient statistics of the rows
+    """
+
+    gram = X.T.dot(X)
+    xty = X.T.dot(y)
+    ysum = y.sum()
+    if fit_intercept:
+        # Bordered with the statistics of the column of ones, without materializing it
+        xsum = X.sum(axis=0)
+        gram = np.block([[np.array([[len(y)]], dtype=gram.dtype), xsum[None, :]],
+                         [xsum[:, None], gram]])
+        xty = np.concatenate([[ysum], xty])
+
+    return Stats(gram=gram, xty=xty, yty=y.dot(y), ysum=ysum, n=len(y))
+
+
+def _subtract(a, b):
+    return Stats(*(x - z for x, z in zip(a, b)))
+
+
+def combine(stats):
+    """Sufficient statistics of the union of disjoint sets of rows
+
+    Args:
+        stats (`list of Stats`): statistics of each set of rows, in the same layout
+
+    Returns:
+        stats (`Stats`): statistics of every row
+    """
+
+    return Stats(*(sum(parts) for parts in zip(*stats)))
+
+
+def solve(stats, alpha=0.0, fit_intercept=True):
+    """Coefficients of OLS, or ridge when alpha > 0, from sufficient statistics
+
+    The intercept is not penalized, which gives the same solution as sklearn's `Ridge`
+    fitted on centered data.
+
+    Args:
+        stats (`Stats`): sufficient statistics of the training rows
+        alpha (`float`): L2 penalty
+        fit_intercept (`bool`): whether the first coefficient is an intercept
+
+    Returns:
+        coefs (`ndarray`): coefficients, intercept first when fitted
+    """
+
+    penalty = np.full(len(stats.xty), float(alpha))
+    if fit_intercept:
+        penalty[0] = 0.0
+    A = stats.gram + np.diag(penalty)
+    try:
+        return np.linalg.solve(A, stats.xty)
+    except np.linalg.LinAlgError:
+        # Collinear features: minimum norm solution, as sklearn's lstsq
+        return np.linalg.lstsq(A, stats.xty, rcond=None)[0]
+
+
+def score(stats, coefs, scoring):
+    """Score coefficients on a set of rows from its sufficient statistics only
+
+    Args:
+        stats (`Stats`): sufficient statistics of the test rows
+        coefs (`ndarray`): coefficients, in the layout of the statistics
+        scoring (`str`): one of `SCORINGS`
+
+    Returns:
+        score (`float`): score as sklearn's scorer of the same name, higher is better
+    """
+
+    sse = stats.yty - 2 * coefs.dot(stats.xty) + coefs.dot(stats.gram).dot(coefs)
+    sse = max(sse, 0.0)
+    if scoring == 'r2':
+        sst = stats.yty - stats.ysum ** 2 / stats.n
+        return 1 - sse / sst if sst > 0 else (1.0 if sse == 0 else 0.0)
+    if scoring == 'neg_mean_squared_error':
+        return -sse / stats.n
+    if scoring == 'neg_root_mean_squared_error':
+        return -np.sqrt(sse / stats.n)
+
+    raise ValueError("Scoring {} cannot be derived from sufficient statistics".format(scoring))
+
+
+def supports(estimator, scoring):
+    """Whether `cross_validate` computes the same scores as refitting `estimator` on every fold
+
+    Only plain `LinearRegression` and `Ridge` are solved in closed form: parameters outside
+    of `FREE_PARAMS` must take a value of `EXACT_PARAMS`, or their default otherwise.
+
+    Args:
+        estimator (`object`): unfitted sklearn estimator
+        scoring (`iterable of str`): sklearn scoring names
+
+    Returns:
+        supported (`bool`): True when the closed form matches the estimator and every metric is supported
+    """
+
+    from sklearn.linear_model import LinearRegression, Ridge
+
+    if type(estimator) not in (LinearRegression, Ridge):
+        return False
+    if not np.isscalar(getattr(estimator, 'alpha', 0.0)):
+        return False
+
+    defaults = type(estimator)().get_params()
+    for name, value in estimator.get_params().items():
+        if name in FREE_PARAMS:
+            continue
+        if name in EXACT_PARAMS:
+            if value not in EXACT_PARAMS[name]:
+                return False
+        elif value != defaults.get(name):
+            return False
+
+    return all(name in SCORINGS for name in scoring)
+
+
+def cross_validate(X, y, folds, scoring, alpha=0.0, fit_intercept=True):
+    """Cross validate OLS or ridge without refitting from rows
+
+    The data is centered once so that the statistics stay well conditioned. Each fold's
+    test statistics are accumulated from its rows, its training statistics are the total
+    minus the test ones, and its coefficients are solved from a p x p system.
+
+    Args:
+        X (`array-like`): features, shape (n, p)
+        y (`array-like`): target, shape (n,)
+        folds (`list of tuple`): train and test row indices of each fold
+        scoring (`dict`): metric name to sklearn scoring name, one of `SCORINGS`
+        alpha (`float`): L2 penalty, 0 for OLS
+        fit_intercept (`bool`): whether an intercept is fitted
+
+    Returns:
+        scores (`dict`): metric name to the array of its score on each fold
+    """
+
+    X = np.asarray(X, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64).ravel()
+    if fit_intercept:
+        # Shifting features and target does not change the fits nor the residuals
+        X = X - X.mean(axis=0)
+        y = y - y.mean()
+
+    total = sufficient_stats(X, y, fit_intercept)
+    scores = {metric: [] for metric in scoring}
+    for train, test in folds:
+        test_stats = sufficient_stats(X[test], y[test], fit_intercept)
+        if len(train) + len(test) == len(y):
+            train_stats = _subtract(total, test_stats)
+        else:
+            train_stats = sufficient_stats(X[train], y[train], fit_intercept)
+        coefs = solve(train_stats, alpha, fit_intercept)
+        for metric, name in scoring.items():
+            scores[metric].append(score(test_stats, coefs, name))
+
+    return {metric: np.array(values) for metric, values in scores.items()}
+
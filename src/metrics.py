@@ -0,0 +1,161 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+
+
+# Latency buckets in seconds, from 100us to 10s
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+                   0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_labels(labels):
+    """Format label pairs as {name="value",...}"""
+
+    if not labels:
+        return ''
+
+    pairs = ['{}="{}"'.format(name, str(value).replace('\\', '\\\\').replace('"', '\\"')
+                              .replace('\n', '\\n'))
+             for name, value in labels]
+    return '{' + ','.join(pairs) + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value))
+
+
+class Counter:
+    """Monotonically increasing count, optionally split by labels
+
+    Args:
+        name (`str`): metric name
+        documentation (`str`): help text
+    """
+
+    type = 'counter'
+
+    def __init__(self, name, documentation):
+        self.name = name
+        self.documentation = documentation
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def inc(self, amount=1, **labels):
+        """Increase the count of the given label values by `amount`"""
+
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self):
+        """Yield (name, labels, value) of every label combination"""
+
+        with self._lock:
+            values = list(self._values.items())
+        for key, value in values:
+            yield self.name, key, value
+
+
+class Gauge:
+    """Value sampled at scrape time from a callback
+
+    Args:
+        name (`str`): metric name
+        documentation (`str`): help text
+        callback (`callable`): returns a list of (labels `dict`, value) pairs
+    """
+
+    type = 'gauge'
+
+    def __init__(self, name, documentation, callback):
+        self.name = name
+        self.documentation = documentation
+        self.callback = callback
+
+    def samples(self):
+        """Yield (name, labels, value) of every value reported by the callback"""
+
+        for labels, value in self.callback():
+            yield self.name, tuple(sorted(labels.items())), value
+
+
+class Histogram:
+    """Distribution of observed values in cumulative buckets, optionally split by labels
+
+    Observing a value costs one bisect and a few additions under a lock, which is cheap
+    enough to time every request stage in production.
+
+    Args:
+        name (`str`): metric name
+        documentation (`str`): help text
+        buckets (`tuple of float`): sorted upper bounds of the buckets
+    """
+
+    type = 'histogram'
+
+    def __init__(self, name, documentation, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def observe(self, value, **labels):
+        """Record one observation of the given label values"""
+
+        key = tuple(sorted(labels.items()))
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._values.get(key)
+            if counts is None:
+                # Bucket counts, followed by the sum and the count of observations
+                counts = self._values[key] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+            counts[i] += 1
+            counts[-2] += value
+            counts[-1] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the wall time spent in the with block"""
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def samples(self):
+        """Yield (name, labels, value) of the buckets, sum and count of every label combination"""
+
+        with self._lock:
+            values = [(key, list(counts)) for key, counts in self._values.items()]
+        for key, counts in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                yield self.name + '_bucket', key + (('le', _format_value(bound)),), cumulative
+            yield self.name + '_sum', key, counts[-2]
+            yield self.name + '_count', key, counts[-1]
+
+
+def render(metrics):
+    """Render metrics in the Prometheus text exposition format
+
+    Args:
+        metrics (`list`): Counter, Gauge and Histogram objects
+
+    Returns:
+        text (`str`): exposition text
+    """
+
+    lines = []
+    for metric in metrics:
+        lines.append('# HELP {} {}'.format(metric.name, metric.documentation))
+        lines.append('# TYPE {} {}'.format(metric.name, metric.type))
+        for name, labels, value in metric.samples():
+            lines.append('{}{} {}'.format(name, _format_labels(labels), _format_value(value)))
+
+    return '\n'.join(lines) + '\n'
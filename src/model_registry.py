@@ -0,0 +1,219 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+
+logger = logging.getLogger(__name__)
+
+# Immutable snapshot of a loaded model; swapped as a whole on reload
+Model = namedtuple('Model', ['coefs', 'params', 'version', 'mtime', 'loaded_at'])
+
+
+def file_digest(path):
+    """Compute the sha256 digest of a model artifact
+
+    Args:
+        path (`str`): path to the artifact
+
+    Returns:
+        digest (`str`): hex digest of the file content
+    """
+
+    sha = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 16), b''):
+            sha.update(block)
+
+    return sha.hexdigest()
+
+
+def artifact_mtime(csv_path, preprocess_path=None):
+    """Modification times of the model artifacts, None for a missing preprocessing file"""
+
+    mtime = os.stat(csv_path).st_mtime
+    if preprocess_path is None or not os.path.exists(preprocess_path):
+        return mtime, None
+
+    return mtime, os.stat(preprocess_path).st_mtime
+
+
+def artifact_version(csv_path, preprocess_path=None):
+    """Content hash of the model coefficients and its preprocessing parameters"""
+
+    version = file_digest(csv_path)
+    if preprocess_path is None or not os.path.exists(preprocess_path):
+        return version
+
+    return hashlib.sha256((version + file_digest(preprocess_path)).encode()).hexdigest()
+
+
+def fold_preprocess(coefs, params, preprocess):
+    """Fold affine feature transforms `x * scale + offset` into linear model coefficients
+
+    A coefficient w of a transformed feature contributes w * (x * scale + offset), so the
+    model scores raw features with w * scale and an intercept increased by w * offset.
+
+    Args:
+        coefs (`ndarray`): intercept-first coefficient vector
+        params (`list of str`): 'intercept' followed by the feature names
+        preprocess (`dict`): feature name to its `scale` and `offset`
+
+    Returns:
+        coefs (`ndarray`): intercept-first coefficients applying to raw features
+    """
+
+    coefs = coefs.copy()
+    for name, transform in preprocess.items():
+        if name not in params:
+            raise ValueError("Preprocessed column {} is not a model feature".format(name))
+        i = params.index(name)
+        coefs[0] += coefs[i] * transform['offset']
+        coefs[i] *= transform['scale']
+
+    return coefs
+
+
+def load_coefficients(csv_path, preprocess_path=None):
+    """Load coefficients written by `train_model.save_model` into a model snapshot
+
+    When the preprocessing parameters of the training data are found, they are folded into
+    the coefficients so the model scores raw applicant features.
+
+    Args:
+        csv_path (`str`): path to the model coefficients csv
+        preprocess_path (`str`): path to the preprocessing parameters json, none applied if None
+
+    Returns:
+        model (`Model`): snapshot holding the intercept-first coefficient vector
+    """
+
+    mtime = artifact_mtime(csv_path, preprocess_path)
+    version = artifact_version(csv_path, preprocess_path)
+    fitted = pd.read_csv(csv_path)
+    params = list(fitted['params'])
+    coefs = np.ascontiguousarray(fitted['coefs'].values, dtype=np.float64)
+
+    if mtime[1] is not None:
+        with open(preprocess_path) as f:
+            coefs = fold_preprocess(coefs, params, json.load(f)['columns'])
+    elif preprocess_path is not None:
+        logger.warning("No preprocessing parameters at %s, features are scored as given", preprocess_path)
+    coefs.setflags(write=False)
+
+    return Model(coefs=coefs, params=params, version=version,
+                 mtime=mtime, loaded_at=time.time())
+
+
+def clip_prediction(pred):
+    """Round predictions to two decimals and keep them in range [0,1]
+
+    Args:
+        pred (`ndarray`): raw predictions
+
+    Returns:
+        pred (`ndarray`): rounded and clipped predictions
+    """
+
+    return np.clip(np.round(pred, 2), 0, 1)
+
+
+def score(model, X):
+    """Score applicants with a model snapshot
+
+    Args:
+        model (`Model`): model snapshot, as `ModelRegistry.model`
+        X (`array-like`): raw features in `config.Columns` order, shape (n_features,) or (n, n_features)
+
+    Returns:
+        pred (`ndarray`): chance of admit rounded to two decimals and clipped to [0,1]
+    """
+
+    X = np.asarray(X, dtype=np.float64)
+
+    return clip_prediction(X.dot(model.coefs[1:]) + model.coefs[0])
+
+
+class ModelRegistry:
+    """Keep the trained linear model in memory and hot reload it when the artifact changes
+
+    The coefficients are parsed once and kept as a read-only NumPy vector. Every
+    `reload_seconds` the artifact mtime is checked; when it changed, the content hash
+    decides whether a new model is loaded. The new snapshot replaces the old one with a
+    single reference assignment, so concurrent readers always see a complete model.
+
+    Args:
+        csv_path (`str`): path to the model coefficients csv
+        reload_seconds (`float`): minimum interval between artifact checks, 0 checks on every call
+        preprocess_path (`str`): path to the preprocessing parameters folded into the coefficients
+    """
+
+    def __init__(self, csv_path, reload_seconds=5, preprocess_path=None):
+        self.csv_path = csv_path
+        self.reload_seconds = reload_seconds
+        self.preprocess_path = preprocess_path
+        self._lock = threading.Lock()
+        self._checked_at = time.monotonic()
+        self._model = load_coefficients(csv_path, preprocess_path)
+        logger.info("Loaded model %s from %s", self._model.version[:12], csv_path)
+
+    @property
+    def model(self):
+        """`Model`: current model snapshot, refreshed if the artifact changed"""
+
+        if time.monotonic() - self._checked_at >= self.reload_seconds:
+            self.refresh()
+
+        return self._model
+
+    def refresh(self):
+        """Reload the model if the artifact on disk changed
+
+        Returns:
+            reloaded (`bool`): whether a new model was swapped in
+        """
+
+        # Only one thread checks the artifact, the others keep using the current model
+        if not self._lock.acquire(blocking=False):
+            return False
+
+        try:
+            self._checked_at = time.monotonic()
+            current = self._model
+            try:
+                mtime = artifact_mtime(self.csv_path, self.preprocess_path)
+                if mtime == current.mtime:
+                    return False
+                if artifact_version(self.csv_path, self.preprocess_path) == current.version:
+                    self._model = current._replace(mtime=mtime)
+                    return False
+                model = load_coefficients(self.csv_path, self.preprocess_path)
+            except Exception as e:
+                logger.warning("Failed to reload model from %s, keep serving %s",
+                               self.csv_path, current.version[:12])
+                logger.warning(e)
+                return False
+
+            self._model = model
+            logger.info("Reloaded model %s from %s", model.version[:12], self.csv_path)
+            return True
+        finally:
+            self._lock.release()
+
+    def predict(self, X):
+        """Score applicants with the current model
+
+        Args:
+            X (`array-like`): raw features in `config.Columns` order, shape (n_features,) or (n, n_features)
+
+        Returns:
+            pred (`ndarray`): chance of admit rounded to two decimals and clipped to [0,1]
+        """
+
+        return score(self.model, X)
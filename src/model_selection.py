@@ -1,24 +1,22 @@
 import sys
+import os
+import time
+import json
 import logging
 import logging.config
 import warnings
 warnings.filterwarnings('ignore')
 
-import sklearn
-from sklearn import model_selection
-from sklearn.model_selection import cross_val_score
-from sklearn.linear_model import LinearRegression, Lasso
-from sklearn.ensemble import RandomForestRegressor
-from sklearn.model_selection import ShuffleSplit
 import pandas as pd
 import numpy as np
 
 sys.path.append('./config')
 import config
+import columnar
+import fast_cv
+import cv_cache
 
 
-# Logger setup
-logging.config.fileConfig(config.LOGGING_CONFIG, disable_existing_loggers=False)
 logger = logging.getLogger(__file__)
 
 
@@ -26,16 +24,19 @@ def load_data(clean_location):
     """Load cleaned feautres and target data from local, and do train test split
 
     Args:
-        clean_location (`str`): path to cleaned data
+        clean_location (`str`): path to cleaned data, a csv or a directory of .npy columns
 
     Returns:
         df (`DataFrame`): loaded data
 
     """
 
-    # Load data
+    # Load data, columnar data is memory-mapped instead of parsed
     try:
-        df = pd.read_csv(clean_location)
+        if os.path.isdir(clean_location):
+            df = columnar.read_columnar(clean_location)
+        else:
+            df = pd.read_csv(clean_location)
 
         logger.info("Successfully loaded features and target data!")
     except FileNotFoundError:
@@ -59,9 +60,11 @@ def split(df, columns, target, split_params):
         y_train (`Series`): target of training set
         y_test (`Series`): target of test set
     """
+    from sklearn.model_selection import train_test_split
+
     try:
         # Train test split
-        X_train, X_test, y_train, y_test = model_selection.train_test_split(
+        X_train, X_test, y_train, y_test = train_test_split(
             df[columns], df[target], test_size=split_params['test_size'],
             random_state=split_params['random_state'])
 
@@ -87,6 +90,9 @@ def cv_linear(X_train, y_train, model_params):
 
     """
 
+    from sklearn.linear_model import LinearRegression
+    from sklearn.model_selection import ShuffleSplit, cross_val_score
+
     try:
         lr = LinearRegression()
         cv = ShuffleSplit(n_splits=model_params['cv'],
@@ -117,6 +123,9 @@ def cv_lasso(X_train, y_train, model_params):
 
     """
 
+    from sklearn.linear_model import Lasso
+    from sklearn.model_selection import ShuffleSplit, cross_val_score
+
     try:
         lasso = Lasso()
         cv = ShuffleSplit(n_splits=model_params['cv'],
@@ -147,6 +156,9 @@ def cv_rf(X_train, y_train, model_params):
 
     """
 
+    from sklearn.ensemble import RandomForestRegressor
+    from sklearn.model_selection import ShuffleSplit, cross_val_score
+
     try:
         rf = RandomForestRegressor(random_state=model_params['random_state'])
         cv = ShuffleSplit(n_splits=model_params['cv'],
@@ -163,19 +175,477 @@ def cv_rf(X_train, y_train, model_params):
         return "Failed cv_rf"
 
 
-def write_models_perform(r2, rmse, perform_path):
+def load_candidates(candidates):
+    """Build the model candidates declared in config
+
+    Args:
+        candidates (`dict`): model name to the dotted path of its estimator class `model`,
+            its fixed `params`, the `search` space of its hyperparameters and, for a Lasso
+            or ElasticNet, its regularization `path`
+
+    Return:
+        models (`dict`): model name to an unfitted estimator, its search space and its path, None if not given
+
+    """
+
+    import importlib
+
+    models = {}
+    for name, candidate in candidates.items():
+        module, cls = candidate['model'].rsplit('.', 1)
+        estimator = getattr(importlib.import_module(module), cls)(**candidate.get('params', {}))
+        models[name] = (estimator, candidate.get('search', {}), candidate.get('path'))
+
+    return models
+
+
+def sample_params(space, n_iter, random_state):
+    """Sample hyperparameter settings from a declarative search space
+
+    A list gives the values to choose from, a dict a `loguniform`, `uniform` or `randint`
+    distribution between `low` and `high`. A space of lists only smaller than `n_iter` is
+    searched exhaustively.
+
+    Args:
+        space (`dict`): hyperparameter name to its values or distribution
+        n_iter (`int`): number of settings to sample
+        random_state (`int`): random state of the sampling
+
+    Return:
+        settings (`list of dict`): hyperparameter settings, a single empty one for an empty space
+
+    """
+
+    from scipy import stats
+    from sklearn.model_selection import ParameterGrid, ParameterSampler
+
+    if not space:
+        return [{}]
+
+    distributions = {}
+    for param, values in space.items():
+        if isinstance(values, dict):
+            kind, low, high = values['distribution'], values['low'], values['high']
+            if kind == 'loguniform':
+                distributions[param] = getattr(stats, 'loguniform', stats.reciprocal)(low, high)
+            elif kind == 'uniform':
+                distributions[param] = stats.uniform(low, high - low)
+            elif kind == 'randint':
+                distributions[param] = stats.randint(low, high + 1)
+            else:
+                raise ValueError("Unknown distribution {} of {}".format(kind, param))
+        else:
+            distributions[param] = list(values)
+
+    if all(isinstance(values, list) for values in distributions.values()):
+        n_iter = min(n_iter, len(ParameterGrid(distributions)))
+
+    return list(ParameterSampler(distributions, n_iter, random_state=random_state))
+
+
+def search_models(X_train, y_train, candidates, cv_params, scoring, refit, n_iter, n_jobs=None, cache=None):
+    """Randomized search of every model candidate, all settings and folds in one parallel run
+
+    Args:
+        X_train (`DataFrame`): Training set features
+        y_train (`Series`): Training set target
+        candidates (`dict`): model name to an unfitted estimator, its search space and its path
+        cv_params (`dict`): number of folds `cv`, `test_size` and `random_state` of the splits
+        scoring (`dict`): metric name to sklearn scoring name
+        refit (`str`): metric of `scoring` whose mean selects the best setting, higher is better
+        n_iter (`int`): number of settings sampled per model
+        n_jobs (`int`): number of processes, -1 uses every CPU, None runs in this process
+        cache (`dict`): cache settings, as `cv_models`; only the settings not cached are fitted
+
+    Return:
+        results (`dict`): model name to the cross validation results of its best setting,
+            with its `params`, the number of `settings` tried and the `search_time` in seconds of
+            the settings fitted in this run, NaN and `cached` when every setting was cached, and
+            the cache `key` of the best setting, None when caching is disabled.
+            Candidates with a regularization path are searched along it by `cv_path` instead,
+            their results hold the scores of every alpha in `path`
+
+    """
+
+    from sklearn.base import clone
+
+    settings = {}
+    models = {}
+    for name, (estimator, space, path) in candidates.items():
+        if path is not None:
+            continue
+        settings[name] = sample_params(space, n_iter, cv_params['random_state'])
+        for i, params in enumerate(settings[name]):
+            models[(name, i)] = clone(estimator).set_params(**params)
+
+    # The training set is fingerprinted once for every candidate
+    cache = _open_cache(cache, np.asarray(X_train), np.asarray(y_train).ravel())
+    scores = cv_models(X_train, y_train, models, cv_params, scoring, n_jobs, cache) if models else {}
+
+    results = {}
+    for name, (estimator, _, path) in candidates.items():
+        if path is not None:
+            results[name] = cv_path(X_train, y_train, estimator, path, cv_params, scoring, refit, n_jobs, cache)
+            logger.debug("Best {} of {} alphas: {}".format(name, results[name]['settings'], results[name]['params']))
+            continue
+        keys = [(name, i) for i in range(len(settings[name]))]
+        best = max(keys, key=lambda key: np.mean(scores[key][refit]))
+        # Cached settings were timed in an earlier run, the search time only spans this one
+        fitted = [key for key in keys if not scores[key]['cached']]
+        search_time = (max(scores[key]['end'] for key in fitted) - min(scores[key]['start'] for key in fitted)
+                       if fitted else float('nan'))
+        key = (cv_cache.cache_key(cache['fingerprint'], models[best], cv_params, scoring)
+               if cache is not None else None)
+        results[name] = dict(scores[best], params=settings[name][best[1]], settings=len(keys),
+                             search_time=search_time, cached=not fitted, key=key)
+        logger.debug("Best {} of {} settings: {}".format(name, len(keys), results[name]['params']))
+
+    return results
+
+
+def _path_fold(estimator, X, y, train, test, l1_ratio, alphas, scorers):
+    """Fit the regularization path on one fold and score every alpha on its test split"""
+
+    from sklearn.base import clone
+    from sklearn.linear_model import enet_path
+
+    start = time.time()
+    x_mean = X[train].mean(axis=0)
+    y_mean = y[train].mean()
+    _, coefs, _ = enet_path(X[train] - x_mean, y[train] - y_mean, l1_ratio=l1_ratio, alphas=alphas,
+                            max_iter=estimator.max_iter, tol=estimator.tol)
+    fitted = time.time()
+
+    # Each alpha is scored as the estimator fitted with it, its intercept recovered from the centering
+    model = clone(estimator)
+    scores = {metric: [] for metric in scorers}
+    for j in range(len(alphas)):
+        model.coef_ = coefs[:, j]
+        model.intercept_ = y_mean - x_mean.dot(coefs[:, j])
+        for metric, scorer in scorers.items():
+            scores[metric].append(scorer(model, X[test], y[test]))
+
+    return l1_ratio, scores, (coefs != 0).sum(axis=0), fitted - start, time.time() - fitted, start, time.time()
+
+
+def path_alphas(X, y, l1_ratio, n_alphas=100, eps=1e-3):
+    """Decreasing alphas from the smallest one that zeroes every coefficient down to `eps` times it
+
+    Args:
+        X (`ndarray`): features
+        y (`ndarray`): target
+        l1_ratio (`float`): share of the L1 penalty, 1 for the Lasso
+        n_alphas (`int`): number of alphas
+        eps (`float`): ratio of the smallest to the largest alpha
+
+    Return:
+        alphas (`ndarray`): alphas, evenly spaced on a log scale
+
+    """
+
+    if not 0 < l1_ratio <= 1:
+        raise ValueError("l1_ratio must be in (0, 1], got {}".format(l1_ratio))
+
+    alpha_max = np.abs((X - X.mean(axis=0)).T.dot(y - y.mean())).max() / (len(y) * l1_ratio)
+
+    return np.logspace(np.log10(alpha_max), np.log10(alpha_max * eps), n_alphas)
+
+
+def cv_path(X_train, y_train, estimator, path, cv_params, scoring, refit, n_jobs=None, cache=None):
+    """Cross validate a Lasso or ElasticNet along its whole regularization path
+
+    Each fold fits every alpha in one coordinate descent run, warm started from the
+    solution of the previous, larger alpha, so the whole path costs about as much as a
+    few single fits. Every fold shares the alphas of the full training set so that the
+    scores of an alpha can be averaged; folds and l1 ratios run in `n_jobs` processes.
+
+    Args:
+        X_train (`DataFrame`): Training set features
+        y_train (`Series`): Training set target
+        estimator (`object`): unfitted Lasso or ElasticNet
+        path (`dict`): number of alphas `n_alphas`, ratio `eps` of the smallest to the largest
+            alpha and, for an ElasticNet, the `l1_ratio` values searched
+        cv_params (`dict`): number of folds `cv`, `test_size` and `random_state` of the splits
+        scoring (`dict`): metric name to sklearn scoring name
+        refit (`str`): metric of `scoring` whose mean selects the best alpha, higher is better
+        n_jobs (`int`): number of processes, -1 uses every CPU, None runs in this process
+        cache (`dict`): cache settings, as `cv_models`
+
+    Return:
+        result (`dict`): cross validation results of the best alpha as `search_models`, and
+            the mean scores and number of nonzero coefficients of every alpha in `path`
+
+    """
+
+    from joblib import Parallel, delayed
+    from sklearn.linear_model import ElasticNet, Lasso
+    from sklearn.metrics import get_scorer
+
+    if not isinstance(estimator, ElasticNet):
+        raise ValueError("{} has no regularization path".format(type(estimator).__name__))
+
+    X = np.asarray(X_train, dtype=np.float64)
+    y = np.asarray(y_train, dtype=np.float64).ravel()
+
+    cache = _open_cache(cache, X, y)
+    key = None
+    if cache is not None:
+        key = cv_cache.cache_key(cache['fingerprint'], estimator, cv_params, scoring,
+                                 {'path': path, 'refit': refit})
+        result = cv_cache.load(cache['directory'], key)
+        if result is not None:
+            logger.info("{} path reused from the cache".format(type(estimator).__name__))
+            return dict(result, search_time=float('nan'), cached=True, key=key, **CACHED_TIMINGS)
+
+    folds = make_folds(X, cv_params)
+    scorers = {metric: get_scorer(name) for metric, name in scoring.items()}
+    elastic = not isinstance(estimator, Lasso)
+    l1_ratios = list(path.get('l1_ratio', [estimator.l1_ratio])) if elastic else [1.0]
+    alphas = {l1_ratio: path_alphas(X, y, l1_ratio, path.get('n_alphas', 100), path.get('eps', 1e-3))
+              for l1_ratio in l1_ratios}
+
+    tasks = Parallel(n_jobs=n_jobs)(delayed(_path_fold)(estimator, X, y, train, test, l1_ratio,
+                                                        alphas[l1_ratio], scorers)
+                                    for l1_ratio in l1_ratios for train, test in folds)
+
+    scores = {l1_ratio: {metric: [] for metric in scoring} for l1_ratio in l1_ratios}
+    nonzero = {l1_ratio: [] for l1_ratio in l1_ratios}
+    fit_time = score_time = 0.0
+    spans = []
+    for l1_ratio, fold_scores, fold_nonzero, fit, score, start, end in tasks:
+        for metric, values in fold_scores.items():
+            scores[l1_ratio][metric].append(values)
+        nonzero[l1_ratio].append(fold_nonzero)
+        fit_time += fit
+        score_time += score
+        spans.append((start, end))
+
+    rows = []
+    best = None
+    for l1_ratio in l1_ratios:
+        # Scores of shape (folds, alphas)
+        fold_scores = {metric: np.array(values) for metric, values in scores[l1_ratio].items()}
+        fold_nonzero = np.array(nonzero[l1_ratio])
+        for j, alpha in enumerate(alphas[l1_ratio]):
+            row = {'l1_ratio': l1_ratio, 'alpha': alpha, 'nonzero': fold_nonzero[:, j].mean()}
+            row.update({metric: values[:, j].mean() for metric, values in fold_scores.items()})
+            rows.append(row)
+            if best is None or row[refit] > best[0][refit]:
+                best = (row, {metric: values[:, j] for metric, values in fold_scores.items()})
+
+    row, best_scores = best
+    params = {'alpha': float(row['alpha'])}
+    if elastic:
+        params['l1_ratio'] = float(row['l1_ratio'])
+    start = min(start for start, _ in spans)
+    end = max(end for _, end in spans)
+
+    result = dict(best_scores, params=params, settings=len(rows), fit_time=fit_time, score_time=score_time,
+                  start=start, end=end, wall_time=end - start, search_time=end - start, path=pd.DataFrame(rows),
+                  cached=False)
+    if cache is not None:
+        cv_cache.save(cache['directory'], key, result, cache['max_bytes'])
+
+    return dict(result, key=key)
+
+
+def predict_latency(estimator, X, repeat=100):
+    """Median time to score a single applicant, as the serving path does
+
+    Args:
+        estimator (`object`): fitted estimator
+        X (`DataFrame`): features, the first row is scored
+        repeat (`int`): number of timed predictions
+
+    Return:
+        latency (`float`): median seconds per prediction
+
+    """
+
+    row = np.asarray(X)[:1]
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        estimator.predict(row)
+        timings.append(time.perf_counter() - start)
+
+    return float(np.median(timings))
+
+
+def serving_latency(estimator, result, X_train, y_train, X_test, cache=None):
+    """Predict latency of the best setting of a search, refitted on the whole training set
+
+    The latency is stored in the cache entry of the setting, under the key of its cross
+    validation result, so that a search reused from the cache is not refitted to time it.
+
+    Args:
+        estimator (`object`): unfitted estimator of the candidate
+        result (`dict`): result of the candidate from `search_models`
+        X_train (`DataFrame`): Training set features
+        y_train (`Series`): Training set target
+        X_test (`DataFrame`): Test set features, the first row is scored
+        cache (`dict`): cache `directory` and its size bound `max_bytes`, None disables the cache
+
+    Return:
+        latency (`float`): median milliseconds per prediction
+
+    """
+
+    if result['cached'] and 'predict_latency_ms' in result:
+        return result['predict_latency_ms']
+
+    estimator = estimator.set_params(**result['params'])
+    estimator.fit(np.asarray(X_train), np.asarray(y_train).ravel())
+    latency = predict_latency(estimator, X_test) * 1000
+
+    if cache and result.get('key') is not None:
+        entry = cv_cache.load(cache.get('directory'), result['key'])
+        if entry is not None:
+            cv_cache.save(cache['directory'], result['key'], dict(entry, predict_latency_ms=latency),
+                          cache['max_bytes'])
+
+    return latency
+
+
+def make_folds(X, cv_params):
+    """Train and test indices of the cross validation splits, shared by every model"""
+
+    from sklearn.model_selection import ShuffleSplit
+
+    cv = ShuffleSplit(n_splits=cv_params['cv'],
+                      test_size=cv_params['test_size'],
+                      random_state=cv_params['random_state'])
+
+    return list(cv.split(X))
+
+
+def _fit_and_score(name, estimator, X, y, train, test, scorers):
+    """Fit a model on one fold and compute every metric on its test split"""
+
+    from sklearn.base import clone
+
+    start = time.time()
+    estimator = clone(estimator).fit(X[train], y[train])
+    fitted = time.time()
+    scores = {metric: scorer(estimator, X[test], y[test]) for metric, scorer in scorers.items()}
+
+    return name, scores, fitted - start, time.time() - fitted, start, time.time()
+
+
+# Timings of a result reused from the cache, which were measured in an earlier run
+CACHED_TIMINGS = dict.fromkeys(['fit_time', 'score_time', 'start', 'end', 'wall_time'], float('nan'))
+
+
+def _open_cache(cache, X, y):
+    """Complete a cache setting with the fingerprint of the training set, None if caching is disabled"""
+
+    if not cache or cache.get('directory') is None:
+        return None
+    if cache.get('fingerprint') is None:
+        cache = dict(cache, fingerprint=cv_cache.data_fingerprint(X, y))
+
+    return cache
+
+
+def cv_models(X_train, y_train, models, cv_params, scoring, n_jobs=None, cache=None):
+    """ Cross validate several models on the same folds, every metric from one fit per fold
+
+    The fits of every model on every fold are independent tasks, run concurrently by
+    `n_jobs` processes. OLS and ridge models are scored from sufficient statistics by
+    `fast_cv` instead, without refitting from rows. Models whose result is cached for the
+    same training set, hyperparameters and cross validation settings are not refitted.
+
+    Args:
+        X_train (`DataFrame`): Training set features
+        y_train (`Series`): Training set target
+        models (`dict`): model name to unfitted estimator
+        cv_params (`dict`): number of folds `cv`, `test_size` and `random_state` of the splits
+        scoring (`dict`): metric name to sklearn scoring name
+        n_jobs (`int`): number of processes, -1 uses every CPU, None runs in this process
+        cache (`dict`): cache `directory` and its size bound `max_bytes`, optionally the
+            `fingerprint` of the training set, None disables the cache
+
+    Return:
+        results (`dict`): model name to the per-fold scores of each metric, and its total
+            `fit_time` and `score_time`, its `start` and `end` times and `wall_time` in seconds,
+            `cached` when it was not refitted, its timings are then NaN
+
+    """
+
+    from joblib import Parallel, delayed
+    from sklearn.metrics import get_scorer
+
+    X = np.asarray(X_train)
+    y = np.asarray(y_train).ravel()
+
+    cache = _open_cache(cache, X, y)
+    keys = {}
+    cached = {}
+    if cache is not None:
+        for name, model in models.items():
+            keys[name] = cv_cache.cache_key(cache['fingerprint'], model, cv_params, scoring)
+            result = cv_cache.load(cache['directory'], keys[name])
+            if result is not None:
+                cached[name] = dict(result, cached=True, **CACHED_TIMINGS)
+        logger.info("{} of {} model results reused from the cache".format(len(cached), len(models)))
+    models = {name: model for name, model in models.items() if name not in cached}
+
+    folds = make_folds(X, cv_params)
+    scorers = {metric: get_scorer(name) for metric, name in scoring.items()}
+
+    fast = {name: model for name, model in models.items() if fast_cv.supports(model, scoring.values())}
+    tasks = Parallel(n_jobs=n_jobs)(delayed(_fit_and_score)(name, model, X, y, train, test, scorers)
+                                    for name, model in models.items() if name not in fast
+                                    for train, test in folds)
+
+    results = {name: {metric: [] for metric in scoring} for name in models}
+    spans = {name: [] for name in models}
+    for name, model in fast.items():
+        start = time.time()
+        scores = fast_cv.cross_validate(X, y, folds, scoring, getattr(model, 'alpha', 0.0), model.fit_intercept)
+        results[name] = dict(scores, fit_time=time.time() - start, score_time=0.0)
+        spans[name].append((start, time.time()))
+    for name, scores, fit_time, score_time, start, end in tasks:
+        for metric, score in scores.items():
+            results[name][metric].append(score)
+        results[name]['fit_time'] = results[name].get('fit_time', 0) + fit_time
+        results[name]['score_time'] = results[name].get('score_time', 0) + score_time
+        spans[name].append((start, end))
+
+    for name, result in results.items():
+        for metric in scoring:
+            result[metric] = np.array(result[metric])
+        # Folds of a model may run concurrently, its wall time spans the first to the last one
+        result['start'] = min(start for start, _ in spans[name])
+        result['end'] = max(end for _, end in spans[name])
+        result['wall_time'] = result['end'] - result['start']
+        result['cached'] = False
+        logger.debug("Cross validated {} on {} folds in {:.2f}s".format(name, len(folds), result['wall_time']))
+        if cache is not None:
+            cv_cache.save(cache['directory'], keys[name], result, cache['max_bytes'])
+
+    results.update(cached)
+
+    return results
+
+
+def write_models_perform(r2, rmse, perform_path, index=('linear', 'lasso', 'rf'), columns=None):
     """Write model performance to csv
 
     Args:
-        r2 (`list of float64`): list of r2 metric for three models
-        rmse (`list of float64`): list of rmse metric for three models
+        r2 (`list of float64`): list of r2 metric for each model
+        rmse (`list of float64`): list of rmse metric for each model
         perform_path (`str`): path to save model performance
+        index (`list of str`): model names
+        columns (`dict`): other column names to their list of values for each model
 
     """
 
     try:
-        pd.DataFrame({'r2':r2, 'rmse':rmse}, index = ['linear','lasso','rf'])\
-            .to_csv(perform_path)
+        perform = pd.DataFrame({'r2':r2, 'rmse':rmse}, index=list(index))
+        for column, values in (columns or {}).items():
+            perform[column] = values
+        perform.to_csv(perform_path)
         logger.info("Model performance metrics written to {}".format(perform_path))
     except FileNotFoundError:
         logger.error("Check valid model performance path")
@@ -187,7 +657,9 @@ def write_models_perform(r2, rmse, perform_path):
 if __name__ == "__main__":
     """Prepare, train, and evaluate the model to predict chance of admit"""
 
-    clean_location = config.Path_To_Clean_File
+    logging.config.fileConfig(config.LOGGING_CONFIG, disable_existing_loggers=False)
+
+    clean_location = config.Path_To_Clean_Columnar if config.Clean_Format == 'npy' else config.Path_To_Clean_File
     columns = config.Columns
     target = config.Target
     split_params = config.split_params
@@ -205,25 +677,32 @@ if __name__ == "__main__":
         sys.exit(1)
 
     try:
-        # calculate rmse
-        model_params = config.model_params_rmse
-        linear = cv_linear(X_train, y_train, model_params)
-        lasso = cv_lasso(X_train, y_train, model_params)
-        rf = cv_rf(X_train, y_train, model_params)
-
-        rmse = [np.mean(np.sqrt(-1 * (linear))),
-                np.mean(np.sqrt(-1 * (lasso))),
-                np.mean(np.sqrt(-1 * (rf)))]
-
-        # calculate r2
-        model_params = config.model_params_r2
-        linear = cv_linear(X_train, y_train, model_params)
-        lasso = cv_lasso(X_train, y_train, model_params)
-        rf = cv_rf(X_train, y_train, model_params)
-
-        r2 = [np.mean(linear),
-              np.mean(lasso),
-              np.mean(rf)]
+        # Every setting of every model in one parallel run, every metric from one fit per fold
+        candidates = load_candidates(config.Model_Candidates)
+        start = time.perf_counter()
+        cache = {'directory': config.Selection_Cache_Directory, 'max_bytes': config.Selection_Cache_Bytes}
+        results = search_models(X_train, y_train, candidates, config.model_cv_params, config.model_scoring,
+                                config.Search_Refit_Metric, config.Search_Iterations, config.Selection_N_Jobs,
+                                cache)
+        logger.info("Searched {} models in {:.2f}s".format(len(candidates), time.perf_counter() - start))
+
+        names = list(candidates)
+        rmse = [np.mean(np.sqrt(-1 * results[name]['mse'])) for name in names]
+        r2 = [np.mean(results[name]['r2']) for name in names]
+
+        # Serving cost of the best setting of each model, reused from the cache with its search
+        latency = []
+        for name in names:
+            latency.append(serving_latency(candidates[name][0], results[name], X_train, y_train, X_test, cache))
+            search = 'cached' if results[name]['cached'] else '{:.2f}s'.format(results[name]['search_time'])
+            logger.info("{}: best of {} settings {}, search time {}, predict latency {:.3f}ms"
+                        .format(name, results[name]['settings'], results[name]['params'], search, latency[-1]))
+        columns = {'fit_time': [results[name]['fit_time'] / config.model_cv_params['cv'] for name in names],
+                   'predict_latency_ms': latency,
+                   'search_time': [results[name]['search_time'] for name in names],
+                   'settings': [results[name]['settings'] for name in names],
+                   'cached': [results[name]['cached'] for name in names],
+                   'params': [json.dumps(results[name]['params'], sort_keys=True, default=str) for name in names]}
     except Exception as e:
         logger.error("Failed to train the model.")
         logger.error(e)
@@ -231,6 +710,18 @@ if __name__ == "__main__":
 
     perform_path = config.Selection_Perform_Path
     try:
-        write_models_perform(r2, rmse, perform_path)
+        write_models_perform(r2, rmse, perform_path, names, columns)
     except FileNotFoundError:
         logger.error("Please check valid model performance path!")
+
+    paths = [results[name]['path'].assign(model=name) for name in names if 'path' in results[name]]
+    if paths:
+        try:
+            scores = pd.concat(paths, ignore_index=True)
+            if 'mse' in scores:
+                scores['rmse'] = np.sqrt(-1 * scores['mse'])
+            scores[['model'] + [column for column in scores if column != 'model']] \
+                .to_csv(config.Selection_Path_Scores_Path, index=False)
+            logger.info("Regularization path scores saved to {}".format(config.Selection_Path_Scores_Path))
+        except FileNotFoundError:
+            logger.error("Please check valid model selection path scores path!")
@@ -0,0 +1,335 @@
+import sys
+import os
+import logging
+import logging.config
+import argparse
+import hashlib
+import json
+import shutil
+import subprocess
+import time
+from collections import namedtuple
+
+sys.path.append('./config')
+import config
+
+logger = logging.getLogger(__file__)
+
+MANIFEST = 'manifest.json'
+
+# One step of the pipeline, declared in `config.Pipeline_Stages`
+Stage = namedtuple('Stage', ['name', 'script', 'sources', 'inputs', 'outputs', 'config'])
+
+
+def load_stages(stages, settings):
+    """Build the pipeline stages from their declaration
+
+    Args:
+        stages (`list of dict`): stage declarations, as `config.Pipeline_Stages`
+        settings (`module`): module holding the config values named by each stage
+
+    Returns:
+        stages (`list of Stage`): stages with the values of their config names
+    """
+
+    return [Stage(name=stage['name'], script=stage['script'], sources=list(stage['sources']),
+                  inputs=list(stage['inputs']), outputs=list(stage['outputs']),
+                  config={name: getattr(settings, name) for name in stage['config']})
+            for stage in stages]
+
+
+def path_digest(path):
+    """Hash the content of a file, or of every file under a directory
+
+    Args:
+        path (`str`): file or directory
+
+    Returns:
+        digest (`str`): hex sha256 digest, None if the path does not exist
+    """
+
+    if os.path.isfile(path):
+        sha = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                sha.update(block)
+        return sha.hexdigest()
+
+    if os.path.isdir(path):
+        sha = hashlib.sha256()
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for name in sorted(files):
+                file_path = os.path.join(root, name)
+                sha.update(os.path.relpath(file_path, path).encode())
+                sha.update(path_digest(file_path).encode())
+        return sha.hexdigest()
+
+    return None
+
+
+def fingerprint(stage):
+    """Fingerprint everything a stage's outputs depend on
+
+    Args:
+        stage (`Stage`): pipeline stage
+
+    Returns:
+        fingerprint (`str`): hex sha256 of the stage source, input content and config values
+
+    Raises:
+        FileNotFoundError: when a source or an input of the stage does not exist
+    """
+
+    parts = {'name': stage.name, 'outputs': stage.outputs, 'config': stage.config,
+             'sources': {}, 'inputs': {}}
+    for key, paths in [('sources', [stage.script] + stage.sources), ('inputs', stage.inputs)]:
+        for path in paths:
+            digest = path_digest(path)
+            if digest is None:
+                raise FileNotFoundError("{} of stage {} not found: {}".format(key[:-1].capitalize(), stage.name, path))
+            parts[key][path] = digest
+
+    blob = json.dumps(parts, sort_keys=True, default=repr)
+
+    return hashlib.sha256(blob.encode()).hexdigest()
+
+
+def path_mtime(path):
+    """Modification time of a file, or of the newest file under a directory
+
+    Args:
+        path (`str`): file or directory
+
+    Returns:
+        mtime (`float`): seconds since the epoch, None if the path does not exist
+    """
+
+    if os.path.isdir(path):
+        mtimes = [os.stat(os.path.join(root, name)).st_mtime
+                  for root, _, files in os.walk(path) for name in files]
+        return max(mtimes) if mtimes else os.stat(path).st_mtime
+    if os.path.exists(path):
+        return os.stat(path).st_mtime
+
+    return None
+
+
+def stale_outputs(stage, since):
+    """Outputs of a stage that are missing or were not written since a time
+
+    Args:
+        stage (`Stage`): pipeline stage
+        since (`float`): seconds since the epoch the stage started at
+
+    Returns:
+        stale (`list of str`): outputs not written by the run, an empty list if all were
+    """
+
+    # Outputs must also be newer than the inputs they are made from
+    inputs = [path_mtime(path) for path in stage.inputs]
+    since = max([since] + [mtime for mtime in inputs if mtime is not None])
+    # Truncated to the second, for filesystems with coarse timestamps
+    since = int(since)
+
+    return [path for path in stage.outputs if path_mtime(path) is None or path_mtime(path) < since]
+
+
+def _copy(source, target):
+    """Replace `target` by a copy of the file or directory `source`"""
+
+    if os.path.isdir(target):
+        shutil.rmtree(target)
+    elif os.path.exists(target):
+        os.remove(target)
+    if os.path.dirname(target):
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+    if os.path.isdir(source):
+        shutil.copytree(source, target)
+    else:
+        shutil.copy2(source, target)
+
+
+def store(stage, entry, seconds):
+    """Copy the outputs of a stage that just ran into its cache entry
+
+    Args:
+        stage (`Stage`): pipeline stage
+        entry (`str`): cache directory of the stage fingerprint
+        seconds (`float`): run time of the stage
+    """
+
+    tmp = entry + '.tmp'
+    if os.path.exists(tmp):
+        shutil.rmtree(tmp)
+    os.makedirs(tmp)
+
+    outputs = []
+    for i, path in enumerate(stage.outputs):
+        digest = path_digest(path)
+        if digest is not None:
+            _copy(path, os.path.join(tmp, str(i)))
+        outputs.append({'path': path, 'digest': digest})
+
+    with open(os.path.join(tmp, MANIFEST), 'w') as f:
+        json.dump({'stage': stage.name, 'outputs': outputs, 'seconds': seconds, 'created': time.time()}, f, indent=2)
+
+    if os.path.exists(entry):
+        shutil.rmtree(entry)
+    os.replace(tmp, entry)
+
+
+def restore(entry):
+    """Bring the outputs of a stage back from its cache entry
+
+    Args:
+        entry (`str`): cache directory of the stage fingerprint
+
+    Returns:
+        restored (`int`): number of outputs copied, outputs already up to date are not
+    """
+
+    with open(os.path.join(entry, MANIFEST)) as f:
+        manifest = json.load(f)
+
+    restored = 0
+    for i, output in enumerate(manifest['outputs']):
+        if output['digest'] is None or path_digest(output['path']) == output['digest']:
+            continue
+        _copy(os.path.join(entry, str(i)), output['path'])
+        restored += 1
+
+    # Mark the entry as recently used
+    os.utime(os.path.join(entry, MANIFEST))
+
+    return restored
+
+
+def evict(stage_directory, keep):
+    """Delete the least recently used cache entries of a stage beyond `keep`"""
+
+    entries = [os.path.join(stage_directory, name) for name in os.listdir(stage_directory)
+               if os.path.exists(os.path.join(stage_directory, name, MANIFEST))]
+    entries.sort(key=lambda entry: os.stat(os.path.join(entry, MANIFEST)).st_mtime, reverse=True)
+    for entry in entries[keep:]:
+        shutil.rmtree(entry)
+        logger.debug("Evicted cache entry %s", entry)
+
+
+def run_stage(stage, cache_directory, force=False, keep=3):
+    """Run a stage, or reuse its outputs cached for the same fingerprint
+
+    A run fails when the script exits with an error, or when it does not write every one of
+    the stage outputs, as scripts that log an error and exit normally do.
+
+    Args:
+        stage (`Stage`): pipeline stage
+        cache_directory (`str`): root of the pipeline cache
+        force (`bool`): run the stage even when its outputs are cached
+        keep (`int`): number of cache entries kept for the stage
+
+    Returns:
+        result (`dict`): stage name, status (cached, restored, ran or failed), fingerprint and seconds
+    """
+
+    start = time.perf_counter()
+    key = fingerprint(stage)
+    stage_directory = os.path.join(cache_directory, stage.name)
+    entry = os.path.join(stage_directory, key)
+    result = {'stage': stage.name, 'fingerprint': key}
+
+    if not force and os.path.exists(os.path.join(entry, MANIFEST)):
+        restored = restore(entry)
+        result['status'] = 'restored' if restored else 'cached'
+        result['seconds'] = time.perf_counter() - start
+        return result
+
+    started = time.time()
+    proc = subprocess.run([sys.executable, stage.script])
+    result['seconds'] = time.perf_counter() - start
+    if proc.returncode != 0:
+        result['status'] = 'failed'
+        return result
+
+    stale = stale_outputs(stage, started)
+    if stale:
+        logger.error("Stage {} exited normally without writing {}".format(stage.name, ', '.join(stale)))
+        result['status'] = 'failed'
+        return result
+
+    store(stage, entry, result['seconds'])
+    evict(stage_directory, keep)
+    result['status'] = 'ran'
+
+    return result
+
+
+def run_pipeline(stages, cache_directory, force=(), keep=3):
+    """Run the stages in order, stopping at the first failure
+
+    Args:
+        stages (`list of Stage`): pipeline stages
+        cache_directory (`str`): root of the pipeline cache
+        force (`list of str`): names of the stages to run even when cached
+        keep (`int`): number of cache entries kept per stage
+
+    Returns:
+        report (`list of dict`): result of each stage that was reached
+    """
+
+    report = []
+    for stage in stages:
+        result = run_stage(stage, cache_directory, stage.name in force, keep)
+        report.append(result)
+        logger.info("Stage {} {} in {:.1f}s ({})".format(stage.name, result['status'], result['seconds'],
+                                                          result['fingerprint'][:12]))
+        if result['status'] == 'failed':
+            break
+
+    return report
+
+
+if __name__ == "__main__":
+    """Run the pipeline stages whose inputs changed since their outputs were cached"""
+
+    parser = argparse.ArgumentParser(description='Run the pipeline, reusing the outputs of unchanged stages.')
+    parser.add_argument("--force",
+                        "-f",
+                        default=None,
+                        nargs='*',
+                        help="Stages to run even when cached, every stage if given without names")
+    parser.add_argument("--stages",
+                        "-s",
+                        default=None,
+                        nargs='+',
+                        help="Stages to run, every stage if not given")
+    args = parser.parse_args()
+
+    logging.config.fileConfig(config.LOGGING_CONFIG, disable_existing_loggers=False)
+
+    stages = load_stages(config.Pipeline_Stages, config)
+    if args.stages is not None:
+        stages = [stage for stage in stages if stage.name in args.stages]
+    force = [stage.name for stage in stages] if args.force == [] else args.force or []
+
+    try:
+        report = run_pipeline(stages, config.Pipeline_Cache_Directory, force, config.Pipeline_Cache_Keep)
+    except Exception as e:
+        logger.error("Failed to run the pipeline")
+        logger.error(e)
+        sys.exit(1)
+
+    logger.info('{:>16} {:>9} {:>9} {:>13}'.format('stage', 'status', 'seconds', 'fingerprint'))
+    for result in report:
+        logger.info('{:>16} {:>9} {:>9.1f} {:>13}'.format(result['stage'], result['status'], result['seconds'],
+                                                           result['fingerprint'][:12]))
+
+    try:
+        os.makedirs(os.path.dirname(config.Pipeline_Report_Path), exist_ok=True)
+        with open(config.Pipeline_Report_Path, 'w') as f:
+            json.dump(report, f, indent=2)
+    except FileNotFoundError:
+        logger.error("Please provide a valid location to write the pipeline report")
+
+    if report and report[-1]['status'] == 'failed':
+        sys.exit(1)
@@ -3,8 +3,6 @@ import sys
 import logging
 import logging.config
 
-import boto3
-
 sys.path.append('./config')
 import config
 
@@ -14,13 +12,14 @@ ACCESS_KEY = os.environ.get("AWS_ACCESS_KEY_ID")
 SECRET_KEY = os.environ.get("AWS_SECRET_ACCESS_KEY")
 
 # Logger set up
-logging.config.fileConfig(config.LOGGING_CONFIG, disable_existing_loggers=False)
 logger = logging.getLogger(__file__)
 
 
 def store_to_s3():
     """ Persist raw data to s3 bucket """
 
+    import boto3
+
     try:
         # establish aws/s3 connection
         s3 = boto3.client('s3',
@@ -53,6 +52,8 @@ if __name__ == "__main__":
     and then download raw data from s3 to local
     """
 
+    logging.config.fileConfig(config.LOGGING_CONFIG, disable_existing_loggers=False)
+
     try:
         store_to_s3()
     except Exception as e:
@@ -5,22 +5,19 @@ import logging.config
 import warnings
 warnings.filterwarnings('ignore')
 
-import sklearn
-from sklearn import model_selection
-from sklearn.linear_model import LinearRegression
-from sklearn.ensemble import RandomForestRegressor
-from sklearn import metrics
-import matplotlib.pyplot as plt
+import argparse
+import json
 import pandas as pd
 import numpy as np
 import pickle
+import shutil
 
 sys.path.append('./config')
 import config
+import columnar
+import fast_cv
 
 
-# Logger Setup
-logging.config.fileConfig(config.LOGGING_CONFIG, disable_existing_loggers=False)
 logger = logging.getLogger(__file__)
 
 
@@ -28,16 +25,19 @@ def load_data(clean_location):
     """Load cleaned feautres and target data from local, and do train test split
 
     Args:
-        clean_location (`str`): path to cleaned data
+        clean_location (`str`): path to cleaned data, a csv or a directory of .npy columns
 
     Returns:
         df (`DataFrame`): loaded data
 
     """
 
-    # Load data
+    # Load data, columnar data is memory-mapped instead of parsed
     try:
-        df = pd.read_csv(clean_location)
+        if os.path.isdir(clean_location):
+            df = columnar.read_columnar(clean_location)
+        else:
+            df = pd.read_csv(clean_location)
 
         logger.info("Successfully loaded features and target data!")
     except FileNotFoundError:
@@ -61,9 +61,11 @@ def split(df, columns, target, split_params):
         y_train (`Series`): target of training set
         y_test (`Series`): target of test set
     """
+    from sklearn.model_selection import train_test_split
+
     try:
         # Train test split
-        X_train, X_test, y_train, y_test = model_selection.train_test_split(
+        X_train, X_test, y_train, y_test = train_test_split(
             df[columns], df[target], test_size=split_params['test_size'],
             random_state=split_params['random_state'])
 
@@ -87,6 +89,8 @@ def train_model(X_train, y_train):
         lr (`TMO`): trained linear regression model object
     """
 
+    from sklearn.linear_model import LinearRegression
+
     # Set up regressor
     lr = LinearRegression()
 
@@ -100,6 +104,120 @@ def train_model(X_train, y_train):
         return "Failed train_model"
 
 
+def split_mask(rows, split_params):
+    """Rows of the training set, as `split` draws them, without loading the data
+
+    Args:
+        rows (`int`): number of rows of the data
+        split_params (`dict`): parameters for train test split
+
+    Returns:
+        train (`ndarray`): boolean mask of the training rows
+    """
+    from sklearn.model_selection import train_test_split
+
+    # The shuffle only depends on the number of rows and the random state
+    train_index, _ = train_test_split(np.arange(rows), test_size=split_params['test_size'],
+                                      random_state=split_params['random_state'])
+    train = np.zeros(rows, dtype=bool)
+    train[train_index] = True
+
+    return train
+
+
+def _chunks(clean_location, columns, target, start, stop, chunksize):
+    """Yield the features and target of the rows [start, stop) in chunks, as float64 arrays"""
+
+    if os.path.isdir(clean_location):
+        # Only the pages of the rows in the chunk are read from the memory-mapped columns
+        df = columnar.read_columnar(clean_location, columns + [target])
+        for begin in range(start, stop, chunksize):
+            end = min(begin + chunksize, stop)
+            yield begin, (np.column_stack([df[col].values[begin:end] for col in columns]).astype(np.float64),
+                          df[target].values[begin:end].astype(np.float64))
+    else:
+        begin = 0
+        for chunk in pd.read_csv(clean_location, usecols=columns + [target], chunksize=chunksize):
+            yield begin, (chunk[columns].values.astype(np.float64), chunk[target].values.astype(np.float64))
+            begin += len(chunk)
+
+
+def _partition_stats(clean_location, columns, target, start, stop, train, shift, chunksize):
+    """Accumulate the sufficient statistics of the training and test rows of a partition"""
+
+    x_shift, y_shift = shift
+    train_stats, test_stats = [], []
+    for begin, (X, y) in _chunks(clean_location, columns, target, start, stop, chunksize):
+        X -= x_shift
+        y -= y_shift
+        mask = train[begin - start:begin - start + len(y)]
+        train_stats.append(fast_cv.sufficient_stats(X[mask], y[mask]))
+        test_stats.append(fast_cv.sufficient_stats(X[~mask], y[~mask]))
+
+    return fast_cv.combine(train_stats), fast_cv.combine(test_stats)
+
+
+def train_model_out_of_core(clean_location, columns, target, split_params, chunksize, n_jobs=None):
+    """Train the linear regression model without loading the training set in memory
+
+    The rows are streamed in chunks to accumulate X'X and X'y of the training set, from
+    which the exact least squares coefficients are solved. Columnar data is split in
+    partitions of rows accumulated concurrently by `n_jobs` processes, then summed; csv
+    data is streamed in a single pass. The rows are split as `split` does.
+
+    Args:
+        clean_location (`str`): path to cleaned data, a csv or a directory of .npy columns
+        columns (`list of str`): list of feature column names
+        target (`str`): target colume name
+        split_params (`dict`): parameters for train test split
+        chunksize (`int`): rows read at once
+        n_jobs (`int`): number of processes for columnar data, -1 uses every CPU, None runs in this process
+
+    Returns:
+        lr (`TMO`): trained linear regression model object
+        performance (`dict`): r2 and rmse of the model on the test set
+    """
+    from joblib import Parallel, delayed, effective_n_jobs
+    from sklearn.linear_model import LinearRegression
+
+    if os.path.isdir(clean_location):
+        with open(os.path.join(clean_location, columnar.MANIFEST)) as f:
+            rows = json.load(f)['rows']
+    else:
+        # Counted by the csv reader, lines are not rows when a quoted field spans several
+        rows = sum(len(chunk) for chunk in pd.read_csv(clean_location, usecols=[target], chunksize=chunksize))
+    train = split_mask(rows, split_params)
+
+    # Statistics are accumulated around the mean of the first chunk, so that X'X stays well conditioned
+    _, (X, y) = next(_chunks(clean_location, columns, target, 0, min(chunksize, rows), chunksize))
+    shift = (X.mean(axis=0), y.mean())
+
+    partitions = [(0, rows)]
+    if os.path.isdir(clean_location):
+        bounds = np.linspace(0, rows, max(1, min(effective_n_jobs(n_jobs), -(-rows // chunksize))) + 1).astype(int)
+        partitions = list(zip(bounds[:-1], bounds[1:]))
+    stats = Parallel(n_jobs=n_jobs)(delayed(_partition_stats)(clean_location, columns, target, start, stop,
+                                                              train[start:stop], shift, chunksize)
+                                    for start, stop in partitions)
+    train_stats = fast_cv.combine([train_stats for train_stats, _ in stats])
+    test_stats = fast_cv.combine([test_stats for _, test_stats in stats])
+    logger.debug("Accumulated {} training rows in {} partitions".format(train_stats.n, len(partitions)))
+
+    # Solved on the shifted data, the slopes are the same and the intercept shifts back
+    coefs = fast_cv.solve(train_stats)
+    lr = LinearRegression()
+    lr.coef_ = coefs[1:]
+    lr.intercept_ = coefs[0] + shift[1] - shift[0].dot(coefs[1:])
+    lr.n_features_in_ = len(columns)
+    lr.feature_names_in_ = np.array(columns, dtype=object)
+    logger.debug("Fitted a linear regression out of core!")
+
+    performance = {'r2': fast_cv.score(test_stats, coefs, 'r2'),
+                   'rmse': -fast_cv.score(test_stats, coefs, 'neg_root_mean_squared_error')}
+
+    return lr, performance
+
+
 def feature_importance(X_train, y_train, fig_directory, feature_plot_path, random_state):
     """Find feature importance by ranfom forest and save figure to local
 
@@ -113,6 +231,11 @@ def feature_importance(X_train, y_train, fig_directory, feature_plot_path, rando
     Return:
         None
     """
+    from sklearn.ensemble import RandomForestRegressor
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
     try:
         classifier = RandomForestRegressor(random_state=random_state)
         classifier.fit(X_train, y_train)
@@ -149,6 +272,8 @@ def model_performance(lr, X_test, y_test, model_eval_path):
         None
     """
 
+    from sklearn import metrics
+
     try:
         # Check model performance
         ypred = lr.predict(X_test)
@@ -159,6 +284,18 @@ def model_performance(lr, X_test, y_test, model_eval_path):
         logger.error("Failed to evaluate model performance")
         logger.error(e)
 
+    write_performance(r2, rmse, model_eval_path)
+
+
+def write_performance(r2, rmse, model_eval_path):
+    """Write performance metrics of the final model to csv
+
+    Args:
+        r2 (`float`): r2 of the model on the test set
+        rmse (`float`): rmse of the model on the test set
+        model_eval_path (`str`): path to write model performance metrics
+    """
+
     try:
         # Write performance to csv
         pd.DataFrame({'r2': [r2], 'rmse': [rmse]})\
@@ -196,46 +333,91 @@ def save_model(lr, initial_features, csv_path, pickle_path):
         logger.error("Please provide valid location to store model")
 
 
+def save_preprocess(source, preprocess_path):
+    """Save the preprocessing parameters of the training data next to the final model
+
+    Args:
+        source (`str`): path of the preprocessing parameters written by clean.py
+        preprocess_path (`str`): path to write them next to the model
+    """
+
+    try:
+        shutil.copyfile(source, preprocess_path)
+        logger.info("Preprocessing parameters saved to %s", preprocess_path)
+    except FileNotFoundError:
+        logger.error("Please run clean.py to write the preprocessing parameters of the training data")
+
+
 if __name__ == "__main__":
     """Prepare, train, and evaluate the model to classify clouds"""
 
-    clean_location = config.Path_To_Clean_File
+    parser = argparse.ArgumentParser(description='Train and evaluate the final model.')
+    parser.add_argument("--no-plots",
+                        default=False,
+                        action="store_true",
+                        help="If given, skip the random forest feature importance plot")
+    parser.add_argument("--chunksize",
+                        "-c",
+                        default=config.Train_Chunk_Size,
+                        type=int,
+                        help="If given, train out of core by streaming the clean data in chunks of this many rows")
+    args = parser.parse_args()
+
+    logging.config.fileConfig(config.LOGGING_CONFIG, disable_existing_loggers=False)
+
+    clean_location = config.Path_To_Clean_Columnar if config.Clean_Format == 'npy' else config.Path_To_Clean_File
     columns = config.Columns
     target = config.Target
     split_params = config.split_params
 
-    try:
-        # Load data and perform train test split
-        df = load_data(clean_location)
-        X_train, X_test, y_train, y_test = split(df, columns, target, split_params)
-    except FileNotFoundError:
-        logger.error("Please provide valid features and target file path")
-        sys.exit(1)
-    except Exception as e:
-        logger.error("Failed to load and split the data into train and test sets")
-        logger.error(e)
-        sys.exit(1)
-
-    lr = train_model(X_train, y_train)
-
-    try:
-        model_eval_path = config.Final_Mode_Eval_Path
-        model_performance(lr, X_test, y_test, model_eval_path)
-
-        fig_directory = config.fig_direcotry
-        feature_plot_path = config.Feature_Plot_Name
-        random_state = config.Random_state
-        feature_importance(X_train, y_train, fig_directory,
-                           feature_plot_path, random_state)
-    except Exception as e:
-        logger.error("Failed to evaluate final model performance and feature importance")
-        logger.error(e)
-        sys.exit(1)
+    if args.chunksize is not None:
+        try:
+            # Only one chunk of rows per process is in memory, the feature importance plot needs them all
+            lr, performance = train_model_out_of_core(clean_location, columns, target, split_params,
+                                                      args.chunksize, config.Train_N_Jobs)
+            write_performance(performance['r2'], performance['rmse'], config.Final_Mode_Eval_Path)
+        except FileNotFoundError:
+            logger.error("Please provide valid features and target file path")
+            sys.exit(1)
+        except Exception as e:
+            logger.error("Failed to train the final model out of core")
+            logger.error(e)
+            sys.exit(1)
+    else:
+        try:
+            # Load data and perform train test split
+            df = load_data(clean_location)
+            X_train, X_test, y_train, y_test = split(df, columns, target, split_params)
+        except FileNotFoundError:
+            logger.error("Please provide valid features and target file path")
+            sys.exit(1)
+        except Exception as e:
+            logger.error("Failed to load and split the data into train and test sets")
+            logger.error(e)
+            sys.exit(1)
+
+        lr = train_model(X_train, y_train)
+
+        try:
+            model_eval_path = config.Final_Mode_Eval_Path
+            model_performance(lr, X_test, y_test, model_eval_path)
+
+            if not args.no_plots:
+                fig_directory = config.fig_direcotry
+                feature_plot_path = config.Feature_Plot_Name
+                random_state = config.Random_state
+                feature_importance(X_train, y_train, fig_directory,
+                                   feature_plot_path, random_state)
+        except Exception as e:
+            logger.error("Failed to evaluate final model performance and feature importance")
+            logger.error(e)
+            sys.exit(1)
 
     csv_path = config.Model_CSV_Path
     pickle_path = config.Model_Pickle_Path
     try:
         save_model(lr, columns, csv_path, pickle_path)
+        save_preprocess(config.Path_To_Preprocess, config.Model_Preprocess_Path)
     except Exception as e:
         logger.error("Failed to persist final models")
         logger.error(e)
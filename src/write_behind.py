@@ -0,0 +1,188 @@
+import logging
+import os
+import queue
+import threading
+import time
+
+
+logger = logging.getLogger(__name__)
+
+
+class WriteBehindBuffer:
+    """Buffer records in a bounded queue and bulk insert them from a background thread
+
+    A batch is flushed with one executemany INSERT as soon as `batch_size` records are
+    queued, or `flush_seconds` after the first record of the batch arrived. The flusher
+    thread is started lazily in the process that first calls `put`, so the buffer can be
+    created before worker processes are forked.
+
+    Args:
+        engine (`Engine`): SQLAlchemy engine of the application database
+        table (`Table`): table the records are inserted into
+        maxsize (`int`): maximum number of queued records
+        batch_size (`int`): maximum number of records per INSERT
+        flush_seconds (`float`): maximum time a record waits before it is flushed
+        put_timeout (`float`): seconds `put` blocks on a full queue before raising `queue.Full`
+        write_lock (`Lock`): lock held while flushing, to serialize writers of the database
+        failures (`Counter`): failed database operations, increased with operation='insert' when a batch is dropped
+    """
+
+    def __init__(self, engine, table, maxsize=10000, batch_size=500, flush_seconds=1.0, put_timeout=0.1,
+                 write_lock=None, failures=None):
+        self.engine = engine
+        self.table = table
+        self.maxsize = maxsize
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.put_timeout = put_timeout
+        self.write_lock = write_lock
+        self.failures = failures
+        self._pid = None
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._reset_stats()
+
+    def _reset_stats(self):
+        self.rows_flushed = 0
+        self.rows_failed = 0
+        self.flushes = 0
+        self.flush_seconds_total = 0.0
+        self.last_flush_seconds = 0.0
+        self.max_flush_seconds = 0.0
+
+    def _ensure_started(self):
+        """Start the flusher thread once per process"""
+
+        if self._pid == os.getpid():
+            return
+
+        with self._start_lock:
+            if self._pid == os.getpid():
+                return
+            # Threads and queue locks do not survive a fork, start fresh in this process
+            self._queue = queue.Queue(maxsize=self.maxsize)
+            self._stop = threading.Event()
+            self._reset_stats()
+            self._thread = threading.Thread(target=self._run, name='write-behind', daemon=True)
+            self._thread.start()
+            self._pid = os.getpid()
+            logger.info("Started write-behind flusher in process %s", self._pid)
+
+    def put(self, record):
+        """Queue a record to be inserted
+
+        Args:
+            record (`dict`): column values of the record
+
+        Raises:
+            queue.Full: when the queue stays full for `put_timeout` seconds
+        """
+
+        self._ensure_started()
+        self._queue.put(record, timeout=self.put_timeout)
+
+    def _next_batch(self):
+        """Block until a batch is due, by size or by time"""
+
+        batch = []
+        deadline = None
+        while len(batch) < self.batch_size:
+            if deadline is None:
+                timeout = self.flush_seconds
+            else:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+            try:
+                batch.append(self._queue.get(timeout=timeout))
+            except queue.Empty:
+                if batch or self._stop.is_set():
+                    break
+                continue
+            if deadline is None:
+                deadline = time.monotonic() + self.flush_seconds
+
+        return batch
+
+    def _run(self):
+        while not (self._stop.is_set() and self._queue.empty()):
+            batch = self._next_batch()
+            if batch:
+                self.flush(batch)
+
+    def flush(self, batch):
+        """Bulk insert a batch of records in one transaction
+
+        Args:
+            batch (`list of dict`): records to insert
+        """
+
+        start = time.perf_counter()
+        try:
+            if self.write_lock is not None:
+                self.write_lock.acquire()
+            try:
+                with self.engine.begin() as conn:
+                    conn.execute(self.table.insert(), batch)
+            finally:
+                if self.write_lock is not None:
+                    self.write_lock.release()
+        except Exception as e:
+            with self._stats_lock:
+                self.rows_failed += len(batch)
+            # Counted as the synchronous path counts a failed insert, so that outages are alerted on
+            if self.failures is not None:
+                self.failures.inc(operation='insert')
+            logger.error("Failed to flush {} records to {}, dropped them".format(len(batch), self.table.name))
+            logger.error(e)
+            return
+
+        elapsed = time.perf_counter() - start
+        with self._stats_lock:
+            self.rows_flushed += len(batch)
+            self.flushes += 1
+            self.flush_seconds_total += elapsed
+            self.last_flush_seconds = elapsed
+            self.max_flush_seconds = max(self.max_flush_seconds, elapsed)
+        logger.debug("Flushed %s records in %.4fs, queue depth %s",
+                     len(batch), elapsed, self.queue_depth)
+
+    @property
+    def queue_depth(self):
+        """`int`: number of records waiting to be flushed"""
+
+        return self._queue.qsize() if self._pid == os.getpid() else 0
+
+    def stats(self):
+        """Report queue depth and flush latency
+
+        Returns:
+            stats (`dict`): queue depth, row and flush counts and flush latencies in seconds
+        """
+
+        with self._stats_lock:
+            return {'queue_depth': self.queue_depth,
+                    'rows_flushed': self.rows_flushed,
+                    'rows_failed': self.rows_failed,
+                    'flushes': self.flushes,
+                    'last_flush_seconds': self.last_flush_seconds,
+                    'max_flush_seconds': self.max_flush_seconds,
+                    'mean_flush_seconds': self.flush_seconds_total / self.flushes if self.flushes else 0.0}
+
+    def close(self, timeout=10):
+        """Flush every queued record and stop the flusher thread
+
+        Args:
+            timeout (`float`): seconds to wait for the queue to drain
+        """
+
+        if self._pid != os.getpid():
+            return
+
+        self._stop.set()
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            logger.warning("Write-behind flusher did not drain within {}s, {} records left"
+                           .format(timeout, self.queue_depth))
+        logger.info("Write-behind buffer closed: {}".format(self.stats()))
+        self._pid = None
@@ -0,0 +1,123 @@
+import sys
+from os import path
+import pytest
+import sqlalchemy as sql
+from sqlalchemy.orm import sessionmaker
+import warnings
+warnings.filterwarnings('ignore')
+
+sys.path.append('./src')
+import application_db
+
+
+PROJECT_HOME = path.dirname(path.dirname(path.abspath(__file__)))
+admits = [0.5, 0.87, 0.87, 0.12, 1.0]
+
+
+def make_session(engine_string, admits):
+    engine = sql.create_engine(engine_string)
+    application_db.Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    for admit in admits:
+        session.add(application_db.Applications(gre=320, toefl=110, univ_rating=4, sop=4.0,
+                                                lor=4.0, cgpa=3.5, research=1, admit=admit))
+    session.commit()
+    return session
+
+
+def test_admit_stats_happy(tmp_path):
+    '''Happy path unit test for admit_stats(session, bins, percentiles)'''
+
+    session = make_session('sqlite:///{}'.format(tmp_path / 'app.db'), admits)
+    result_test = application_db.admit_stats(session, bins=4, percentiles=(0, 50, 100))
+
+    assert result_test['count'] == 5
+    assert result_test['mean'] == pytest.approx(0.672)
+    assert result_test['min'] == 0.12 and result_test['max'] == 1.0
+    assert result_test['percentiles'] == {'p0': 0.12, 'p50': 0.87, 'p100': 1.0}
+    assert result_test['histogram']['counts'] == [1, 0, 1, 3]
+
+
+def test_admit_stats_unhappy(tmp_path):
+    '''Unhappy path unit test for admit_stats(session, bins, percentiles) of an empty table'''
+
+    session = make_session('sqlite:///{}'.format(tmp_path / 'app.db'), [])
+    result_test = application_db.admit_stats(session, bins=2)
+
+    assert result_test['count'] == 0
+    assert result_test['mean'] is None
+    assert result_test['histogram']['counts'] == [0, 0]
+
+
+def test_migrate_db_happy(tmp_path):
+    '''Happy path unit test for migrate_db(engine_string) of a table with text columns'''
+
+    engine_string = 'sqlite:///{}'.format(tmp_path / 'app.db')
+    engine = sql.create_engine(engine_string)
+    engine.execute("CREATE TABLE applications (id INTEGER PRIMARY KEY, gre INTEGER, toefl INTEGER, "
+                   "univ_rating INTEGER, sop VARCHAR(100), lor VARCHAR(100), cgpa VARCHAR(100), "
+                   "research INTEGER, admit VARCHAR(100))")
+    engine.execute("INSERT INTO applications VALUES (7, 320, 110, 4, '4.5', '4.0', '3.5', 1, '0.87')")
+
+    assert application_db.migrate_db(engine_string)
+    assert engine.execute("SELECT id, typeof(admit), admit FROM applications").fetchall() == [(7, 'real', 0.87)]
+    assert 'ix_applications_admit' in [index['name'] for index in sql.inspect(engine).get_indexes('applications')]
+
+
+def test_migrate_db_unhappy(tmp_path):
+    '''Unhappy path unit test for migrate_db(engine_string) of an already numeric table'''
+
+    engine_string = 'sqlite:///{}'.format(tmp_path / 'app.db')
+    make_session(engine_string, admits)
+
+    assert not application_db.migrate_db(engine_string)
+
+
+def test_bulk_ingest_happy(tmp_path):
+    '''Happy path unit test for bulk_ingest(engine_string, csv_path, column_map, batch_size)'''
+
+    engine_string = 'sqlite:///{}'.format(tmp_path / 'app.db')
+    csv_path = str(tmp_path / 'history.csv')
+    with open(csv_path, 'w') as f:
+        f.write("GRE,gre_extra,toefl,univ_rating,sop,lor,cgpa,research,admit\n"
+                "320,0,110,4,4.5,4.0,3.5,1,0.87\n"
+                "300,0,100,3,3.0,3.5,,0,0.5\n"
+                "310,0,105,3,3.0,3.5,3.0,0,0.6\n")
+    result_test = application_db.bulk_ingest(engine_string, csv_path, {'GRE': 'gre'}, batch_size=2)
+
+    engine = sql.create_engine(engine_string)
+    assert result_test == 2
+    assert engine.execute("SELECT gre, cgpa, admit FROM applications ORDER BY id").fetchall() == \
+        [(320, 3.5, 0.87), (310, 3.0, 0.6)]
+
+
+def test_bulk_ingest_unhappy(tmp_path):
+    '''Unhappy path unit test for bulk_ingest(engine_string, csv_path, column_map, batch_size)'''
+
+    engine_string = 'sqlite:///{}'.format(tmp_path / 'app.db')
+    csv_path = str(tmp_path / 'history.csv')
+    with open(csv_path, 'w') as f:
+        f.write("gre,toefl\n320,110\n")
+
+    with pytest.raises(ValueError):
+        application_db.bulk_ingest(engine_string, csv_path, {}, batch_size=2)
+
+
+def test_configure_sqlite_happy(tmp_path):
+    '''Happy path unit test for configure_sqlite(engine, busy_timeout_ms, synchronous)'''
+
+    engine = sql.create_engine('sqlite:///{}'.format(tmp_path / 'app.db'))
+    application_db.configure_sqlite(engine, busy_timeout_ms=1234)
+
+    assert engine.execute('PRAGMA journal_mode').scalar() == 'wal'
+    assert engine.execute('PRAGMA busy_timeout').scalar() == 1234
+    assert engine.execute('PRAGMA synchronous').scalar() == 1
+
+
+def test_configure_sqlite_unhappy():
+    '''Unhappy path unit test for configure_sqlite(engine) of an in-memory database without WAL'''
+
+    engine = sql.create_engine('sqlite://')
+    application_db.configure_sqlite(engine)
+
+    assert engine.execute('PRAGMA journal_mode').scalar() == 'memory'
@@ -0,0 +1,98 @@
+import sys
+import io
+from os import path
+import pytest
+import pandas as pd
+import numpy as np
+import warnings
+warnings.filterwarnings('ignore')
+
+sys.path.append('./src')
+import batch
+
+
+PROJECT_HOME = path.dirname(path.dirname(path.abspath(__file__)))
+features = ['a', 'b']
+
+
+def test_json_features_happy():
+    '''Happy path unit test for json_features(records, columns)'''
+
+    records = [{'a': 1, 'b': 2, 'c': 3}, {'b': 4, 'a': 5}]
+    result_true = np.array([[1., 2.], [5., 4.]])
+    result_test = batch.json_features(records, features)
+
+    assert np.array_equal(result_test, result_true)
+
+
+def test_json_features_unhappy():
+    '''Unhappy path unit test for json_features(records, columns)'''
+
+    records = [{'a': 1}]
+
+    with pytest.raises(ValueError):
+        batch.json_features(records, features)
+
+
+def test_csv_features_happy():
+    '''Happy path unit test for csv_features(stream, columns, chunksize)'''
+
+    stream = io.StringIO("b,a\n1,2\n3,4\n5,6\n")
+    result_test = list(batch.csv_features(stream, features, 2))
+
+    assert len(result_test) == 2
+    assert np.array_equal(np.vstack(result_test), np.array([[2., 1.], [4., 3.], [6., 5.]]))
+
+
+def test_csv_features_unhappy():
+    '''Unhappy path unit test for csv_features(stream, columns, chunksize)'''
+
+    stream = io.StringIO("a,b\n1,2\n3,\n")
+
+    with pytest.raises(ValueError):
+        list(batch.csv_features(stream, features, 10))
+
+
+def test_ndjson_lines_happy():
+    '''Happy path unit test for ndjson_lines(pred, start)'''
+
+    result_true = '{"row": 3, "admit": 0.50}\n{"row": 4, "admit": 1.00}\n'
+    result_test = batch.ndjson_lines(np.array([0.5, 1]), start=3)
+
+    assert result_test == result_true
+
+
+def test_jsonl_features_happy():
+    '''Happy path unit test for jsonl_features(stream, columns, chunksize)'''
+
+    stream = io.BytesIO(b'{"a": 1, "b": 2}\n\n{"b": 4, "a": 5}\n{"a": 6, "b": 7}\n')
+    result_test = list(batch.jsonl_features(stream, features, 2))
+
+    assert [len(X) for X in result_test] == [2, 1]
+    assert np.array_equal(np.vstack(result_test), np.array([[1., 2.], [5., 4.], [6., 7.]]))
+
+
+def test_jsonl_features_unhappy():
+    '''Unhappy path unit test for jsonl_features(stream, columns, chunksize) of a malformed line'''
+
+    stream = io.BytesIO(b'{"a": 1, "b": 2}\n{"a": 1,\n')
+
+    with pytest.raises(ValueError):
+        list(batch.jsonl_features(stream, features, 10))
+
+
+def test_json_features_type_unhappy():
+    '''Unhappy path unit test for json_features(records, columns) of booleans, strings and overflowing numbers'''
+
+    for value in [True, "3", None, 1e400]:
+        with pytest.raises(ValueError, match="Row 1 feature 'b'"):
+            batch.json_features([{'a': 1, 'b': 2}, {'a': 1, 'b': value}], features)
+
+
+def test_csv_features_finite_unhappy():
+    '''Unhappy path unit test for csv_features(stream, columns, chunksize) of an infinite value in a later chunk'''
+
+    stream = io.StringIO("a,b\n1,2\n3,4\n5,1e400\n")
+
+    with pytest.raises(ValueError, match="Row 2 feature 'b'"):
+        list(batch.csv_features(stream, features, 2))
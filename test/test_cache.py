@@ -0,0 +1,68 @@
+import sys
+from os import path
+import pytest
+import warnings
+warnings.filterwarnings('ignore')
+
+sys.path.append('./src')
+import cache
+
+
+PROJECT_HOME = path.dirname(path.dirname(path.abspath(__file__)))
+record = {'id': 1, 'gre': 320, 'admit': 0.87}
+
+
+def test_latest_cache_happy():
+    '''Happy path unit test for LatestCache.set(record) and get()'''
+
+    latest = cache.LatestCache(ttl=30)
+    latest.set(record)
+
+    assert latest.get() == record
+
+
+def test_latest_cache_unhappy():
+    '''Unhappy path unit test for LatestCache.get() on expired or invalidated entries'''
+
+    latest = cache.LatestCache(ttl=-1)
+    latest.set(record)
+    assert latest.get() is None
+
+    latest = cache.LatestCache(ttl=30)
+    latest.set(record)
+    latest.invalidate()
+    assert latest.get() is None
+
+
+def test_feature_key_happy():
+    '''Happy path unit test for feature_key(features)'''
+
+    assert cache.feature_key(['320', 110.0, -0.0]) == cache.feature_key([320.00001, '110', 0])
+
+
+def test_prediction_cache_happy():
+    '''Happy path unit test for PredictionCache.get(key, version) and put(key, version, pred)'''
+
+    predictions = cache.PredictionCache(maxsize=2)
+    assert predictions.get((1.0,), 'v1') is None
+    predictions.put((1.0,), 'v1', 0.5)
+    predictions.put((2.0,), 'v1', 0.6)
+    assert predictions.get((1.0,), 'v1') == 0.5
+    predictions.put((3.0,), 'v1', 0.7)
+
+    assert predictions.get((2.0,), 'v1') is None
+    assert predictions.stats() == {'size': 2, 'hits': 1, 'misses': 2,
+                                   'evictions': 1, 'invalidations': 0}
+
+
+def test_prediction_cache_unhappy():
+    '''Unhappy path unit test for PredictionCache.get(key, version) after the model changed'''
+
+    predictions = cache.PredictionCache()
+    predictions.get((1.0,), 'v1')
+    predictions.put((1.0,), 'v1', 0.5)
+
+    assert predictions.get((1.0,), 'v2') is None
+    predictions.put((1.0,), 'v1', 0.5)
+    assert predictions.get((1.0,), 'v2') is None
+    assert predictions.stats()['invalidations'] == 1
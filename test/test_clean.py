@@ -33,3 +33,173 @@ def test_featurize_unhappy():
 
     assert result_test.equals(result_true)
 
+
+def test_write_preprocess_happy(tmp_path):
+    '''Happy path unit test for write_preprocess(scaler, col, path) reproducing featurize(df, col)'''
+
+    df = pd.DataFrame([6.8, 8.0, 9.92], columns=['cgpa'])
+    scaler = clean.fit_scaler(df, 'cgpa')
+    params = clean.write_preprocess(scaler, 'cgpa', str(tmp_path / 'preprocess.json'))['cgpa']
+    result_test = df['cgpa'].values * params['scale'] + params['offset']
+    result_true = clean.featurize(df.copy(), 'cgpa')['cgpa'].values
+
+    assert np.allclose(result_test, result_true)
+    assert (tmp_path / 'preprocess.json').exists()
+
+
+def test_write_preprocess_unhappy(tmp_path):
+    '''Unhappy path unit test for write_preprocess(scaler, col, path) to a missing directory'''
+
+    scaler = clean.fit_scaler(pd.DataFrame([0.0, 10.0], columns=['cgpa']), 'cgpa')
+    path = str(tmp_path / 'missing' / 'preprocess.json')
+    result_test = clean.write_preprocess(scaler, 'cgpa', path)
+
+    assert result_test['cgpa']['scale'] == pytest.approx(0.4)
+    assert not (tmp_path / 'missing').exists()
+
+
+def test_stream_clean_happy(tmp_path):
+    '''Happy path unit test for stream_clean(filename, clean_filename, col, chunksize)'''
+
+    raw = str(tmp_path / 'raw.csv')
+    pd.DataFrame({'Serial No.': range(1, 11),
+                  'cgpa': [9.65, 8.87, 8.0, 8.67, 8.21, 9.34, 8.2, 7.9, 8.0, 8.6],
+                  'admit': [0.92, 0.76, 0.72, 0.8, 0.65, 0.9, 0.75, 0.68, 0.5, 0.45]}).to_csv(raw, index=False)
+    in_memory = str(tmp_path / 'in_memory.csv')
+    streamed = str(tmp_path / 'streamed.csv')
+    clean.write_csv(clean.featurize(clean.load_data(raw), 'cgpa'), in_memory)
+    rows = clean.stream_clean(raw, streamed, 'cgpa', chunksize=3)
+
+    assert rows == 10
+    with open(in_memory, 'rb') as f, open(streamed, 'rb') as g:
+        assert f.read() == g.read()
+
+
+def test_stream_clean_unhappy(tmp_path):
+    '''Unhappy path unit test for stream_clean(filename, clean_filename, col, chunksize)'''
+
+    with pytest.raises(FileNotFoundError):
+        clean.stream_clean(str(tmp_path / 'missing.csv'), str(tmp_path / 'clean.csv'), 'cgpa', 3)
+
+
+schema = {'gre': {'dtype': 'int64', 'min': 260, 'max': 340},
+          'cgpa': {'dtype': 'float64', 'min': 0, 'max': 10},
+          'research': {'dtype': 'int64', 'allowed': [0, 1]}}
+
+
+def test_validate_happy():
+    '''Happy path unit test for validate(df, schema)'''
+
+    df = pd.DataFrame({'gre': [320, 200, 310.5, None, 330],
+                       'cgpa': ['9.1', '8.0', 'n/a', '7.5', '11'],
+                       'research': [1, 1, 0, 2, 0]})
+    valid, rejected, report = clean.validate(df, schema)
+
+    assert valid.index.tolist() == [0]
+    assert valid['gre'].dtype == np.int64 and valid['cgpa'].tolist() == [9.1]
+    assert rejected['reasons'].tolist() == ['gre: below 260',
+                                            'gre: not integer; cgpa: not numeric',
+                                            'gre: missing; research: not in [0, 1]',
+                                            'cgpa: above 10']
+    assert report['rejected'] == 4 and report['failed']['gre: below 260'] == 1
+
+
+def test_validate_unhappy():
+    '''Unhappy path unit test for validate(df, schema) of data missing a schema column'''
+
+    with pytest.raises(ValueError):
+        clean.validate(pd.DataFrame({'gre': [320]}), schema)
+
+
+def test_stream_clean_schema_happy(tmp_path):
+    '''Happy path unit test for stream_clean(..., schema, quarantine_filename) matching the in-memory path'''
+
+    raw = str(tmp_path / 'raw.csv')
+    pd.DataFrame({'gre': [320, 200, 310, 330, 300, 250, 315],
+                  'cgpa': [9.1, 8.0, 7.2, 8.8, 9.9, 7.0, 8.1],
+                  'research': [1, 1, 0, 2, 0, 1, 1]}).to_csv(raw, index=False)
+    in_memory = str(tmp_path / 'in_memory.csv')
+    streamed = str(tmp_path / 'streamed.csv')
+    quarantine = str(tmp_path / 'quarantine.csv')
+    valid, _, _ = clean.validate(clean.load_data(raw), schema)
+    clean.write_csv(clean.featurize(valid, 'cgpa'), in_memory)
+    rows = clean.stream_clean(raw, streamed, 'cgpa', chunksize=3, schema=schema, quarantine_filename=quarantine)
+
+    assert rows == 4
+    with open(in_memory, 'rb') as f, open(streamed, 'rb') as g:
+        assert f.read() == g.read()
+    assert pd.read_csv(quarantine, index_col=0).index.tolist() == [1, 3, 5]
+
+
+def test_stream_clean_schema_unhappy(tmp_path):
+    '''Unhappy path unit test for stream_clean(..., schema) of a file whose every row is rejected'''
+
+    raw = str(tmp_path / 'raw.csv')
+    pd.DataFrame({'gre': [200, 250], 'cgpa': [8.0, 7.0], 'research': [1, 2]}).to_csv(raw, index=False)
+    preprocess = str(tmp_path / 'preprocess.json')
+
+    with pytest.raises(ValueError, match="Every row"):
+        clean.stream_clean(raw, str(tmp_path / 'clean.csv'), 'cgpa', chunksize=1, preprocess_path=preprocess,
+                           schema=schema)
+    assert not path.exists(preprocess)
+
+
+def test_profile_happy(tmp_path):
+    '''Happy path unit test for Profile.update(df) over chunks matching pandas statistics'''
+
+    rng = np.random.RandomState(0)
+    df = pd.DataFrame({'gre': rng.randint(260, 341, 100), 'cgpa': rng.uniform(6, 10, 100) + 1e6,
+                       'research': rng.randint(0, 2, 100)})
+    profile = clean.Profile(clean.profile_edges({**schema, 'cgpa': {'min': 0, 'max': 2e6}}, bins=4))
+    for start in range(0, 100, 30):
+        profile.update(df[start:start + 30])
+    profile.save(str(tmp_path / 'profile.json'))
+    result_test = clean.load_profile(str(tmp_path / 'profile.json'))
+
+    assert result_test['rows'] == 100
+    assert np.allclose(result_test['cov'], df.cov().values)
+    assert np.allclose(result_test['corr'], df.corr().values)
+    assert result_test['stats']['cgpa']['var'] == pytest.approx(df['cgpa'].var())
+    assert result_test['stats']['gre']['min'] == df['gre'].min()
+    assert result_test['stats']['research']['histogram']['edges'] == [-0.5, 0.5, 1.5]
+    assert result_test['stats']['research']['histogram']['counts'] == df['research'].value_counts().sort_index().tolist()
+
+
+def test_profile_unhappy():
+    '''Unhappy path unit test for profile_edges(schema, bins) of a column without range'''
+
+    with pytest.raises(ValueError):
+        clean.profile_edges({'gre': {'dtype': 'int64'}}, bins=10)
+
+
+def test_eda_profile_happy(tmp_path):
+    '''Happy path unit test for eda_profile(profile, fig_directory, columns, n_jobs)'''
+
+    df = pd.DataFrame({'gre': [320, 300, 310], 'cgpa': [3.5, 2.0, 4.0], 'research': [1, 0, 1]})
+    profile = clean.Profile(clean.profile_edges(schema, bins=4))
+    profile.update(df)
+    fig_directory = str(tmp_path / 'figures')
+
+    assert clean.eda_profile(profile.to_dict(), fig_directory, ['gre', 'cgpa'], n_jobs=2) == 4
+    assert clean.eda_profile(profile.to_dict(), fig_directory, ['gre', 'cgpa'], n_jobs=2) == 0
+
+
+def test_eda_happy(tmp_path):
+    '''Happy path unit test for eda(df, fig_directory, columns, n_jobs) re-rendering changed plots only'''
+
+    df = pd.DataFrame({'gre': [320, 300, 310], 'cgpa': [3.5, 2.0, 4.0]})
+    fig_directory = str(tmp_path / 'figures')
+
+    assert clean.eda(df, fig_directory, ['gre', 'cgpa'], n_jobs=2) == 3
+    assert clean.eda(df, fig_directory, ['gre', 'cgpa'], n_jobs=2) == 0
+    df['cgpa'] = [1.0, 2.0, 3.0]
+    assert clean.eda(df, fig_directory, ['gre', 'cgpa'], n_jobs=2) == 2
+
+
+def test_eda_unhappy(tmp_path):
+    '''Unhappy path unit test for eda(df, fig_directory, columns, n_jobs) with missing columns'''
+
+    df = pd.DataFrame({'gre': [320, 300, 310]})
+
+    with pytest.raises(KeyError):
+        clean.eda(df, str(tmp_path / 'figures'), ['gre', 'cgpa'], n_jobs=2)
@@ -0,0 +1,45 @@
+import sys
+from os import path
+import pytest
+import pandas as pd
+import numpy as np
+import warnings
+warnings.filterwarnings('ignore')
+
+sys.path.append('./src')
+import columnar
+import clean
+
+
+PROJECT_HOME = path.dirname(path.dirname(path.abspath(__file__)))
+df = pd.DataFrame({'GRE Score': [320, 300, 310], 'CGPA': [3.5, 2.0, 4.0]})
+
+
+def test_read_columnar_happy(tmp_path):
+    '''Happy path unit test for write_columnar(df, directory) and read_columnar(directory, columns)'''
+
+    directory = str(tmp_path / 'clean')
+    columnar.write_columnar(df, directory)
+    result_test = columnar.read_columnar(directory)
+
+    assert result_test.equals(df)
+    assert columnar.read_columnar(directory, ['CGPA']).columns.tolist() == ['CGPA']
+
+
+def test_read_columnar_unhappy(tmp_path):
+    '''Unhappy path unit test for write_columnar(df, directory) of a non-numeric column'''
+
+    with pytest.raises(ValueError):
+        columnar.write_columnar(pd.DataFrame({'name': ['a', 'b']}), str(tmp_path / 'clean'))
+
+
+def test_stream_clean_columnar_happy(tmp_path):
+    '''Happy path unit test for stream_clean(..., columnar_directory) matching the in-memory path'''
+
+    raw = str(tmp_path / 'raw.csv')
+    df.to_csv(raw, index=False)
+    directory = str(tmp_path / 'clean')
+    clean.stream_clean(raw, None, 'CGPA', chunksize=2, columnar_directory=directory)
+    result_true = clean.featurize(df.copy(), 'CGPA')
+
+    assert columnar.read_columnar(directory).equals(result_true)
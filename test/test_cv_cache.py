@@ -0,0 +1,44 @@
+import sys
+import os
+import pytest
+import numpy as np
+from sklearn.linear_model import Lasso
+import warnings
+warnings.filterwarnings('ignore')
+
+sys.path.append('./src')
+import cv_cache
+
+
+X = np.arange(12, dtype=np.float64).reshape(4, 3)
+y = np.array([1.0, 2.0, 3.0, 4.0])
+cv_params = {'random_state': 1995, "test_size": 0.25, "cv": 3}
+
+
+def test_cache_key_happy(tmp_path):
+    '''Happy path unit test for cache_key(fingerprint, estimator, cv_params, scoring) and load/save'''
+
+    fingerprint = cv_cache.data_fingerprint(X, y)
+    key = cv_cache.cache_key(fingerprint, Lasso(alpha=0.1), cv_params, {'r2': 'r2'})
+    cv_cache.save(str(tmp_path), key, {'r2': np.array([0.5])}, max_bytes=1 << 20)
+
+    assert cv_cache.load(str(tmp_path), key)['r2'][0] == 0.5
+    assert key == cv_cache.cache_key(cv_cache.data_fingerprint(X.copy(), y), Lasso(alpha=0.1), cv_params, {'r2': 'r2'})
+    assert key != cv_cache.cache_key(fingerprint, Lasso(alpha=0.2), cv_params, {'r2': 'r2'})
+    assert key != cv_cache.cache_key(fingerprint, Lasso(alpha=0.1), dict(cv_params, cv=5), {'r2': 'r2'})
+    assert fingerprint != cv_cache.data_fingerprint(X, y + 1)
+
+
+def test_cache_key_unhappy(tmp_path):
+    '''Unhappy path unit test for load(directory, key) of a missing key, and eviction beyond max_bytes'''
+
+    directory = str(tmp_path)
+    assert cv_cache.load(directory, 'missing') is None
+    assert cv_cache.load(None, 'missing') is None
+
+    cv_cache.save(directory, 'old', np.zeros(1000), max_bytes=20000)
+    os.utime(os.path.join(directory, 'old.pkl'), (0, 0))
+    cv_cache.save(directory, 'new', np.zeros(1000), max_bytes=10000)
+
+    assert cv_cache.load(directory, 'old') is None
+    assert cv_cache.load(directory, 'new') is not None
@@ -0,0 +1,44 @@
+import sys
+from os import path
+import pytest
+import numpy as np
+from sklearn.linear_model import LinearRegression, Ridge, Lasso
+from sklearn.model_selection import ShuffleSplit, cross_val_score
+import warnings
+warnings.filterwarnings('ignore')
+
+sys.path.append('./src')
+import fast_cv
+
+
+PROJECT_HOME = path.dirname(path.dirname(path.abspath(__file__)))
+rng = np.random.RandomState(0)
+X = rng.normal(size=(60, 4)) * [15, 8, 1, 0.5] + [316, 107, 3, 8.5]
+y = X.dot([0.002, 0.003, 0.01, 0.1]) + rng.normal(scale=0.05, size=60)
+
+
+def test_cross_validate_happy():
+    '''Happy path unit test for cross_validate(X, y, folds, scoring, alpha) matching cross_val_score'''
+
+    cv = ShuffleSplit(n_splits=3, test_size=0.3, random_state=1995)
+    scoring = {'r2': 'r2', 'mse': 'neg_mean_squared_error'}
+    for estimator, alpha in [(LinearRegression(), 0.0), (Ridge(alpha=5.0), 5.0)]:
+        result_test = fast_cv.cross_validate(X, y, list(cv.split(X)), scoring, alpha)
+        for metric, name in scoring.items():
+            result_true = cross_val_score(estimator, X, y, scoring=name, cv=cv)
+            assert np.allclose(result_test[metric], result_true, rtol=1e-10)
+
+
+def test_cross_validate_unhappy():
+    '''Unhappy path unit test for cross_validate(X, y, folds, scoring) of a metric needing the residuals'''
+
+    folds = list(ShuffleSplit(n_splits=2, test_size=0.3, random_state=1995).split(X))
+
+    assert not fast_cv.supports(Lasso(), ['r2'])
+    assert not fast_cv.supports(LinearRegression(), ['neg_mean_absolute_error'])
+    assert not fast_cv.supports(LinearRegression(positive=True), ['r2'])
+    assert not fast_cv.supports(Ridge(solver='sag'), ['r2'])
+    assert not fast_cv.supports(Ridge(tol=1e-2), ['r2'])
+    assert fast_cv.supports(Ridge(alpha=2.0, solver='cholesky', random_state=0), ['r2'])
+    with pytest.raises(ValueError):
+        fast_cv.cross_validate(X, y, folds, {'mae': 'neg_mean_absolute_error'})
@@ -0,0 +1,39 @@
+import sys
+from os import path
+import pytest
+import warnings
+warnings.filterwarnings('ignore')
+
+sys.path.append('./src')
+import metrics
+
+
+PROJECT_HOME = path.dirname(path.dirname(path.abspath(__file__)))
+
+
+def test_render_happy():
+    '''Happy path unit test for render(metrics) of a counter and a histogram'''
+
+    requests = metrics.Counter('requests_total', 'Requests served')
+    requests.inc(endpoint='index')
+    requests.inc(2, endpoint='index')
+    latency = metrics.Histogram('latency_seconds', 'Latency', buckets=(0.1, 1.0))
+    latency.observe(0.05, stage='score')
+    latency.observe(0.5, stage='score')
+
+    result_test = metrics.render([requests, latency]).splitlines()
+
+    assert 'requests_total{endpoint="index"} 3.0' in result_test
+    assert 'latency_seconds_bucket{stage="score",le="0.1"} 1.0' in result_test
+    assert 'latency_seconds_bucket{stage="score",le="1.0"} 2.0' in result_test
+    assert 'latency_seconds_bucket{stage="score",le="+Inf"} 2.0' in result_test
+    assert 'latency_seconds_count{stage="score"} 2.0' in result_test
+
+
+def test_render_unhappy():
+    '''Unhappy path unit test for render(metrics) of label values that need escaping'''
+
+    gauge = metrics.Gauge('info', 'Info', lambda: [({'name': 'a"b\n'}, 1)])
+    result_test = metrics.render([gauge]).splitlines()
+
+    assert result_test[-1] == 'info{name="a\\"b\\n"} 1.0'
@@ -0,0 +1,101 @@
+import sys
+import os
+from os import path
+import pytest
+import pandas as pd
+import numpy as np
+import warnings
+warnings.filterwarnings('ignore')
+
+sys.path.append('./src')
+import model_registry
+
+
+PROJECT_HOME = path.dirname(path.dirname(path.abspath(__file__)))
+params = ['intercept', 'a', 'b']
+
+
+def write_model(csv_path, coefs):
+    fitted = pd.DataFrame([])
+    fitted['params'] = params
+    fitted['coefs'] = coefs
+    fitted.to_csv(csv_path)
+
+
+def test_predict_happy(tmp_path):
+    '''Happy path unit test for ModelRegistry.predict(X)'''
+
+    csv_path = str(tmp_path / 'model.csv')
+    write_model(csv_path, [0.1, 0.2, 0.3])
+    registry = model_registry.ModelRegistry(csv_path)
+    result_test = registry.predict([[1, 1], [0, 0], [5, 5]])
+    result_true = np.array([0.6, 0.1, 1.0])
+
+    assert np.allclose(result_test, result_true)
+
+
+def test_predict_unhappy(tmp_path):
+    '''Unhappy path unit test for ModelRegistry.predict(X)'''
+
+    csv_path = str(tmp_path / 'model.csv')
+    write_model(csv_path, [0.1, 0.2, 0.3])
+    registry = model_registry.ModelRegistry(csv_path)
+
+    with pytest.raises(ValueError):
+        registry.predict([1, 2, 3])
+
+
+def test_refresh_happy(tmp_path):
+    '''Happy path unit test for ModelRegistry.refresh()'''
+
+    csv_path = str(tmp_path / 'model.csv')
+    write_model(csv_path, [0.1, 0.2, 0.3])
+    registry = model_registry.ModelRegistry(csv_path, reload_seconds=0)
+    version = registry.model.version
+
+    model = registry.model
+    write_model(csv_path, [0.0, 0.1, 0.1])
+    os.utime(csv_path, (0, 0))
+
+    assert registry.refresh()
+    assert registry.model.version != version
+    assert np.allclose(registry.predict([1, 1]), 0.2)
+    # A snapshot taken before the reload keeps scoring with its own coefficients
+    assert model.version == version and np.allclose(model_registry.score(model, [1, 1]), 0.6)
+
+
+def test_refresh_unhappy(tmp_path):
+    '''Unhappy path unit test for ModelRegistry.refresh()'''
+
+    csv_path = str(tmp_path / 'model.csv')
+    write_model(csv_path, [0.1, 0.2, 0.3])
+    registry = model_registry.ModelRegistry(csv_path, reload_seconds=0)
+    version = registry.model.version
+
+    os.remove(csv_path)
+
+    assert not registry.refresh()
+    assert registry.model.version == version
+
+
+def test_fold_preprocess_happy(tmp_path):
+    '''Happy path unit test for ModelRegistry.predict(X) of raw features with preprocess_path'''
+
+    csv_path = str(tmp_path / 'model.csv')
+    preprocess_path = str(tmp_path / 'preprocess.json')
+    write_model(csv_path, [0.1, 0.2, 0.3])
+    with open(preprocess_path, 'w') as f:
+        f.write('{"columns": {"b": {"scale": 0.5, "offset": -1.0}}}')
+    registry = model_registry.ModelRegistry(csv_path, preprocess_path=preprocess_path)
+    X = np.array([[1.0, 4.0], [0.0, 2.0]])
+    result_true = np.clip(np.round(0.1 + 0.2 * X[:, 0] + 0.3 * (X[:, 1] * 0.5 - 1.0), 2), 0, 1)
+
+    assert np.allclose(registry.predict(X), result_true)
+    assert registry.model.version != model_registry.file_digest(csv_path)
+
+
+def test_fold_preprocess_unhappy():
+    '''Unhappy path unit test for fold_preprocess(coefs, params, preprocess) of an unknown column'''
+
+    with pytest.raises(ValueError):
+        model_registry.fold_preprocess(np.array([0.1, 0.2, 0.3]), params, {'c': {'scale': 1, 'offset': 0}})
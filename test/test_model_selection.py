@@ -1,8 +1,10 @@
 import sys
+import time
 from os import path
 import pytest
 import pandas as pd
 import numpy as np
+from sklearn.linear_model import LinearRegression
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -19,6 +21,12 @@ xtrain = [[4,2,3],[3,2,3],[1,2,3]]
 xtest = [[2,2,3]]
 ytrain = [4,4,4]
 ytest = [4]
+candidates = {'linear': {'model': 'sklearn.linear_model.LinearRegression'},
+              'lasso': {'model': 'sklearn.linear_model.Lasso',
+                        'search': {'alpha': {'distribution': 'loguniform', 'low': 1e-4, 'high': 10}}},
+              'rf': {'model': 'sklearn.ensemble.RandomForestRegressor',
+                     'params': {'random_state': 1995, 'n_estimators': 10},
+                     'search': {'max_depth': [2, None]}}}
 
 
 def test_split_happy():
@@ -150,4 +158,179 @@ def test_cv_rf_unhappy():
     result_true = "Failed cv_rf"
     result_test = model_selection.cv_rf(x_train,y_train,model_params_rmse)
 
-    assert result_true == result_test
\ No newline at end of file
+    assert result_true == result_test
+
+def test_cv_models_happy():
+    '''Happy path for cv_models(X_train, y_train, models, cv_params, scoring, n_jobs) matching cv_linear'''
+    rng = np.random.RandomState(0)
+    x_train = pd.DataFrame(rng.uniform(size=(40, 3)), columns=features)
+    y_train = x_train.dot([1.0, 2.0, 3.0]) + rng.normal(scale=0.1, size=40)
+    cv_params = {'random_state': 1995, "test_size": 0.25, "cv": 3}
+    models = {name: model for name, (model, _, _) in model_selection.load_candidates(candidates).items()}
+    result_test = model_selection.cv_models(x_train, y_train, models, cv_params,
+                                            {'r2': 'r2', 'mse': 'neg_mean_squared_error'}, n_jobs=2)
+
+    for scoring, metric in [('r2', 'r2'), ('neg_mean_squared_error', 'mse')]:
+        result_true = model_selection.cv_linear(x_train, y_train, {**cv_params, 'scoring': scoring})
+        assert np.allclose(result_test['linear'][metric], result_true)
+    assert set(result_test) == {'linear', 'lasso', 'rf'}
+    assert result_test['rf']['wall_time'] >= 0
+
+
+def test_cv_models_unhappy():
+    '''Unhappy path for cv_models(X_train, y_train, models, cv_params, scoring) of an unknown metric'''
+    x_train = pd.DataFrame(xtrain, columns=features)
+    y_train = pd.Series([4, 4, 4])
+    cv_params = {'random_state': 1995, "test_size": 0.25, "cv": 3}
+
+    with pytest.raises(ValueError):
+        model_selection.cv_models(x_train, y_train, {'linear': LinearRegression()}, cv_params,
+                                  {'r2': 'not_a_metric'})
+
+
+def test_search_models_happy():
+    '''Happy path for search_models(X_train, y_train, candidates, cv_params, scoring, refit, n_iter, n_jobs)'''
+    rng = np.random.RandomState(0)
+    x_train = pd.DataFrame(rng.uniform(size=(40, 3)), columns=features)
+    y_train = x_train.dot([1.0, 2.0, 3.0]) + rng.normal(scale=0.1, size=40)
+    cv_params = {'random_state': 1995, "test_size": 0.25, "cv": 3}
+    result_test = model_selection.search_models(x_train, y_train, model_selection.load_candidates(candidates),
+                                                cv_params, {'r2': 'r2'}, 'r2', n_iter=4, n_jobs=2)
+
+    assert [result_test[name]['settings'] for name in ['linear', 'lasso', 'rf']] == [1, 4, 2]
+    assert 1e-4 <= result_test['lasso']['params']['alpha'] <= 10
+    assert np.mean(result_test['lasso']['r2']) > 0.9
+    assert model_selection.predict_latency(LinearRegression().fit(x_train.values, y_train.values), x_train, repeat=3) > 0
+
+
+def test_search_models_unhappy():
+    '''Unhappy path for sample_params(space, n_iter, random_state) of an unknown distribution'''
+
+    with pytest.raises(ValueError):
+        model_selection.sample_params({'alpha': {'distribution': 'normal', 'low': 0, 'high': 1}}, 4, 1995)
+
+
+def test_cv_path_happy():
+    '''Happy path for cv_path(X_train, y_train, estimator, path, cv_params, scoring, refit, n_jobs)'''
+    from sklearn.linear_model import ElasticNet, Lasso
+    from sklearn.model_selection import ShuffleSplit, cross_val_score
+
+    rng = np.random.RandomState(0)
+    x_train = pd.DataFrame(rng.uniform(size=(60, 3)), columns=features)
+    y_train = x_train.dot([1.0, 0.0, 3.0]) + rng.normal(scale=0.3, size=60)
+    cv_params = {'random_state': 1995, "test_size": 0.25, "cv": 3}
+    result_test = model_selection.cv_path(x_train, y_train, Lasso(tol=1e-8), {'n_alphas': 20, 'eps': 1e-3},
+                                          cv_params, {'r2': 'r2'}, 'r2', n_jobs=2)
+    cv = ShuffleSplit(n_splits=3, test_size=0.25, random_state=1995)
+    result_true = cross_val_score(Lasso(alpha=result_test['params']['alpha'], tol=1e-8), x_train, y_train,
+                                  scoring='r2', cv=cv)
+
+    assert np.allclose(result_test['r2'], result_true, atol=1e-6)
+    assert len(result_test['path']) == 20 and result_test['path']['r2'].max() == np.mean(result_test['r2'])
+    assert result_test['path']['nonzero'].iloc[0] < result_test['path']['nonzero'].iloc[-1]
+
+    result_test = model_selection.cv_path(x_train, y_train, ElasticNet(), {'n_alphas': 5, 'l1_ratio': [0.5, 1.0]},
+                                          cv_params, {'r2': 'r2'}, 'r2')
+    assert len(result_test['path']) == 10 and set(result_test['params']) == {'alpha', 'l1_ratio'}
+
+
+def test_cv_path_unhappy():
+    '''Unhappy path for cv_path(...) of an estimator without a regularization path'''
+
+    cv_params = {'random_state': 1995, "test_size": 0.25, "cv": 3}
+    with pytest.raises(ValueError):
+        model_selection.cv_path(pd.DataFrame(xtrain), pd.Series(ytrain), LinearRegression(), {},
+                                cv_params, {'r2': 'r2'}, 'r2')
+
+
+def test_cv_models_cache_happy(tmp_path):
+    '''Happy path for cv_models(..., cache) reusing the results of unchanged models only'''
+    from sklearn.linear_model import Lasso
+
+    rng = np.random.RandomState(0)
+    x_train = pd.DataFrame(rng.uniform(size=(40, 3)), columns=features)
+    y_train = x_train.dot([1.0, 2.0, 3.0]) + rng.normal(scale=0.1, size=40)
+    cv_params = {'random_state': 1995, "test_size": 0.25, "cv": 3}
+    cache = {'directory': str(tmp_path), 'max_bytes': 1 << 20}
+    result_true = model_selection.cv_models(x_train, y_train, {'lasso': Lasso(alpha=0.01)}, cv_params,
+                                            {'r2': 'r2'}, cache=cache)
+    result_test = model_selection.cv_models(x_train, y_train, {'lasso': Lasso(alpha=0.01), 'linear': LinearRegression()},
+                                            cv_params, {'r2': 'r2'}, cache=cache)
+
+    assert result_test['lasso']['cached'] and not result_test['linear']['cached']
+    assert np.array_equal(result_test['lasso']['r2'], result_true['lasso']['r2'])
+
+
+def test_cv_models_positive_unhappy():
+    '''Unhappy path for cv_models(...) of a constrained LinearRegression, refitted instead of solved in closed form'''
+    from sklearn.model_selection import ShuffleSplit, cross_val_score
+
+    rng = np.random.RandomState(0)
+    x_train = pd.DataFrame(rng.uniform(size=(40, 3)), columns=features)
+    y_train = x_train.dot([1.0, -2.0, 3.0]) + rng.normal(scale=0.1, size=40)
+    cv_params = {'random_state': 1995, "test_size": 0.25, "cv": 3}
+    result_test = model_selection.cv_models(x_train, y_train, {'positive': LinearRegression(positive=True)},
+                                            cv_params, {'r2': 'r2'})
+    cv = ShuffleSplit(n_splits=3, test_size=0.25, random_state=1995)
+    result_true = cross_val_score(LinearRegression(positive=True), x_train, y_train, scoring='r2', cv=cv)
+
+    assert np.allclose(result_test['positive']['r2'], result_true)
+    assert result_test['positive']['score_time'] > 0
+
+
+def test_search_models_cache_happy(tmp_path):
+    '''Happy path for search_models(..., cache) not carrying the timings of cached settings over'''
+
+    rng = np.random.RandomState(0)
+    x_train = pd.DataFrame(rng.uniform(size=(40, 3)), columns=features)
+    y_train = x_train.dot([1.0, 2.0, 3.0]) + rng.normal(scale=0.1, size=40)
+    cv_params = {'random_state': 1995, "test_size": 0.25, "cv": 3}
+    cache = {'directory': str(tmp_path), 'max_bytes': 1 << 20}
+    first = {'lasso': candidates['lasso'], 'path': {'model': 'sklearn.linear_model.Lasso', 'path': {'n_alphas': 5}}}
+    model_selection.search_models(x_train, y_train, model_selection.load_candidates(first),
+                                  cv_params, {'r2': 'r2'}, 'r2', n_iter=2, cache=cache)
+    start = time.time()
+    result_test = model_selection.search_models(x_train, y_train,
+                                                model_selection.load_candidates(dict(first, linear=candidates['linear'])),
+                                                cv_params, {'r2': 'r2'}, 'r2', n_iter=2, cache=cache)
+
+    for name in ['lasso', 'path']:
+        assert result_test[name]['cached']
+        assert np.isnan(result_test[name]['search_time']) and np.isnan(result_test[name]['fit_time'])
+    assert not result_test['linear']['cached']
+    assert 0 <= result_test['linear']['search_time'] <= time.time() - start
+
+
+def test_serving_latency_cache_happy(tmp_path):
+    '''Happy path for serving_latency(...) reusing the latency stored with a cached search'''
+
+    rng = np.random.RandomState(0)
+    x_train = pd.DataFrame(rng.uniform(size=(40, 3)), columns=features)
+    y_train = x_train.dot([1.0, 2.0, 3.0]) + rng.normal(scale=0.1, size=40)
+    cv_params = {'random_state': 1995, "test_size": 0.25, "cv": 3}
+    cache = {'directory': str(tmp_path), 'max_bytes': 1 << 20}
+    first = {'lasso': candidates['lasso'], 'path': {'model': 'sklearn.linear_model.Lasso', 'path': {'n_alphas': 5}}}
+    loaded = model_selection.load_candidates(first)
+    results = model_selection.search_models(x_train, y_train, loaded, cv_params, {'r2': 'r2'}, 'r2',
+                                            n_iter=2, cache=cache)
+    latency_true = {name: model_selection.serving_latency(loaded[name][0], results[name], x_train, y_train,
+                                                          x_train, cache) for name in first}
+
+    results = model_selection.search_models(x_train, y_train, model_selection.load_candidates(first),
+                                            cv_params, {'r2': 'r2'}, 'r2', n_iter=2, cache=cache)
+    for name in first:
+        assert results[name]['cached']
+        # An unfitted estimator would fail to predict if it were refitted and timed again
+        assert model_selection.serving_latency(None, results[name], x_train, y_train, x_train,
+                                               cache) == latency_true[name]
+
+
+def test_serving_latency_unhappy():
+    '''Unhappy path for serving_latency(...) of a search that was not cached, refitted and timed'''
+    from sklearn.linear_model import Lasso
+
+    result = {'cached': False, 'params': {'alpha': 0.01}, 'key': None, 'predict_latency_ms': -1.0}
+    latency = model_selection.serving_latency(Lasso(), result, pd.DataFrame(xtrain), pd.Series(ytrain),
+                                              pd.DataFrame(xtest))
+
+    assert latency > 0
@@ -0,0 +1,67 @@
+import sys
+import os
+from os import path
+import pytest
+import warnings
+warnings.filterwarnings('ignore')
+
+sys.path.append('./src')
+import pipeline
+
+
+PROJECT_HOME = path.dirname(path.dirname(path.abspath(__file__)))
+
+
+def make_stage(tmp_path, body):
+    script = str(tmp_path / 'stage.py')
+    with open(script, 'w') as f:
+        f.write(body)
+    return pipeline.Stage(name='double', script=script, sources=[], inputs=[str(tmp_path / 'in.txt')],
+                          outputs=[str(tmp_path / 'out.txt')], config={'factor': 2})
+
+
+def test_run_pipeline_happy(tmp_path):
+    '''Happy path unit test for run_pipeline(stages, cache_directory, force) reusing cached outputs'''
+
+    (tmp_path / 'in.txt').write_text('21')
+    stage = make_stage(tmp_path, "open({0!r}, 'w').write(str(2 * int(open({1!r}).read())))"
+                       .format(str(tmp_path / 'out.txt'), str(tmp_path / 'in.txt')))
+    cache = str(tmp_path / 'cache')
+
+    assert pipeline.run_pipeline([stage], cache)[0]['status'] == 'ran'
+    assert pipeline.run_pipeline([stage], cache)[0]['status'] == 'cached'
+    os.remove(str(tmp_path / 'out.txt'))
+    assert pipeline.run_pipeline([stage], cache)[0]['status'] == 'restored'
+    assert (tmp_path / 'out.txt').read_text() == '42'
+    assert pipeline.run_pipeline([stage], cache, force=['double'])[0]['status'] == 'ran'
+
+    (tmp_path / 'in.txt').write_text('1')
+    assert pipeline.run_pipeline([stage], cache)[0]['status'] == 'ran'
+    assert pipeline.run_pipeline([stage._replace(config={'factor': 3})], cache, keep=1)[0]['status'] == 'ran'
+    assert len(os.listdir(path.join(cache, 'double'))) == 1
+
+
+def test_run_pipeline_unhappy(tmp_path):
+    '''Unhappy path unit test for run_pipeline(stages, cache_directory) of a failing stage'''
+
+    (tmp_path / 'in.txt').write_text('21')
+    stage = make_stage(tmp_path, "raise SystemExit(1)")
+    cache = str(tmp_path / 'cache')
+    report = pipeline.run_pipeline([stage, stage._replace(name='next')], cache)
+
+    assert [result['status'] for result in report] == ['failed']
+    assert not path.exists(path.join(cache, 'double'))
+
+
+def test_run_stage_unhappy(tmp_path):
+    '''Unhappy path unit test for run_stage(stage, cache_directory) of a stage exiting normally without its outputs'''
+
+    (tmp_path / 'in.txt').write_text('21')
+    (tmp_path / 'out.txt').write_text('42')
+    os.utime(str(tmp_path / 'out.txt'), (0, 0))
+    stage = make_stage(tmp_path, "import logging; logging.error('Failed to write the output')")
+    cache = str(tmp_path / 'cache')
+
+    assert pipeline.run_stage(stage, cache)['status'] == 'failed'
+    assert pipeline.stale_outputs(stage, 0) == [str(tmp_path / 'out.txt')]
+    assert not path.exists(path.join(cache, 'double'))
@@ -65,3 +65,41 @@ def test_train_model_unhappy():
 
     assert result_true == result_test
 
+
+
+def test_train_model_out_of_core_happy(tmp_path):
+    '''Happy path unit test for train_model_out_of_core(...) matching the in-memory fit'''
+    import columnar
+    from sklearn import metrics
+
+    rng = np.random.RandomState(0)
+    df = pd.DataFrame(rng.uniform(size=(103, 3)) * [100, 10, 1] + [300, 0, 0], columns=['a', 'b', 'c'])
+    df[target] = df[['a', 'b', 'c']].dot([0.01, 0.2, 3.0]) + rng.normal(size=103)
+    split_params = {"test_size": 0.25, "random_state": 1995}
+    X_train, X_test, y_train, y_test = train_model.split(df, ['a', 'b', 'c'], target, split_params)
+    lr_true = train_model.train_model(X_train, y_train)
+
+    directory = str(tmp_path / 'clean')
+    columnar.write_columnar(df, directory)
+    lr_test, performance = train_model.train_model_out_of_core(directory, ['a', 'b', 'c'], target, split_params,
+                                                               chunksize=10, n_jobs=2)
+
+    assert np.allclose(lr_test.coef_, lr_true.coef_) and np.isclose(lr_test.intercept_, lr_true.intercept_)
+    assert np.isclose(performance['r2'], metrics.r2_score(y_test, lr_true.predict(X_test)))
+
+    # Quoted fields spanning lines and trailing blank lines must not shift the split
+    csv_path = str(tmp_path / 'clean.csv')
+    df.assign(note='first\nsecond').to_csv(csv_path)
+    with open(csv_path, 'a') as f:
+        f.write('\n\n')
+    lr_test, _ = train_model.train_model_out_of_core(csv_path, ['a', 'b', 'c'], target, split_params, chunksize=10)
+
+    assert np.allclose(lr_test.coef_, lr_true.coef_) and np.allclose(lr_test.predict(X_test), lr_true.predict(X_test))
+
+
+def test_train_model_out_of_core_unhappy(tmp_path):
+    '''Unhappy path unit test for train_model_out_of_core(...) of a missing clean file'''
+
+    with pytest.raises(FileNotFoundError):
+        train_model.train_model_out_of_core(str(tmp_path / 'clean.csv'), ['a', 'b', 'c'], target,
+                                            {"test_size": 0.25, "random_state": 1995}, chunksize=10)
@@ -0,0 +1,53 @@
+import sys
+from os import path
+import pytest
+import sqlalchemy as sql
+import warnings
+warnings.filterwarnings('ignore')
+
+sys.path.append('./src')
+import write_behind
+import metrics
+
+
+PROJECT_HOME = path.dirname(path.dirname(path.abspath(__file__)))
+
+
+def make_table():
+    engine = sql.create_engine('sqlite://', poolclass=sql.pool.StaticPool,
+                               connect_args={'check_same_thread': False})
+    metadata = sql.MetaData()
+    table = sql.Table('records', metadata,
+                      sql.Column('id', sql.Integer, primary_key=True),
+                      sql.Column('admit', sql.Float))
+    metadata.create_all(engine)
+    return engine, table
+
+
+def test_close_happy():
+    '''Happy path unit test for WriteBehindBuffer.put(record) and close()'''
+
+    engine, table = make_table()
+    buffer = write_behind.WriteBehindBuffer(engine, table, batch_size=2, flush_seconds=0.05)
+    for admit in [0.1, 0.2, 0.3]:
+        buffer.put({'admit': admit})
+    buffer.close()
+
+    rows = engine.execute(sql.select([sql.func.count()]).select_from(table)).scalar()
+    assert rows == 3
+    assert buffer.rows_flushed == 3
+    assert buffer.flushes == 2
+
+
+def test_flush_unhappy():
+    '''Unhappy path unit test for WriteBehindBuffer.flush(batch) when the insert fails'''
+
+    engine, table = make_table()
+    table.drop(engine)
+    failures = metrics.Counter('db_failures_total', 'Failed database operations')
+    buffer = write_behind.WriteBehindBuffer(engine, table, failures=failures)
+    buffer.flush([{'admit': 0.1}, {'admit': 0.2}])
+
+    assert buffer.rows_failed == 2
+    assert buffer.rows_flushed == 0
+    assert list(failures.samples()) == [('db_failures_total', (('operation', 'insert'),), 1)]